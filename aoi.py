@@ -7,32 +7,130 @@
 # In[] 
 import pyresample as pr
 import numpy as np
+import shapely
 
 import os
 import yaml
+import json
+import hashlib
 
 from pyproj import CRS
 from pyproj import Transformer
 from shapely.geometry import Polygon
 from shapely.ops import transform
+from shapely import STRtree
 
 from loguru import logger
+from functools import lru_cache
 
 
 
+# In[]
+@lru_cache(maxsize=None)
+def get_transformer(source: str, target: str) -> object:
+    """
+    Parameters
+    ----------
+    source : str
+        Source CRS definition, e.g., EPSG:4326
+    target : str
+        Target CRS definition, e.g., EPSG:6932
+
+    Returns
+    -------
+    object
+        Transform function between both CRS's; built only once per CRS pair 
+        and shared by all AOI's/overlap engines using the same projection
+    """
+    TRANSFORMER = Transformer.from_crs(CRS(source), CRS(target), 
+                                       always_xy=True)
+    return TRANSFORMER.transform
+
+
+def densify_ring(lon: np.array, lat: np.array, step: float = 0.5) -> tuple:
+    """
+    Parameters
+    ----------
+    lon : np.array
+        Ring longitudes [deg] of shape (n, m)
+    lat : np.array
+        Ring latitudes [deg] of shape (n, m)
+    step : float, optional
+        Maximum angular distance [deg] between densified ring points
+
+    Returns
+    -------
+    tuple
+        Longitudes and latitudes of shape (n, m*k) of the rings densified 
+        along great circles between consecutive points (closing the ring),
+        with k being the same for all rings; being independent of the 
+        longitude range, this neither requires any antimeridian nor pole 
+        handling before the projection to a polar CRS
+    """
+    #unit vectors of all ring points
+    LON, LAT = np.radians(lon), np.radians(lat)
+    P0 = np.stack([np.cos(LAT) * np.cos(LON), 
+                   np.cos(LAT) * np.sin(LON), 
+                   np.sin(LAT)], axis=-1)
+    P1 = np.roll(P0, -1, axis=1)
+    #angular distance of all edges
+    DOT = np.clip(np.sum(P0 * P1, axis=-1), -1.0, 1.0)
+    OMEGA = np.arccos(DOT)
+    MAX_OMEGA = np.nanmax(OMEGA) if np.isfinite(OMEGA).any() else 0.0
+    K = max(int(np.ceil(np.degrees(MAX_OMEGA) / step)), 1)
+    
+    #spherical linear interpolation along all edges, excluding end points
+    T = np.arange(K) / K
+    OMEGA = OMEGA[..., np.newaxis]
+    SIN_OMEGA = np.sin(OMEGA)
+    DEGENERATE = SIN_OMEGA < 1e-12
+    SIN_OMEGA = np.where(DEGENERATE, 1.0, SIN_OMEGA)
+    W0 = np.where(DEGENERATE, 1.0 - T, np.sin((1.0 - T) * OMEGA) / SIN_OMEGA)
+    W1 = np.where(DEGENERATE, T, np.sin(T * OMEGA) / SIN_OMEGA)
+    P = W0[..., np.newaxis] * P0[:, :, np.newaxis, :] + \
+        W1[..., np.newaxis] * P1[:, :, np.newaxis, :]
+    P = P.reshape(P.shape[0], P.shape[1] * K, 3)
+    
+    #back to lon/lat
+    DENSE_LON = np.degrees(np.arctan2(P[..., 1], P[..., 0]))
+    DENSE_LAT = np.degrees(np.arctan2(P[..., 2], 
+                                      np.hypot(P[..., 0], P[..., 1])))
+    return DENSE_LON, DENSE_LAT
+
+
 # In[]
 class AoiGrid(object):
-    def __init__(self, grid_file: str, scl: float):
-        #loads the yaml reference file
-        with open(os.path.join(os.getcwd(), 'aoi', grid_file)) as f:
-            self.grid_def = yaml.safe_load(f)
+    #version of the aoi polygon computation, invalidating registered ones
+    VERSION = 1
+    
+    def __init__(self, grid_file: str, scl: float, registry: object = None):
+        #loads the yaml reference file or its registered version
+        with open(os.path.join(os.getcwd(), 'aoi', grid_file), 'rb') as f:
+            CONTENT = f.read()
+        ENTRY = registry.get(CONTENT, scl) if registry is not None else None
+        if ENTRY is not None:
+            self.grid_def = ENTRY['grid_def']
+        else:
+            self.grid_def = yaml.safe_load(CONTENT)
 
         #set the aoi grid
         self.set_grid(scl)
+        self.set_grid_key(scl)
         #set transformer for CRS transformation
         self.set_transformer()
-        #transform AOI
-        self.set_aoi_poly()
+        #transform AOI or use the registered polygon
+        if ENTRY is not None:
+            self.aoi_poly = shapely.from_wkb(ENTRY['poly'])
+        else:
+            self.set_aoi_poly()
+            if registry is not None:
+                registry.add(CONTENT, scl, self.get_registry_entry())
+                
+    def get_registry_entry(self) -> dict:
+        return {'grid_def': self.grid_def,
+                'target': self.target_epsg,
+                'poly': shapely.to_wkb(self.aoi_poly, hex=True),
+                }
         
     def get_meta_spec(self, specification: str) -> str:
         return self.grid_def['meta'][specification]
@@ -88,6 +186,16 @@ class AoiGrid(object):
     def get_grid(self) -> object:
         return self.grid
     
+    def set_grid_key(self, scale_factor: float) -> None:
+        #hash of the full grid definition, identifying the aoi polygon in 
+        #the persistent overlap cache
+        DEFINITION = json.dumps([self.grid_def, scale_factor], sort_keys=True,
+                                default=str)
+        self.grid_key = hashlib.sha1(DEFINITION.encode('UTF-8')).hexdigest()
+        
+    def get_grid_key(self) -> str:
+        return self.grid_key
+    
     @property
     def target_epsg(self) -> str:
         HEMISPHERE = self.hemisphere
@@ -98,22 +206,44 @@ class AoiGrid(object):
         return TARGET_EPSG
     
     def set_transformer(self) -> None:
-        SOURCE = CRS(self.projection)
-        TARGET = CRS(self.target_epsg)
-        TRANSFORMER = Transformer.from_crs(SOURCE, TARGET, always_xy=True)
-        self.transformer = TRANSFORMER.transform
+        #only keep the CRS definitions, while the (shared) transformers are
+        #built on first use
+        self.source_crs = self.projection
+        self.target_crs = self.target_epsg
         
     def get_transformer(self) -> object:
-        return self.transformer
+        return get_transformer(self.source_crs, self.target_crs)
+    
+    def get_swath_transformer(self) -> object:
+        #swath ring coordinates from the geoMeta files are always lon/lat
+        return get_transformer('EPSG:4326', self.target_crs)
+    
+    def in_hemisphere(self, lat: np.array) -> np.array:
+        """
+        Parameters
+        ----------
+        lat : np.array
+            Swath bounding ring latitudes of shape (..., 4)
+
+        Returns
+        -------
+        np.array
+            Whether the swath(s) lie within the hemisphere of this AOI, 
+            derived directly from the ring latitudes without any geometry
+        """
+        if self.hemisphere == 'south':
+            return np.max(lat, axis=-1) < (-30.0)
+        else:
+            return np.min(lat, axis=-1) > (30.0)
 
     def set_aoi_poly(self) -> None:
-        #get lat/lon from grid definition
-        lon, lat = self.grid.get_lonlats()
+        #get lat/lon of the four corner pixels only from grid definition
+        ROWS = [0, self.grid.height - 1, self.grid.height - 1, 0]
+        COLS = [0, 0, self.grid.width - 1, self.grid.width - 1]
+        CORNERS = [self.grid.get_lonlat(row, col) 
+                   for row, col in zip(ROWS, COLS)]
         #create shapely polygon
-        AOI_POLY = Polygon([[lon[ 0, 0],lat[ 0, 0]],
-                            [lon[-1, 0],lat[-1, 0]],
-                            [lon[-1,-1],lat[-1,-1]],
-                            [lon[ 0,-1],lat[ 0,-1]]])
+        AOI_POLY = Polygon(CORNERS)
         TRANSFORMER = self.get_transformer()
         self.aoi_poly = transform(TRANSFORMER, AOI_POLY)
         
@@ -146,29 +276,27 @@ class AoiGrid(object):
                         float(listing_entry[3]),float(listing_entry[4])])
         lat = np.array([float(listing_entry[5]),float(listing_entry[6]),
                         float(listing_entry[7]),float(listing_entry[8])])
-                    
-        #create shapely polygon
-        SWATH_POLY = Polygon([[lon[0],lat[0]],
-                              [lon[3],lat[3]],
-                              [lon[2],lat[2]],
-                              [lon[1],lat[1]]])
-        #validate swath being in the correct hemisphere 
-        HEMISPHERE = self.hemisphere
-        ENVELOPE = SWATH_POLY.bounds
-        if HEMISPHERE == 'south':
-            IN_HEMISPHERE = ENVELOPE[3] < (-30.0)
-        else:
-            IN_HEMISPHERE = ENVELOPE[1] > (30.0)
+        
+        #validate swath being in the correct hemisphere before any geometry
+        if not self.in_hemisphere(lat):
+            return False, 0.0
+        
+        #densify swath ring along great circles, transform the swath 
+        #coordinates, and create shapely polygon
+        ORDER = [0, 3, 2, 1]
+        lon, lat = densify_ring(lon[np.newaxis, ORDER], lat[np.newaxis, ORDER])
+        TRANSFORMER = self.get_swath_transformer()
+        x, y = TRANSFORMER(lon[0], lat[0])
+        SWATH_POLY = Polygon(np.stack([x, y], axis=-1))
+        if not SWATH_POLY.is_valid:
+            SWATH_POLY = shapely.make_valid(SWATH_POLY)
             
         """ Check for Overlap with AOI Polygon"""
-        #transform swath polygons
         AOI_POLY = self.get_aoi_poly()
-        TRANSFORMER = self.get_transformer()
-        SWATH_POLY = transform(TRANSFORMER, SWATH_POLY)
 
         #check for overlap
         SWATH_INTERSECTS = SWATH_POLY.intersects(AOI_POLY)
-        if SWATH_INTERSECTS and IN_HEMISPHERE:
+        if SWATH_INTERSECTS:
             OVERLAP = True
             AOI_AREA = AOI_POLY.area
             INTERSECTION_AREA = AOI_POLY.intersection(SWATH_POLY).area
@@ -181,9 +309,137 @@ class AoiGrid(object):
         return OVERLAP, FRACTION
 
 
+# In[]
+class AoiOverlap(object):
+    """
+    Batch overlap engine for all AOI's of one hemisphere, intersecting the 
+    footprints of a whole geoMeta listing at once with the AOI polygons 
+    that are kept in a STRtree spatial index
+    """
+    #version of the overlap computation, invalidating memoized overlaps
+    VERSION = 2
+    
+    def __init__(self, hemisphere: str, grids: dict):
+        """
+        Parameters
+        ----------
+        hemisphere : str
+            Hemisphere (north/south) shared by all given AOI grids
+        grids : dict
+            AOI names and their corresponding AoiGrid's
+        """
+        self.hemisphere = hemisphere
+        self.names = np.array(list(grids.keys()))
+        self.grid_keys = [f'{self.VERSION}:{grid.get_grid_key()}' 
+                          for grid in grids.values()]
+        #all grids of a hemisphere share the same target CRS and thereby 
+        #the hemisphere check/swath transformer
+        self.reference = list(grids.values())[0]
+        #build spatial index of the AOI polygons
+        self.polys = np.array([grid.get_aoi_poly() for grid in grids.values()])
+        self.areas = shapely.area(self.polys)
+        self.tree = STRtree(self.polys)
+        
+    def get_transformer(self) -> object:
+        return self.reference.get_swath_transformer()
+    
+    def in_hemisphere(self, lat: np.array) -> np.array:
+        return self.reference.in_hemisphere(lat)
+    
+    def create_swath_polys(self, lon: np.array, lat: np.array) -> np.array:
+        """
+        Parameters
+        ----------
+        lon : np.array
+            Swath bounding ring longitudes of shape (n, 4)
+        lat : np.array
+            Swath bounding ring latitudes of shape (n, 4)
+
+        Returns
+        -------
+        np.array
+            Array of n projected swath polygons, with None for all swaths 
+            that can not be represented in the target CRS
+        """
+        #same vertex order as for the single swath polygon, densified along
+        #great circles instead of straight lines in the target CRS
+        ORDER = [0, 3, 2, 1]
+        LON, LAT = densify_ring(lon[:, ORDER], lat[:, ORDER])
+        #transform all ring coordinates of the hemisphere in a single call
+        TRANSFORMER = self.get_transformer()
+        x, y = TRANSFORMER(LON, LAT)
+        COORDS = np.stack([x, y], axis=-1)
+        #create polygons for all representable swaths
+        polys = np.full(COORDS.shape[0], None, dtype=object)
+        FINITE = np.isfinite(COORDS).all(axis=(1, 2))
+        polys[FINITE] = shapely.polygons(COORDS[FINITE])
+        #repair self-intersecting swath polygons
+        INVALID = FINITE.copy()
+        INVALID[FINITE] = ~shapely.is_valid(polys[FINITE])
+        polys[INVALID] = shapely.make_valid(polys[INVALID])
+        return polys
+    
+    def get_grid_keys(self) -> list:
+        return self.grid_keys
+    
+    def check_overlap(self, lon: np.array, lat: np.array, 
+                      required: np.array = None) -> tuple:
+        """
+        Parameters
+        ----------
+        lon : np.array
+            Swath bounding ring longitudes of shape (n, 4)
+        lat : np.array
+            Swath bounding ring latitudes of shape (n, 4)
+        required : np.array, optional
+            Boolean array of shape (n, number of AOI's) restricting the 
+            geometry work to the given swath/AOI pairs
+
+        Returns
+        -------
+        tuple
+            Indices of the overlapping swaths, the corresponding AOI names, 
+            and fractional coverages (in %) for all overlapping swath/AOI 
+            pairs
+        """
+        #drop all swaths in the wrong hemisphere before any geometry work
+        IN_HEMISPHERE = self.in_hemisphere(lat)
+        #as well as all swaths without any required swath/AOI pair
+        if required is not None:
+            IN_HEMISPHERE &= required.any(axis=1)
+        IN_HEMISPHERE = np.flatnonzero(IN_HEMISPHERE)
+        
+        """ Create Swath Polygons """
+        SWATH_POLYS = self.create_swath_polys(lon[IN_HEMISPHERE], 
+                                              lat[IN_HEMISPHERE])
+        
+        """ Check for Overlap with AOI Polygons """
+        #query spatial index for all intersecting swath/AOI pairs
+        POLY_IDX, AOI_IDX = self.tree.query(SWATH_POLYS, 
+                                            predicate='intersects')
+        SWATH_IDX = IN_HEMISPHERE[POLY_IDX]
+        #only keep the required pairs
+        if required is not None:
+            REQUIRED = required[SWATH_IDX, AOI_IDX]
+            POLY_IDX = POLY_IDX[REQUIRED]
+            AOI_IDX = AOI_IDX[REQUIRED]
+            SWATH_IDX = SWATH_IDX[REQUIRED]
+        SWATH_POLYS = SWATH_POLYS[POLY_IDX]
+        
+        #compute fractional coverage of all pairs at once
+        INTERSECTION = shapely.intersection(self.polys[AOI_IDX], 
+                                            SWATH_POLYS)
+        INTERSECTION_AREA = shapely.area(INTERSECTION)
+        FRACTION = np.round((INTERSECTION_AREA / self.areas[AOI_IDX])*100, 2)
+        
+        #return to caller
+        return SWATH_IDX, self.names[AOI_IDX], FRACTION
+    
+
 # In[]
 class AoiData(object):
-    def __init__(self, aois: list, scale_factor: float):
+    def __init__(self, aois: list, scale_factor: float, 
+                 registry: object = None):
         #status
         logger.info('Compile AOI grid specifications...')
         #loads the yaml reference file
@@ -192,6 +448,9 @@ class AoiData(object):
         self.refs = refaois['aois']
         #allocate container
         self.aoi_dict = {}
+        #on-disk aoi registry and persistent overlap cache if set
+        self.registry = registry
+        self.cache = None
         #loop over all user specified aoi's
         for aoi in aois:
             #status
@@ -203,15 +462,149 @@ class AoiData(object):
             grid = self.initiate_aoi_grid(fn, scale_factor)
             #store it
             self.aoi_dict[aoi] = grid
+        #store newly registered aoi's
+        if self.registry is not None:
+            self.registry.save()
+        #set batch overlap engines
+        self.set_overlap_engines()
         
     def get_aoi_grid_file(self, aoi: str) -> str:
         return self.refs[aoi]
     
     def initiate_aoi_grid(self, grid_file: str, scl: float) -> AoiGrid:
-        return AoiGrid(grid_file, scl)
+        return AoiGrid(grid_file, scl, self.registry)
     
     def get_aois(self) -> list:
         return self.aoi_dict.keys()
     
     def get_aoi(self, aoi: str) -> AoiGrid:
         return self.aoi_dict[aoi]
+    
+    def set_overlap_engines(self) -> None:
+        #group all aoi's by their hemisphere
+        hemispheres = {}
+        for aoi, grid in self.aoi_dict.items():
+            hemispheres.setdefault(grid.hemisphere, {})[aoi] = grid
+        #initiate one batch overlap engine per hemisphere
+        self.overlap = [AoiOverlap(hemisphere, grids) 
+                        for hemisphere, grids in hemispheres.items()]
+        
+    def set_overlap_cache(self, cache: object) -> None:
+        self.cache = cache
+        
+    def create_swath_polys(self, aoi: str, lon: np.array, 
+                           lat: np.array) -> np.array:
+        """
+        Parameters
+        ----------
+        aoi : str
+            AOI whose target CRS the swath polygons are projected to
+        lon : np.array
+            Swath bounding ring longitudes of shape (n, 4)
+        lat : np.array
+            Swath bounding ring latitudes of shape (n, 4)
+
+        Returns
+        -------
+        np.array
+            Array of n projected swath polygons, with None for all swaths 
+            that can not be represented in the target CRS; AOI's unknown to 
+            all overlap engines raise a KeyError
+        """
+        for engine in self.overlap:
+            if aoi in engine.names:
+                return engine.create_swath_polys(lon, lat)
+        raise KeyError(f'AOI {aoi} is not handled by any overlap engine!')
+        
+    def check_overlap(self, lon: np.array, lat: np.array, 
+                      granules: list = None) -> tuple:
+        """
+        Parameters
+        ----------
+        lon : np.array
+            Swath bounding ring longitudes of shape (n, 4)
+        lat : np.array
+            Swath bounding ring latitudes of shape (n, 4)
+        granules : list, optional
+            Granule names of all swaths; necessary to consult the overlap 
+            cache if set
+
+        Returns
+        -------
+        tuple
+            Indices of the overlapping swaths, the corresponding AOI names, 
+            and fractional coverages (in %) for all overlapping swath/AOI 
+            pairs of all AOI's; sorted by swath and the user-specified AOI
+            order
+        """
+        #use memoized overlaps if possible
+        if self.cache is not None and granules is not None:
+            return self._check_overlap_cached(lon, lat, granules)
+        IDX, AOI, FRAC = [], [], []
+        for engine in self.overlap:
+            idx, aoi, frac = engine.check_overlap(lon, lat)
+            IDX.append(idx)
+            AOI.append(aoi)
+            FRAC.append(frac)
+        return self._sort_overlap(IDX, AOI, FRAC)
+    
+    def _check_overlap_cached(self, lon: np.array, lat: np.array, 
+                              granules: list) -> tuple:
+        #look-up all known footprints and their memoized overlaps
+        FOOTPRINTS = self.cache.get_footprint_keys(granules, lon, lat)
+        CHECKED = self.cache.get_checked(FOOTPRINTS)
+        KNOWN = self.cache.get_overlaps(FOOTPRINTS)
+        POSITIONS = {}
+        for idx, FOOTPRINT in enumerate(FOOTPRINTS):
+            POSITIONS.setdefault(FOOTPRINT, []).append(idx)
+        
+        IDX, AOI, FRAC = [], [], []
+        checked, overlaps = {}, []
+        for engine in self.overlap:
+            GRID_IDS = [self.cache.get_grid_id(key) 
+                        for key in engine.get_grid_keys()]
+            NAMES = dict(zip(GRID_IDS, engine.names.tolist()))
+            
+            #reuse the known overlaps of this engine's aoi's
+            KNOWN_ENGINE = [(idx, NAMES[GRID_ID], FRACTION) 
+                            for FOOTPRINT, GRID_ID, FRACTION in KNOWN 
+                            if GRID_ID in NAMES
+                            for idx in POSITIONS[FOOTPRINT]]
+            if len(KNOWN_ENGINE) > 0:
+                idx, aoi, frac = zip(*KNOWN_ENGINE)
+                IDX.append(np.array(idx, dtype=int))
+                AOI.append(np.array(aoi))
+                FRAC.append(np.array(frac, dtype=float))
+            
+            #restrict the geometry work to all unknown swath/aoi pairs
+            REQUIRED = np.array([[GRID_ID not in CHECKED.get(FOOTPRINT, ())
+                                  for GRID_ID in GRID_IDS]
+                                 for FOOTPRINT in FOOTPRINTS], 
+                                dtype=bool).reshape(-1, len(GRID_IDS))
+            if not REQUIRED.any():
+                continue
+            idx, aoi, frac = engine.check_overlap(lon, lat, REQUIRED)
+            IDX.append(idx)
+            AOI.append(aoi)
+            FRAC.append(frac)
+            
+            #memoize all newly checked pairs
+            GRID_IDS = np.array(GRID_IDS)
+            for i in np.flatnonzero(REQUIRED.any(axis=1)):
+                checked.setdefault(FOOTPRINTS[i], set()).update(
+                    GRID_IDS[REQUIRED[i]].tolist())
+            AOI_IDS = dict(zip(engine.names.tolist(), GRID_IDS.tolist()))
+            overlaps.extend([(FOOTPRINTS[i], AOI_IDS[a], f) for i, a, f 
+                             in zip(idx.tolist(), aoi.tolist(), frac.tolist())])
+        self.cache.add(checked, overlaps)
+        return self._sort_overlap(IDX, AOI, FRAC)
+    
+    def _sort_overlap(self, IDX: list, AOI: list, FRAC: list) -> tuple:
+        IDX = np.concatenate(IDX) if IDX else np.array([], dtype=int)
+        AOI = np.concatenate(AOI) if AOI else np.array([], dtype=str)
+        FRAC = np.concatenate(FRAC) if FRAC else np.array([], dtype=float)
+        #sort by swath and aoi order
+        AOI_ORDER = {aoi: order for order, aoi in enumerate(self.aoi_dict)}
+        ORDER = np.array([AOI_ORDER[aoi] for aoi in AOI], dtype=int)
+        SORTED = np.lexsort((ORDER, IDX))
+        return IDX[SORTED], AOI[SORTED], FRAC[SORTED]
@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from dataclasses import dataclass
+from dataclasses import field
+from loguru import logger
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import requests
+import numpy as np
+
+
+# In[]
+
+@dataclass
+class CachedResponse:
+    """
+    Minimal stand-in for a requests.Response served from the local cache
+    """
+    status_code: int
+    content: bytes
+    headers: dict = field(default_factory=dict)
+    from_cache: bool = False
+
+
+class HttpCache(object):
+    """
+    On-disk HTTP cache for listing requests, storing the response bodies
+    together with their ETag/Last-Modified headers and revalidating them
+    with conditional requests once they are older than the maximum age
+    """
+    def __init__(self, path: str, max_age: float = 0.0,
+                 session: object = requests):
+        """
+        Parameters
+        ----------
+        path : str
+            Cache directory
+        max_age : float, optional
+            Default age in seconds after which an entry is revalidated
+        session : object, optional
+            requests module or Session to use for the actual retrievals
+        """
+        self.path = path
+        self.max_age = max_age
+        self.session = session
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def _get_entry_path(self, url: str) -> str:
+        KEY = hashlib.sha1(url.encode('UTF-8')).hexdigest()
+        return os.path.join(self.path, KEY)
+
+    def _load_entry(self, url: str) -> dict:
+        ENTRY = self._get_entry_path(url)
+        try:
+            with open(f'{ENTRY}.json') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or not os.path.isfile(f'{ENTRY}.body'):
+            return None
+        return meta
+
+    def _load_body(self, url: str) -> bytes:
+        with open(f'{self._get_entry_path(url)}.body', 'rb') as f:
+            return f.read()
+
+    def _write_atomic(self, path: str, content: bytes) -> None:
+        TMP_PATH = f'{path}.{os.getpid()}.tmp'
+        with open(TMP_PATH, 'wb') as f:
+            f.write(content)
+        os.replace(TMP_PATH, path)
+
+    def _store_entry(self, url: str, meta: dict,
+                     content: bytes = None) -> None:
+        ENTRY = self._get_entry_path(url)
+        if content is not None:
+            self._write_atomic(f'{ENTRY}.body', content)
+        self._write_atomic(f'{ENTRY}.json', json.dumps(meta).encode('UTF-8'))
+
+    def get(self, url: str, headers: dict = None,
+            max_age: float = None) -> object:
+        """
+        Parameters
+        ----------
+        url : str
+            Url to retrieve
+        headers : dict, optional
+            Additional request headers, e.g., for authentication
+        max_age : float, optional
+            Age in seconds after which a cached entry is revalidated;
+            overrides the default and may be float('inf') to never
+            revalidate an entry again
+
+        Returns
+        -------
+        object
+            requests.Response for fresh/failed retrievals or a
+            CachedResponse for entries served from disk, including stale
+            entries if their revalidation fails
+        """
+        MAX_AGE = self.max_age if max_age is None else max_age
+        meta = self._load_entry(url)
+
+        #serve fresh entries directly from disk
+        if meta is not None and time.time() - meta['fetched'] < MAX_AGE:
+            return CachedResponse(200, self._load_body(url),
+                                  meta['headers'], True)
+
+        #revalidate existing entries with a conditional request
+        headers = dict(headers or {})
+        if meta is not None:
+            ETAG = meta['headers'].get('ETag')
+            LAST_MODIFIED = meta['headers'].get('Last-Modified')
+            if ETAG is not None:
+                headers['If-None-Match'] = ETAG
+            if LAST_MODIFIED is not None:
+                headers['If-Modified-Since'] = LAST_MODIFIED
+        try:
+            r = self.session.get(url, headers=headers)
+        except requests.exceptions.RequestException as e:
+            #fall back to the stale entry if the server is unreachable
+            if meta is None:
+                raise
+            logger.warning(f'Revalidation failed ({e}), using cached '+
+                           f'listing!')
+            return CachedResponse(200, self._load_body(url),
+                                  meta['headers'], True)
+
+        #unchanged upstream
+        if r.status_code == 304 and meta is not None:
+            meta['fetched'] = time.time()
+            self._store_entry(url, meta)
+            return CachedResponse(200, self._load_body(url),
+                                  meta['headers'], True)
+
+        #new or changed upstream
+        if r.status_code == 200:
+            HEADERS = {key: r.headers[key]
+                       for key in ['ETag', 'Last-Modified']
+                       if key in r.headers}
+            meta = {'url': url,
+                    'fetched': time.time(),
+                    'headers': HEADERS,
+                    }
+            self._store_entry(url, meta, r.content)
+            return r
+
+        #fall back to the stale entry in case the revalidation failed
+        if meta is not None:
+            logger.warning(f'Revalidation failed ({r.status_code}), using '+
+                           f'cached listing!')
+            return CachedResponse(200, self._load_body(url),
+                                  meta['headers'], True)
+        return r
+
+
+class OverlapCache(object):
+    """
+    Persistent sqlite-based memoization of swath/AOI overlaps, keyed by the 
+    granule footprint (granule name and bounding ring) and the AOI grid 
+    definition, so that only new swath/AOI pairs require any geometry work
+    """
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+        path : str
+            Cache database file
+        """
+        self.path = path
+        FOLDER = os.path.dirname(path)
+        if FOLDER and not os.path.isdir(FOLDER):
+            os.makedirs(FOLDER)
+        self.db = sqlite3.connect(path)
+        #footprints and the AOI grids they were checked against, stored per 
+        #check as the set of grid ids to keep the table small
+        self.db.execute('CREATE TABLE IF NOT EXISTS grids ('+
+                        'id INTEGER PRIMARY KEY, key TEXT UNIQUE)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS checked ('+
+                        'footprint BLOB, grids TEXT)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS checked_footprint '+
+                        'ON checked (footprint)')
+        #fractional coverages of all intersecting swath/AOI pairs
+        self.db.execute('CREATE TABLE IF NOT EXISTS overlaps ('+
+                        'footprint BLOB, grid INTEGER, frac REAL, '+
+                        'PRIMARY KEY (footprint, grid)) WITHOUT ROWID')
+        self.db.commit()
+        self.grid_ids = {}
+        
+    @staticmethod
+    def get_footprint_keys(granules: list, lon: np.array, 
+                           lat: np.array) -> list:
+        """
+        Parameters
+        ----------
+        granules : list
+            Granule names of all swaths
+        lon : np.array
+            Swath bounding ring longitudes of shape (n, 4)
+        lat : np.array
+            Swath bounding ring latitudes of shape (n, 4)
+
+        Returns
+        -------
+        list
+            Footprint keys of all swaths
+        """
+        RING = np.ascontiguousarray(np.hstack([lon, lat]), dtype='<f8')
+        return [hashlib.sha1(granule.encode('UTF-8') + ring.tobytes())
+                .digest()[:16] for granule, ring in zip(granules, RING)]
+    
+    def get_grid_id(self, grid_key: str) -> int:
+        if grid_key not in self.grid_ids:
+            self.db.execute('INSERT OR IGNORE INTO grids (key) VALUES (?)',
+                            (grid_key,))
+            ID = self.db.execute('SELECT id FROM grids WHERE key = ?',
+                                 (grid_key,)).fetchone()[0]
+            self.grid_ids[grid_key] = ID
+        return self.grid_ids[grid_key]
+    
+    def _select(self, query: str, footprints: list) -> list:
+        #chunk the lookup to stay within the sqlite variable limit
+        CHUNK = 500
+        rows = []
+        for i in range(0, len(footprints), CHUNK):
+            KEYS = footprints[i:i+CHUNK]
+            MARKS = ','.join('?' * len(KEYS))
+            rows.extend(self.db.execute(query.format(MARKS), KEYS))
+        return rows
+    
+    def get_checked(self, footprints: list) -> dict:
+        """
+        Parameters
+        ----------
+        footprints : list
+            Footprint keys as returned by get_footprint_keys()
+
+        Returns
+        -------
+        dict
+            All grid ids each known footprint was already checked against
+        """
+        QUERY = 'SELECT footprint, grids FROM checked WHERE footprint IN ({})'
+        checked = {}
+        for FOOTPRINT, GRIDS in self._select(QUERY, footprints):
+            checked.setdefault(FOOTPRINT, set()).update(
+                [int(grid) for grid in GRIDS.split(',')])
+        return checked
+    
+    def get_overlaps(self, footprints: list) -> list:
+        """
+        Parameters
+        ----------
+        footprints : list
+            Footprint keys as returned by get_footprint_keys()
+
+        Returns
+        -------
+        list
+            All (footprint, grid id, fraction) tuples of intersecting pairs
+        """
+        QUERY = ('SELECT footprint, grid, frac FROM overlaps '+
+                 'WHERE footprint IN ({})')
+        return self._select(QUERY, footprints)
+    
+    def add(self, checked: dict, overlaps: list) -> None:
+        """
+        Parameters
+        ----------
+        checked : dict
+            Footprint keys and the grid ids they were newly checked against
+        overlaps : list
+            (footprint, grid id, fraction) tuples of all intersecting pairs
+        """
+        CHECKED = [(FOOTPRINT, ','.join([str(grid) for grid in sorted(GRIDS)]))
+                   for FOOTPRINT, GRIDS in checked.items() if len(GRIDS) > 0]
+        self.db.executemany('INSERT INTO checked VALUES (?, ?)', CHECKED)
+        self.db.executemany('INSERT OR REPLACE INTO overlaps VALUES (?, ?, ?)',
+                            overlaps)
+        self.db.commit()
+
+
+class AoiRegistryCache(object):
+    """
+    On-disk registry of the AOI grid definitions and their projected AOI 
+    polygons, keyed by the grid file content and scale factor, to skip 
+    any grid/polygon computation on startup
+    """
+    def __init__(self, path: str, version: int = 1):
+        """
+        Parameters
+        ----------
+        path : str
+            Registry file
+        version : int, optional
+            Version of the polygon computation, invalidating older entries
+        """
+        self.path = path
+        self.version = version
+        FOLDER = os.path.dirname(path)
+        if FOLDER and not os.path.isdir(FOLDER):
+            os.makedirs(FOLDER)
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.modified = False
+        
+    def _get_key(self, content: bytes, scale_factor: float) -> str:
+        HASH = hashlib.sha1(content).hexdigest()
+        return f'{HASH}:{float(scale_factor)}:{self.version}'
+    
+    def get(self, content: bytes, scale_factor: float) -> dict:
+        """
+        Parameters
+        ----------
+        content : bytes
+            Raw content of the AOI grid file
+        scale_factor : float
+            Scale factor of the AOI grid
+
+        Returns
+        -------
+        dict
+            The registered grid definition, target CRS, and projected AOI 
+            polygon (as WKB hex string) or None if not registered yet
+        """
+        return self.entries.get(self._get_key(content, scale_factor), None)
+    
+    def add(self, content: bytes, scale_factor: float, entry: dict) -> None:
+        self.entries[self._get_key(content, scale_factor)] = entry
+        self.modified = True
+        
+    def save(self) -> None:
+        #only write the registry in case of new entries
+        if not self.modified:
+            return
+        TMP_PATH = f'{self.path}.{os.getpid()}.tmp'
+        with open(TMP_PATH, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(TMP_PATH, self.path)
+        self.modified = False
+
+
+class GranuleCache(object):
+    """
+    Persistent content-addressed cache of raw granule files, indexed by the 
+    granule name and the checksum of its content, which may be shared across
+    jobs and sensors and is kept within a disk budget by evicting the least 
+    recently used granules
+    """
+    def __init__(self, path: str, budget: int):
+        """
+        Parameters
+        ----------
+        path : str
+            Cache directory
+        budget : int
+            Maximum total size [bytes] of all cached granules
+        """
+        self.path = path
+        self.budget = budget
+        self.objects = os.path.join(path, 'objects')
+        if not os.path.isdir(self.objects):
+            os.makedirs(self.objects)
+        #several jobs may share the index
+        self.db = sqlite3.connect(os.path.join(path, 'index.sqlite'), 
+                                  timeout=60, check_same_thread=False)
+        self.db.execute('CREATE TABLE IF NOT EXISTS granules ('+
+                        'name TEXT PRIMARY KEY, checksum TEXT, '+
+                        'size INTEGER, last_used REAL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS granules_checksum '+
+                        'ON granules (checksum)')
+        self.db.commit()
+        #the index is also used by background retrievals
+        self.lock = threading.RLock()
+        
+    def _get_object_path(self, checksum: str) -> str:
+        return os.path.join(self.objects, checksum[:2], checksum)
+    
+    @staticmethod
+    def get_checksum(path: str) -> str:
+        #sha256 of the file content, read in chunks
+        HASH = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(8 * 1024**2), b''):
+                HASH.update(chunk)
+        return HASH.hexdigest()
+    
+    def _place(self, source: str, target: str) -> None:
+        #hard links avoid any copy on the same file system
+        TMP_PATH = f'{target}.{os.getpid()}.tmp'
+        try:
+            os.link(source, TMP_PATH)
+        except OSError:
+            shutil.copyfile(source, TMP_PATH)
+        os.replace(TMP_PATH, target)
+        
+    def get(self, name: str, target: str) -> bool:
+        """
+        Parameters
+        ----------
+        name : str
+            Granule file name
+        target : str
+            Path to place the cached granule at
+
+        Returns
+        -------
+        bool
+            Whether the granule was cached and placed at the target path
+        """
+        with self.lock:
+            ROW = self.db.execute('SELECT checksum, size FROM granules '+
+                                  'WHERE name = ?', (name,)).fetchone()
+            if ROW is None:
+                return False
+            CHECKSUM, SIZE = ROW
+            OBJECT_PATH = self._get_object_path(CHECKSUM)
+            #drop index entries of lost or damaged objects
+            if not os.path.isfile(OBJECT_PATH) or \
+                os.path.getsize(OBJECT_PATH) != SIZE:
+                self.db.execute('DELETE FROM granules WHERE name = ?', 
+                                (name,))
+                self.db.commit()
+                return False
+            self._place(OBJECT_PATH, target)
+            self.db.execute('UPDATE granules SET last_used = ? WHERE name = ?',
+                            (time.time(), name))
+            self.db.commit()
+            #status
+            logger.info(f'Granule {name} restored from cache!')
+            return True
+    
+    def add(self, name: str, source: str) -> None:
+        """
+        Parameters
+        ----------
+        name : str
+            Granule file name
+        source : str
+            Path of the complete granule file to cache; granules already 
+            cached under the same name and size, e.g., restored ones 
+            sharing the inode of their object, are not hashed again
+        """
+        SIZE = os.path.getsize(source)
+        if SIZE > self.budget:
+            return
+        with self.lock:
+            if self._touch(name, SIZE):
+                return
+        CHECKSUM = self.get_checksum(source)
+        with self.lock:
+            OBJECT_PATH = self._get_object_path(CHECKSUM)
+            if not os.path.isfile(OBJECT_PATH):
+                FOLDER = os.path.dirname(OBJECT_PATH)
+                if not os.path.isdir(FOLDER):
+                    os.makedirs(FOLDER)
+                self._place(source, OBJECT_PATH)
+            self.db.execute('INSERT OR REPLACE INTO granules '+
+                            'VALUES (?, ?, ?, ?)', 
+                            (name, CHECKSUM, SIZE, time.time()))
+            self.db.commit()
+            self.evict()
+        
+    def _touch(self, name: str, size: int) -> bool:
+        #marks an indexed granule of the same size as recently used
+        ROW = self.db.execute('SELECT checksum, size FROM granules '+
+                              'WHERE name = ?', (name,)).fetchone()
+        if ROW is None or ROW[1] != size or \
+            not os.path.isfile(self._get_object_path(ROW[0])):
+            return False
+        self.db.execute('UPDATE granules SET last_used = ? WHERE name = ?',
+                        (time.time(), name))
+        self.db.commit()
+        return True
+        
+    def get_size(self) -> int:
+        #total size [bytes] of all cached objects
+        with self.lock:
+            ROW = self.db.execute('SELECT SUM(size) FROM (SELECT MAX(size) '+
+                                  'AS size FROM granules GROUP BY checksum)'
+                                  ).fetchone()
+            return ROW[0] or 0
+        
+    def evict(self, budget: int = None) -> None:
+        #remove the least recently used objects until within the budget, 
+        #e.g., a smaller one to free scratch space
+        if budget is None:
+            budget = self.budget
+        with self.lock:
+            ROWS = self.db.execute('SELECT checksum, MAX(size), '+
+                                   'MAX(last_used) FROM granules '+
+                                   'GROUP BY checksum '+
+                                   'ORDER BY MAX(last_used)').fetchall()
+            TOTAL = sum([SIZE for _, SIZE, _ in ROWS])
+            for CHECKSUM, SIZE, _ in ROWS:
+                if TOTAL <= budget:
+                    break
+                self.db.execute('DELETE FROM granules WHERE checksum = ?', 
+                                (CHECKSUM,))
+                OBJECT_PATH = self._get_object_path(CHECKSUM)
+                if os.path.isfile(OBJECT_PATH):
+                    os.remove(OBJECT_PATH)
+                TOTAL -= SIZE
+                #status
+                logger.info(f'Evicted granule {CHECKSUM[:12]} from cache')
+            self.db.commit()
@@ -5,6 +5,8 @@
 
 # In[]
 from aoi import AoiData
+from aoi import AoiGrid
+from cache import AoiRegistryCache
 
 from loguru import logger
 
@@ -124,13 +126,24 @@ class Configuration(object):
         #returns the scale if present or 1.0 as default
         return self.config['meta'].get('scale', 1.0)
     
+    @property
+    def apply_aoi_cache(self) -> bool:
+        #returns the status whether to register aoi polygons on disk or not
+        return self.config['meta'].get('aoi_cache', False)
+    
     def compile_aoi_data(self) -> None:
         #returns the user specified aoi's
         USER_AOIS = self.user_aois
         #and scale
         SCALE_FACTOR = self.aoi_scale_factor
+        #on-disk aoi registry if specified
+        REGISTRY = None
+        if self.apply_aoi_cache:
+            REGISTRY_FILE = os.path.join(self.output_path, 'cache', 
+                                         'aoi_registry.json')
+            REGISTRY = AoiRegistryCache(REGISTRY_FILE, AoiGrid.VERSION)
         #initiates and populates the AOI Data Handler
-        AOI = AoiData(USER_AOIS, SCALE_FACTOR)
+        AOI = AoiData(USER_AOIS, SCALE_FACTOR, REGISTRY)
         #returns to caller
         self.aoidata = AOI
     
@@ -152,6 +165,188 @@ class Configuration(object):
         #returns the status whether to override existing listings or not
         return self.config['listing']['override']
     
+    @property
+    def listing_handler(self) -> object:
+        #returns the listing i/o handler or the csv-based one as default
+        class_name = self.config['listing'].get('io', 'ListingIO')
+        module_name = 'iotools'
+        return self.get_class(module_name, class_name)
+    
+    @property
+    def listing_min_fraction(self) -> float:
+        #returns the minimum aoi overlap fraction [%] or 5.0 as default
+        return float(self.config['listing'].get('min_frac', 5.0))
+    
+    @property
+    def listing_filter(self) -> dict:
+        #returns the user-specified geoMeta prefilter or an empty dict
+        return self.config['listing'].get('filter', None) or {}
+    
+    @property
+    def apply_listing_cache(self) -> bool:
+        #returns the status whether to cache listing retrievals or not
+        return self.config['listing'].get('cache', {}).get('apply', False)
+    
+    @property
+    def listing_cache_max_age(self) -> float:
+        #returns the age [s] after which cached listings are revalidated
+        CACHE = self.config['listing'].get('cache', {})
+        return float(CACHE.get('max_age', 0.0))
+    
+    @property
+    def listing_cache_final_after(self) -> int:
+        #returns the number of days after which listings are considered 
+        #final and never revalidated again or None
+        CACHE = self.config['listing'].get('cache', {})
+        return CACHE.get('final_after', None)
+    
+    @property
+    def apply_overlap_cache(self) -> bool:
+        #returns the status whether to memoize swath/aoi overlaps or not
+        OVERLAP_CACHE = self.config['listing'].get('overlap_cache', {})
+        return OVERLAP_CACHE.get('apply', False)
+    
+    @property
+    def apply_listing_diff(self) -> bool:
+        #returns the status whether to only retrieve upstream changes or not
+        return self.config['listing'].get('diff', {}).get('apply', False)
+    
+    @property
+    def apply_incremental_listing(self) -> bool:
+        #returns the status whether to refresh recent listings incrementally
+        INCREMENTAL = self.config['listing'].get('incremental', {})
+        return INCREMENTAL.get('apply', False)
+    
+    @property
+    def incremental_listing_days(self) -> int:
+        #returns the number of most recent days to refresh incrementally
+        return self.config['listing']['incremental'].get('days', 1)
+    
+    @property
+    def listing_workers(self) -> int:
+        #returns the number of concurrent geoMeta retrievals or 1 as default
+        return max(int(self.config['listing'].get('workers', 1)), 1)
+    
+    @property
+    def apply_planning(self) -> bool:
+        #returns the status whether to plan the granule selection or not
+        return self.config.get('planning', {}).get('apply', False)
+    
+    @property
+    def planning_bin(self) -> float:
+        #returns the time bin [h] of the granule selection or 1 as default
+        return float(self.config['planning'].get('bin', 1))
+    
+    def _get_planning_parameter(self, parameter: str, aoi: str,
+                                default: float) -> float:
+        #returns the aoi-specific planning parameter or its default
+        VALUES = self.config['planning'].get(parameter, None) or {}
+        if not isinstance(VALUES, dict):
+            return float(VALUES)
+        return float(VALUES.get(aoi, VALUES.get('default', default)))
+    
+    def get_planning_target(self, aoi: str) -> float:
+        #returns the coverage target [%] of the aoi or 95.0 as default
+        return self._get_planning_parameter('target', aoi, 95.0)
+    
+    def get_planning_min_gain(self, aoi: str) -> float:
+        #returns the minimum additional coverage [%] of a granule to be 
+        #selected for the aoi or the minimum listing fraction as default
+        MIN_FRAC = self.listing_min_fraction
+        return self._get_planning_parameter('min_gain', aoi, MIN_FRAC)
+    
+    @property
+    def retry_policy(self) -> dict:
+        #returns the retry policy parameters of all retrievals
+        RETRY = self.config.get('retry', None) or {}
+        return {'retries': int(RETRY.get('retries', 5)),
+                'backoff': float(RETRY.get('backoff', 1.0)),
+                'max_backoff': float(RETRY.get('max_backoff', 120.0)),
+                }
+    
+    @property
+    def circuit_breaker(self) -> dict:
+        #returns the host-level circuit breaker parameters of all retrievals
+        RETRY = self.config.get('retry', None) or {}
+        BREAKER = RETRY.get('breaker', None) or {}
+        return {'threshold': int(BREAKER.get('threshold', 5)),
+                'cooldown': float(BREAKER.get('cooldown', 30.0)),
+                'max_cooldown': float(BREAKER.get('max_cooldown', 900.0)),
+                }
+    
+    @property
+    def download_chunk_size(self) -> int:
+        #returns the streaming chunk size [bytes] from the specified size 
+        #[MB] or 8 MB as default
+        DOWNLOAD = self.config['retrieval'].get('download', None) or {}
+        return int(float(DOWNLOAD.get('chunk_size', 8)) * 1024**2)
+    
+    @property
+    def download_workers(self) -> int:
+        #returns the number of concurrent swath downloads or 1 as default
+        DOWNLOAD = self.config['retrieval'].get('download', None) or {}
+        return max(int(DOWNLOAD.get('workers', 1)), 1)
+    
+    @property
+    def in_memory_limit(self) -> int:
+        #returns the maximum size [bytes] of swath files retrieved into 
+        #memory from the specified size [MB] or 0 (disabled) as default
+        DOWNLOAD = self.config['retrieval'].get('download', None) or {}
+        return int(float(DOWNLOAD.get('in_memory', 0)) * 1024**2)
+    
+    @property
+    def prefetch_count(self) -> int:
+        #returns the number of swaths retrieved in the background or 0 as 
+        #default
+        return max(int(self.config['retrieval'].get('prefetch', 0)), 0)
+    
+    @property
+    def apply_remote_zip(self) -> bool:
+        #returns the status whether to retrieve only the necessary members 
+        #of remote zip files or not
+        return self.config['retrieval'].get('remote_zip', False)
+    
+    @property
+    def read_zip_members(self) -> bool:
+        #returns the status whether to read the members of zip files in 
+        #place instead of extracting them or not
+        return self.config['retrieval'].get('read_zip_members', False)
+    
+    @property
+    def scratch_quota(self) -> int:
+        #returns the scratch quota [bytes] from the specified quota [GB] or 0
+        #(unlimited) as default
+        QUOTA = self.config['retrieval'].get('scratch_quota', 0)
+        return int(float(QUOTA) * 1024**3)
+    
+    @property
+    def apply_granule_cache(self) -> bool:
+        #returns the status whether to keep raw granules in a cache or not
+        GRANULE_CACHE = self.config['retrieval'].get('granule_cache', {})
+        return (GRANULE_CACHE or {}).get('apply', False)
+    
+    @property
+    def granule_cache_path(self) -> str:
+        #returns the granule cache directory or the one within the output 
+        #directory as default
+        GRANULE_CACHE = self.config['retrieval'].get('granule_cache', {})
+        DEFAULT_PATH = os.path.join(self.output_path, 'cache', 'granules')
+        return GRANULE_CACHE.get('path', None) or DEFAULT_PATH
+    
+    @property
+    def granule_cache_budget(self) -> int:
+        #returns the granule cache budget [bytes] from the specified budget
+        #[GB] or 100 GB as default
+        GRANULE_CACHE = self.config['retrieval'].get('granule_cache', {})
+        return int(float(GRANULE_CACHE.get('budget', 100)) * 1024**3)
+    
+    @property
+    def download_progress_step(self) -> float:
+        #returns the progress [%] between download status messages or 10 
+        #as default
+        DOWNLOAD = self.config['retrieval'].get('download', None) or {}
+        return float(DOWNLOAD.get('progress', 10))
+    
     @property
     def apply_swath_download(self) -> bool:
         #returns the status of the actual file retrieval
@@ -167,6 +362,11 @@ class Configuration(object):
         class_name = 'ListingProcessor'
         return self.get_class(module_name, class_name)
 
+    def get_planner_class(self) -> object:
+        module_name = 'planning'
+        class_name = 'CoveragePlanner'
+        return self.get_class(module_name, class_name)
+    
     def get_retrieval_class(self) -> object:
         module_name = 'retrieval'
         class_name = 'Retrieval'
@@ -200,6 +400,12 @@ class Configuration(object):
         listing_proc = listing_proc(self, **listing_modules)
         return self.get_listing_class()(listing_proc)
     
+    """ Job::Planning """
+    def setup_planning_module(self) -> object:
+        #status
+        logger.info(f'Initiate planning class...')
+        return self.get_planner_class()(self)
+    
     """ Job::Retrieval """
     def setup_retrieval_module(self) -> object:
         retrieval_modules = self.config['retrieval']['modules']
@@ -223,6 +429,15 @@ class Configuration(object):
         INPUT_HANDLER = self.input_handler()
         OUTPUT_HANDLER = self.output_handler()
         return SWATHIO(INPUT_HANDLER, OUTPUT_HANDLER)
+    
+    def setup_pending_io(self) -> object:
+        #pending work list of the diff mode next to the listings
+        module_name = 'iotools'
+        class_name = 'PendingListingIO'
+        PENDINGIO = self.get_class(module_name, class_name)
+        PENDING_FILE = f'{self.carrier}_{self.sensor}_pending.csv'
+        return PENDINGIO(os.path.join(self.output_path, 'listing', 
+                                      PENDING_FILE))
 
     """ Proc::MetaData """
     def get_meta_module(self) -> object:
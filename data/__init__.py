@@ -6,4 +6,10 @@
 # In[] 
 
 from .listing import ListingData
+from .listing import GeoMetaEntries
+from .listing import GeoMetaListing
+from .listing import GeoMetaParser
+from .listing import GeoMetaFilter
+from .listing import GranuleIndex
+from .listing import ListingDiff
 from .swath import *
\ No newline at end of file
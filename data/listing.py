@@ -4,9 +4,14 @@
 """
 
 # In[]
- 
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import time
+
 import pandas as pd
 import numpy as np
+import io
 
 # In[]
 
@@ -16,23 +21,417 @@ class ListingData(object):
     other classes using pandas dataframes
     """
     def __init__(self):
-        self.lst = pd.DataFrame()
-        
-    def add_to_listing(self, df: pd.DataFrame) -> None:
+        #columnar accumulator of the current day
+        self.columns = {}
+        #materialized daily listings and the overall listing
+        self.days = {}
+        self.lst = None
+        self.tmp = pd.DataFrame()
+
+    def add_entries(self, **columns) -> None:
+        """
+        Parameters
+        ----------
+        **columns : list
+            Column name and values of the entries to add to the current day's
+            listing; only extends plain lists, which are materialized once
+            the day is committed
+        """
+        for key, values in columns.items():
+            self.columns.setdefault(key, []).extend(values)
+
+    def commit_entries(self, day: tuple) -> None:
+        #materialize the accumulated entries of the current day
+        df = pd.DataFrame(self.columns)
+        self.columns = {}
+        #add to overall listing
+        self.add_to_listing(df, day)
+
+    def add_to_listing(self, df: pd.DataFrame, day: tuple,
+                       append: bool = False) -> None:
+        #extend an already existing listing of the day if specified
+        if append and day in self.days:
+            df = pd.concat([self.days[day], df], ignore_index=True)
         #store current addition
+        df = self._set_categoricals(df)
         self.set_current_listing(df)
-        #add to overall listing
-        self.lst = pd.concat([self.lst, df])
-        self.lst = self.lst.reset_index().drop('index', axis=1)
-        
+        #add to overall listing, which is only compiled on demand
+        self.days[day] = df
+        self.lst = None
+
+    def _set_categoricals(self, df: pd.DataFrame) -> pd.DataFrame:
+        #aoi names and url prefixes only have a handful of distinct values
+        CATEGORICALS = ['aoi', 'url', 'url_mxd03', 'url_mxd02']
+        for column in CATEGORICALS:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        return df
+
+    def _compile_listing(self) -> pd.DataFrame:
+        if len(self.days) == 0:
+            return pd.DataFrame()
+        #unify categories so the concatenation stays categorical, while 
+        #empty days without any categories are skipped
+        days = [self.days[day] for day in sorted(self.days)
+                if self.days[day].shape[0] > 0]
+        if len(days) == 0:
+            return pd.concat(list(self.days.values()), ignore_index=True)
+        for column in days[0].columns:
+            categorical = [isinstance(df[column].dtype, pd.CategoricalDtype)
+                           for df in days if column in df.columns]
+            if not all(categorical):
+                continue
+            categories = pd.api.types.union_categoricals(
+                [df[column] for df in days if column in df.columns],
+                ignore_order=True).categories
+            for df in days:
+                if column in df.columns:
+                    df[column] = df[column].cat.set_categories(categories)
+        return pd.concat(days, ignore_index=True)
+
     def set_current_listing(self, df: pd.DataFrame) -> None:
         self.tmp = df
 
     def get_listing(self) -> pd.DataFrame():
+        if self.lst is None:
+            self.lst = self._compile_listing()
         return self.lst
-    
+
     def get_current_listing(self) -> pd.DataFrame():
         return self.tmp
-    
+
     def get_number_of_entries(self) -> int:
-        return self.lst.shape[0]
\ No newline at end of file
+        return sum([df.shape[0] for df in self.days.values()])
+
+
+@dataclass
+class GeoMetaEntries:
+    """ Typed columns of all parsed entries of a geoMeta listing """
+    file: np.ndarray
+    start: np.ndarray
+    daynight: np.ndarray
+    lon: np.ndarray
+    lat: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.file)
+    
+    def __getitem__(self, item: np.ndarray) -> GeoMetaEntries:
+        return GeoMetaEntries(self.file[item], self.start[item], 
+                              self.daynight[item], self.lon[item], 
+                              self.lat[item])
+
+
+class GeoMetaFilter(object):
+    """
+    Prefilter of geoMeta listing entries on their day/night flag and start 
+    time, applied before any overlap testing
+    """
+    def __init__(self, daynight: list = None, time_of_day: list = None, 
+                 period: list = None):
+        """
+        Parameters
+        ----------
+        daynight : list, optional
+            Day/night flags to keep, e.g., [N, B] for all granules containing
+            night-time data
+        time_of_day : list, optional
+            UTC time-of-day window ['HH:MM', 'HH:MM'] of the granule start 
+            time, which may wrap around midnight; also given as minutes of 
+            the day or datetime.time
+        period : list, optional
+            Acquisition time range [start, stop] of the granule start time
+        """
+        self.daynight = daynight
+        self.time_of_day = time_of_day
+        self.period = period
+        
+    @property
+    def active(self) -> bool:
+        return any([self.daynight, self.time_of_day, self.period])
+        
+    def _get_minutes(self, hhmm: object) -> int:
+        #unquoted HH:MM values are read as sexagesimal minutes by YAML
+        if isinstance(hhmm, (int, np.integer)):
+            return int(hhmm)
+        if isinstance(hhmm, time):
+            return hhmm.hour * 60 + hhmm.minute
+        HH, MM = str(hhmm).split(':')[:2]
+        return int(HH) * 60 + int(MM)
+    
+    def apply(self, entries: GeoMetaEntries) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        entries : GeoMetaEntries
+            Parsed geoMeta listing entries
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask of all entries passing the filter
+        """
+        VALID = np.ones(len(entries), dtype=bool)
+        #day/night flag
+        if self.daynight:
+            FLAGS = [str(flag).upper()[:1] for flag in self.daynight]
+            VALID &= np.isin(entries.daynight, FLAGS)
+        #utc time-of-day window
+        if self.time_of_day:
+            START = self._get_minutes(self.time_of_day[0])
+            STOP = self._get_minutes(self.time_of_day[1])
+            DAY = entries.start.astype('datetime64[D]')
+            MINUTES = (entries.start - DAY).astype('timedelta64[m]')
+            MINUTES = MINUTES.astype(int)
+            if START <= STOP:
+                IN_WINDOW = (MINUTES >= START) & (MINUTES <= STOP)
+            else:
+                IN_WINDOW = (MINUTES >= START) | (MINUTES <= STOP)
+            VALID &= IN_WINDOW & ~np.isnat(entries.start)
+        #acquisition time range
+        if self.period:
+            START = np.datetime64(str(self.period[0]))
+            STOP = np.datetime64(str(self.period[1]))
+            VALID &= (entries.start >= START) & (entries.start <= STOP)
+        return VALID
+
+
+@dataclass
+class GeoMetaListing:
+    """ Parsed geoMeta listing and the extent of all its complete lines """
+    entries: GeoMetaEntries
+    nbytes: int
+    nlines: int
+
+
+class GeoMetaParser(object):
+    """
+    Streaming parser for geoMeta listings, extracting only the necessary 
+    columns line by line into typed numpy arrays
+    """
+    #listing file consists of various meta information w/ 
+    #line[0]:=file_name; line[1]:=StartDateTime; line[4]:=DayNightFlag; 
+    #line[9:12]:=RingLON; line[13:16]:=RingLAT
+    COLUMNS = 17
+    
+    def __init__(self, chunk_size: int = 4096):
+        """
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of entries converted into numpy arrays at once
+        """
+        self.chunk_size = chunk_size
+    
+    def parse(self, content: bytes, header_lines: int = 3) -> GeoMetaEntries:
+        """
+        Parameters
+        ----------
+        content : bytes
+            Raw geoMeta listing as retrieved from LAADS
+        header_lines : int, optional
+            Number of leading header lines to skip
+
+        Returns
+        -------
+        GeoMetaEntries
+            All complete entries of the listing; an incomplete last line is
+            ignored
+        """
+        return self.parse_lines(io.BytesIO(content), header_lines)
+    
+    def parse_stream(self, chunks: object, 
+                     header_lines: int = 3) -> GeoMetaListing:
+        """
+        Parameters
+        ----------
+        chunks : object
+            Iterable of raw listing chunks of arbitrary size, e.g., the 
+            content of a streamed response
+        header_lines : int, optional
+            Number of leading header lines to skip
+
+        Returns
+        -------
+        GeoMetaListing
+            All complete entries of the listing, parsed while the chunks 
+            arrive, and the extent of all complete lines
+        """
+        EXTENT = [0, 0]
+        ENTRIES = self.parse_lines(self._split_lines(chunks, EXTENT), 
+                                   header_lines)
+        return GeoMetaListing(ENTRIES, *EXTENT)
+    
+    def _split_lines(self, chunks: object, extent: list) -> object:
+        #yields the lines of all chunks including their line breaks, while
+        #counting the bytes and number of all complete lines
+        REST = b''
+        for chunk in chunks:
+            LINES = (REST + chunk).split(b'\n')
+            REST = LINES.pop()
+            for line in LINES:
+                extent[0] += len(line) + 1
+                extent[1] += 1
+                yield line + b'\n'
+        #incomplete trailing line, which is skipped by the parser
+        if REST:
+            yield REST
+    
+    def parse_lines(self, lines: object, 
+                    header_lines: int = 3) -> GeoMetaEntries:
+        """
+        Parameters
+        ----------
+        lines : object
+            Iterable of raw listing lines including their line breaks, e.g.,
+            a file object or a streamed response
+        header_lines : int, optional
+            Number of leading header lines to skip
+
+        Returns
+        -------
+        GeoMetaEntries
+            All complete entries of the listing
+        """
+        chunks, files, start, daynight, ring = [], [], [], [], []
+        for n, line in enumerate(lines):
+            #skip header and incomplete trailing lines
+            if n < header_lines or not line.endswith(b'\n'):
+                continue
+            FIELDS = line.split(b',', self.COLUMNS)
+            if len(FIELDS) < self.COLUMNS:
+                continue
+            files.append(FIELDS[0].decode('UTF-8'))
+            start.append(FIELDS[1].strip())
+            daynight.append(FIELDS[4].strip()[:1])
+            ring.append(FIELDS[9:17])
+            #convert full chunks to keep the number of python objects small
+            if len(files) == self.chunk_size:
+                chunks.append(self._convert_chunk(files, start, daynight, 
+                                                  ring))
+                files, start, daynight, ring = [], [], [], []
+        chunks.append(self._convert_chunk(files, start, daynight, ring))
+        
+        #concatenate all chunks column-wise
+        return GeoMetaEntries(
+            *[np.concatenate([chunk[i] for chunk in chunks]) 
+              for i in range(5)])
+        
+    def _convert_chunk(self, files: list, start: list, daynight: list, 
+                       ring: list) -> tuple:
+        FILES = np.array(files, dtype=object)
+        START = np.array(start, dtype='S19').astype('U19')
+        START = START.astype('datetime64[s]')
+        DAYNIGHT = np.array(daynight, dtype='S1').astype('U1')
+        RING = np.array(ring, dtype=float).reshape(-1, 8)
+        return FILES, START, DAYNIGHT, RING[:, :4], RING[:, 4:]
+
+
+class GranuleIndex(object):
+    """
+    Dict index of granule files by their acquisition tag, e.g., 
+    A2020245.0000.061 for MODIS granules, to pair the files of different 
+    products belonging to the same acquisition
+    """
+    def __init__(self, granules: list):
+        """
+        Parameters
+        ----------
+        granules : list
+            Granule file names to index; for several files per tag, e.g., 
+            due to reprocessing, the one with the latest production time 
+            stamp is kept
+        """
+        self.index = {}
+        for granule in sorted(granules):
+            self.index[self.get_tag(granule)] = granule
+    
+    @staticmethod
+    def get_tag(granule: str) -> str:
+        return '.'.join(granule.split('.')[1:4])
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def get(self, granule: str) -> str:
+        """
+        Parameters
+        ----------
+        granule : str
+            Granule file name of another product of the same acquisition
+
+        Returns
+        -------
+        str
+            The indexed counterpart or None if it does not exist
+        """
+        return self.index.get(self.get_tag(granule), None)
+
+
+class ListingDiff(object):
+    """
+    Container of all granule changes between the stored and the freshly 
+    compiled daily listings, i.e., added, removed, and replaced (e.g., 
+    reprocessed) granules
+    """
+    def __init__(self):
+        self.changes = []
+        
+    def add_day(self, stored: pd.DataFrame, current: pd.DataFrame, 
+                stored_keys: tuple, current_keys: tuple) -> dict:
+        """
+        Parameters
+        ----------
+        stored : pd.DataFrame
+            Stored listing of the day
+        current : pd.DataFrame
+            Freshly compiled listing of the day
+        stored_keys : tuple
+            Granule keys and production time stamps of all stored entries
+        current_keys : tuple
+            Granule keys and production time stamps of all current entries
+
+        Returns
+        -------
+        dict
+            Number of added, removed, and replaced granules of the day
+        """
+        STORED = dict(zip(*stored_keys))
+        CURRENT = dict(zip(*current_keys))
+        ADDED = set(CURRENT) - set(STORED)
+        REMOVED = set(STORED) - set(CURRENT)
+        REPLACED = set([key for key in set(CURRENT) & set(STORED) 
+                        if CURRENT[key] != STORED[key]])
+        
+        #entries of all changed granules
+        CURRENT_CHANGE = np.array([
+            'added' if key in ADDED else 
+            'replaced' if key in REPLACED else '' 
+            for key in current_keys[0]], dtype=object)
+        STORED_CHANGE = np.array([
+            'removed' if key in REMOVED else '' 
+            for key in stored_keys[0]], dtype=object)
+        for df, CHANGE in [(current, CURRENT_CHANGE), (stored, STORED_CHANGE)]:
+            CHANGED = CHANGE != ''
+            if CHANGED.any():
+                self.changes.append(
+                    df.loc[CHANGED].assign(change=CHANGE[CHANGED]))
+        return {'added': len(ADDED), 
+                'removed': len(REMOVED), 
+                'replaced': len(REPLACED)}
+    
+    def get_changes(self) -> pd.DataFrame:
+        if len(self.changes) == 0:
+            return pd.DataFrame(columns=['change'])
+        CHANGES = [df.astype({column: object for column in df.columns 
+                              if isinstance(df[column].dtype, 
+                                            pd.CategoricalDtype)})
+                   for df in self.changes]
+        return pd.concat(CHANGES, ignore_index=True)
+    
+    def get_work_listing(self) -> pd.DataFrame:
+        #only added and replaced granules need to be (re-)retrieved, while
+        #their change is kept to write their outputs anew
+        df = self.get_changes()
+        WORK = df['change'].isin(['added', 'replaced'])
+        return df.loc[WORK].reset_index(drop=True)
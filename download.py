@@ -0,0 +1,589 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from retry import CircuitBreaker
+from retry import RetryPolicy
+from retry import RetrySession
+
+import io
+import json
+import os
+import threading
+import time
+
+import requests
+
+
+# In[]
+
+def create_session(token: str = None, pool_size: int = 10,
+                   policy: RetryPolicy = None,
+                   breaker: CircuitBreaker = None) -> object:
+    """
+    Parameters
+    ----------
+    token : str, optional
+        LAADS bearer token added to all requests of the session
+    pool_size : int, optional
+        Maximum number of kept-alive connections per host, which also limits
+        the number of concurrent connections to a single host
+    policy : RetryPolicy, optional
+        Retry policy of all requests of the session
+    breaker : CircuitBreaker, optional
+        Host-level circuit breaker of all requests of the session
+
+    Returns
+    -------
+    object
+        requests.Session reusing its connections (and TLS handshakes) across
+        all retrievals, wrapped by a RetrySession if a policy or breaker is 
+        given
+    """
+    session = requests.Session()
+    ADAPTER = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          pool_block=True)
+    session.mount('https://', ADAPTER)
+    session.mount('http://', ADAPTER)
+    if token is not None:
+        session.headers.update({'Authorization': f'Bearer {token}'})
+    if policy is not None or breaker is not None:
+        return RetrySession(session, policy, breaker)
+    return session
+
+
+# In[]
+
+class DownloadProgress(object):
+    """
+    Progress and throughput bookkeeping of a single file download
+    """
+    def __init__(self, name: str, total: int = None, step: float = 10.0,
+                 offset: int = 0):
+        """
+        Parameters
+        ----------
+        name : str
+            File name used in all status messages
+        total : int, optional
+            Expected number of bytes, if known from the response headers
+        step : float, optional
+            Progress [%] between two status messages
+        offset : int, optional
+            Number of bytes already retrieved by a previous, resumed attempt
+        """
+        self.name = name
+        self.total = total
+        self.step = step
+        self.offset = offset
+        self.received = offset
+        self.reported = 0.0
+        self.start = time.monotonic()
+
+    def update(self, n: int) -> None:
+        self.received += n
+        #report progress only for known file sizes
+        if not self.total or not self.step:
+            return
+        PERCENT = 100.0 * self.received / self.total
+        if PERCENT - self.reported >= self.step:
+            self.reported = PERCENT - PERCENT % self.step
+            logger.info(f'{self.name}: {self.reported:.0f}% '+
+                        f'({self.received / 1e6:.1f} MB) at '+
+                        f'{self.get_throughput():.1f} MB/s')
+
+    def get_throughput(self) -> float:
+        #returns the average throughput [MB/s] of the current attempt
+        ELAPSED = max(time.monotonic() - self.start, 1e-6)
+        return (self.received - self.offset) / 1e6 / ELAPSED
+
+    def get_summary(self) -> str:
+        ELAPSED = time.monotonic() - self.start
+        RESUMED = f', resumed at {self.offset / 1e6:.1f} MB' \
+            if self.offset > 0 else ''
+        return (f'{self.received / 1e6:.1f} MB in {ELAPSED:.1f} s '+
+                f'({self.get_throughput():.1f} MB/s{RESUMED})')
+
+
+class FileDownloader(object):
+    """
+    Streaming file downloader writing the response body in chunks to a
+    temporary file next to the target, which is only renamed to the target
+    after a complete and size-verified retrieval, so that memory usage is 
+    bounded by the chunk size and incomplete files never appear under their 
+    final name; interrupted retrievals are resumed with range requests, 
+    while small files may also be retrieved into memory
+    """
+    def __init__(self, chunk_size: int = 8 * 1024**2,
+                 session: object = requests, progress_step: float = 10.0,
+                 policy: RetryPolicy = None):
+        """
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of bytes read from the response and written at once
+        session : object, optional
+            requests module, Session, or RetrySession to use for the actual 
+            retrievals
+        progress_step : float, optional
+            Progress [%] between two status messages or 0 to disable them
+        policy : RetryPolicy, optional
+            Retry policy to resume interrupted transfers or None to not 
+            resume them within the same retrieval
+        """
+        self.chunk_size = chunk_size
+        self.session = session
+        self.progress_step = progress_step
+        self.policy = policy
+        #sizes of all files completed by this downloader
+        self.completed = {}
+
+    def get_part_path(self, path: str) -> str:
+        return f'{path}.part'
+    
+    def get_state_path(self, path: str) -> str:
+        return f'{path}.part.json'
+    
+    def _load_state(self, url: str, path: str) -> dict:
+        #state of a previous attempt, only valid for the same url
+        try:
+            with open(self.get_state_path(path)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('url') != url:
+            return None
+        return state
+    
+    def _store_state(self, url: str, path: str, r: object, 
+                     total: int) -> None:
+        #keep the validators of the response to safely resume it later on,
+        #while partial responses may lack them
+        VALIDATOR = r.headers.get('ETag', r.headers.get('Last-Modified'))
+        if VALIDATOR is None and r.status_code == 206:
+            VALIDATOR = (self._load_state(url, path) or {}).get('validator')
+        state = {'url': url, 
+                 'total': total,
+                 'validator': VALIDATOR,
+                 }
+        with open(self.get_state_path(path), 'w') as f:
+            json.dump(state, f)
+            
+    def _get_resume_offset(self, url: str, path: str, headers: dict) -> int:
+        PART_PATH = self.get_part_path(path)
+        if not os.path.isfile(PART_PATH):
+            return 0
+        state = self._load_state(url, path)
+        if state is None:
+            self._remove_part(path)
+            return 0
+        #only resume the exact same upstream file
+        OFFSET = os.path.getsize(PART_PATH)
+        headers['Range'] = f'bytes={OFFSET}-'
+        if state['validator'] is not None:
+            headers['If-Range'] = state['validator']
+        return OFFSET
+    
+    def _get_total_size(self, r: object, offset: int) -> int:
+        #decoded content does not match the announced size
+        if r.headers.get('Content-Encoding', 'identity') != 'identity':
+            return None
+        #full size from 'bytes start-end/total' of partial content
+        if r.status_code == 206:
+            TOTAL = r.headers.get('Content-Range', '*').split('/')[-1]
+            return int(TOTAL) if TOTAL.isdigit() else None
+        return int(r.headers.get('Content-Length', 0)) or None
+
+    def download(self, url: str, path: str, headers: dict = None, 
+                 size: int = None) -> bool:
+        """
+        Parameters
+        ----------
+        url : str
+            Url to retrieve
+        path : str
+            Target file path
+        headers : dict, optional
+            Additional request headers, e.g., for authentication
+        size : int, optional
+            Expected file size [bytes], e.g., from listing metadata, which 
+            takes precedence over the size announced by the server
+
+        Returns
+        -------
+        bool
+            Retrieval successful? True/False; interrupted transfers are 
+            resumed according to the retry policy, while failed requests 
+            are already retried by the session
+        """
+        RETRIES = self.policy.retries if self.policy is not None else 0
+        for attempt in range(RETRIES + 1):
+            SUCCESS, RETRY = self._attempt(url, path, headers, size)
+            if SUCCESS or not RETRY or attempt == RETRIES:
+                return SUCCESS
+            DELAY = self.policy.get_delay(attempt)
+            #status
+            logger.warning(f'Resuming {os.path.basename(path)} '+
+                           f'({attempt + 1}/{RETRIES}) in {DELAY:.1f} s...')
+            time.sleep(DELAY)
+    
+    def _attempt(self, url: str, path: str, headers: dict = None, 
+                 size: int = None) -> tuple:
+        #returns the retrieval status and whether it may be resumed
+        NAME = os.path.basename(path)
+        PART_PATH = self.get_part_path(path)
+        headers = dict(headers or {})
+        #resume previously interrupted retrievals
+        OFFSET = self._get_resume_offset(url, path, headers)
+        try:
+            r = self.session.get(url, headers=headers, stream=True)
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Retrieval of {NAME} failed: {e}')
+            return False, False
+        try:
+            with r:
+                #nothing left to retrieve
+                if r.status_code == 416 and OFFSET > 0:
+                    TOTAL = self._load_state(url, path)['total']
+                    progress = DownloadProgress(NAME, TOTAL, 0, OFFSET)
+                elif r.status_code in [200, 206]:
+                    #upstream file changed or range is ignored by the server
+                    if r.status_code == 200:
+                        OFFSET = 0
+                    TOTAL = self._get_total_size(r, OFFSET)
+                    self._store_state(url, path, r, TOTAL)
+                    progress = DownloadProgress(NAME, TOTAL, 
+                                                self.progress_step, OFFSET)
+                    MODE = 'ab' if OFFSET > 0 else 'wb'
+                    with open(PART_PATH, MODE) as f:
+                        for chunk in r.iter_content(
+                                chunk_size=self.chunk_size):
+                            f.write(chunk)
+                            progress.update(len(chunk))
+                else:
+                    logger.error(f'Retrieval of {NAME} failed with status '+
+                                 f'{r.status_code}!')
+                    return False, False
+        except requests.exceptions.RequestException as e:
+            #keep the partial file to resume it with the next attempt
+            logger.error(f'Retrieval of {NAME} interrupted: {e}')
+            return False, True
+        except OSError as e:
+            logger.error(f'Retrieval of {NAME} failed: {e}')
+            return False, False
+
+        #verify the number of retrieved bytes if known
+        EXPECTED = size if size is not None else TOTAL
+        RECEIVED = os.path.getsize(PART_PATH) if os.path.isfile(PART_PATH) \
+            else 0
+        if EXPECTED is not None and RECEIVED != EXPECTED:
+            logger.error(f'Retrieval of {NAME} incomplete: '+
+                         f'{RECEIVED}/{EXPECTED} bytes!')
+            #a partial file exceeding the expected size cannot be resumed
+            if RECEIVED > EXPECTED:
+                self._remove_part(path)
+            return False, RECEIVED < EXPECTED
+
+        #make the complete file available under its final name
+        os.replace(PART_PATH, path)
+        self._remove_state(path)
+        self.completed[path] = RECEIVED
+        #status
+        logger.info(f'{NAME}: {progress.get_summary()}')
+        return True, False
+    
+    def fetch(self, url: str, limit: int, size: int = None) -> bytes:
+        """
+        Parameters
+        ----------
+        url : str
+            Url to retrieve
+        limit : int
+            Maximum number of bytes to retrieve into memory
+        size : int, optional
+            Expected file size [bytes], e.g., from listing metadata or a
+            previous HEAD request, else it is requested from the server
+
+        Returns
+        -------
+        bytes
+            Complete content of the remote file or None if its size is 
+            unknown or exceeds the limit, i.e., it needs to be downloaded 
+            to disk, or if the retrieval failed; interrupted transfers are
+            restarted according to the retry policy
+        """
+        #decide on memory or disk before any content is transferred
+        if size is None:
+            size = self.get_remote_size(url)
+        if size is None or size > limit:
+            return None
+        NAME = url.split('/')[-1]
+        RETRIES = self.policy.retries if self.policy is not None else 0
+        for attempt in range(RETRIES + 1):
+            CONTENT, RETRY = self._fetch_attempt(url, limit, size)
+            if CONTENT is not None or not RETRY or attempt == RETRIES:
+                return CONTENT
+            DELAY = self.policy.get_delay(attempt)
+            #status
+            logger.warning(f'Restarting {NAME} ({attempt + 1}/{RETRIES}) '+
+                           f'in {DELAY:.1f} s...')
+            time.sleep(DELAY)
+    
+    def _fetch_attempt(self, url: str, limit: int, size: int = None) -> tuple:
+        #returns the retrieved content and whether it may be retried
+        NAME = url.split('/')[-1]
+        try:
+            r = self.session.get(url, stream=True)
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Retrieval of {NAME} failed: {e}')
+            return None, False
+        try:
+            with r:
+                if r.status_code != 200:
+                    logger.error(f'Retrieval of {NAME} failed with status '+
+                                 f'{r.status_code}!')
+                    return None, False
+                #spill files announcing a different size to disk
+                TOTAL = self._get_total_size(r, 0)
+                if TOTAL is None or TOTAL > limit:
+                    return None, False
+                progress = DownloadProgress(NAME, TOTAL, self.progress_step)
+                content = bytearray()
+                for chunk in r.iter_content(chunk_size=self.chunk_size):
+                    content.extend(chunk)
+                    progress.update(len(chunk))
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Retrieval of {NAME} interrupted: {e}')
+            return None, True
+        #verify the number of retrieved bytes
+        EXPECTED = size if size is not None else TOTAL
+        if len(content) != EXPECTED:
+            logger.error(f'Retrieval of {NAME} incomplete: '+
+                         f'{len(content)}/{EXPECTED} bytes!')
+            return None, True
+        #status
+        logger.info(f'{NAME}: {progress.get_summary()}')
+        return bytes(content), False
+    
+    def get_remote_size(self, url: str) -> int:
+        """
+        Parameters
+        ----------
+        url : str
+            Url of the remote file
+
+        Returns
+        -------
+        int
+            File size [bytes] announced by the server or None if unknown
+        """
+        try:
+            r = self.session.head(url, allow_redirects=True)
+        except requests.exceptions.RequestException:
+            return None
+        if r.status_code != 200:
+            return None
+        return int(r.headers.get('Content-Length', 0)) or None
+    
+    def set_verified(self, path: str) -> None:
+        #marks a complete file obtained otherwise, e.g., from a cache
+        self.completed[path] = os.path.getsize(path)
+    
+    def verify(self, path: str, url: str = None, size: int = None) -> bool:
+        """
+        Parameters
+        ----------
+        path : str
+            Local file path
+        url : str, optional
+            Url of the remote file to compare the size with if no expected
+            size is given
+        size : int, optional
+            Expected file size [bytes], e.g., from listing metadata
+
+        Returns
+        -------
+        bool
+            Whether the local file exists and is complete; files of unknown
+            size are unverified unless retrieved by this downloader, i.e., 
+            they need to be retrieved again
+        """
+        if not os.path.isfile(path):
+            return False
+        #files retrieved by this downloader are already verified
+        if size is None and path in self.completed:
+            size = self.completed[path]
+        if size is None and url is not None:
+            size = self.get_remote_size(url)
+        return size is not None and os.path.getsize(path) == size
+
+    def _remove_part(self, path: str) -> None:
+        for PATH in [self.get_part_path(path), self.get_state_path(path)]:
+            if os.path.isfile(PATH):
+                os.remove(PATH)
+                
+    def _remove_state(self, path: str) -> None:
+        STATE_PATH = self.get_state_path(path)
+        if os.path.isfile(STATE_PATH):
+            os.remove(STATE_PATH)
+
+
+class HttpRangeReader(io.RawIOBase):
+    """
+    Seekable read-only file object of a remote file, serving all reads from
+    blocks retrieved with HTTP range requests, e.g., to read only the 
+    central directory and selected members of a remote zip file
+    """
+    def __init__(self, session: object, url: str, 
+                 block_size: int = 8 * 1024**2):
+        """
+        Parameters
+        ----------
+        session : object
+            requests module, Session, or RetrySession to use for the 
+            range requests
+        url : str
+            Url of the remote file
+        block_size : int, optional
+            Minimum number of bytes retrieved per range request
+        """
+        super().__init__()
+        self.session = session
+        self.url = url
+        self.block_size = block_size
+        self.position = 0
+        self.block_start = 0
+        self.block = b''
+        #transfer statistics
+        self.requests = 0
+        self.received = 0
+        self.size = self._get_size()
+        
+    def _get_size(self) -> int:
+        r = self.session.head(self.url, allow_redirects=True)
+        SIZE = int(r.headers.get('Content-Length', 0)) \
+            if r.status_code == 200 else 0
+        if SIZE == 0:
+            raise OSError(f'Size of {self.url} unknown ({r.status_code})!')
+        return SIZE
+        
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        if self.position < 0:
+            raise ValueError('Negative seek position!')
+        return self.position
+    
+    def _fetch(self, start: int, length: int) -> None:
+        END = min(start + length, self.size) - 1
+        headers = {'Range': f'bytes={start}-{END}'}
+        r = self.session.get(self.url, headers=headers)
+        if r.status_code != 206:
+            raise OSError(f'Range request failed ({r.status_code})!')
+        #the block has to start at the requested offset
+        CONTENT_RANGE = r.headers.get('Content-Range', '')
+        if not CONTENT_RANGE.startswith(f'bytes {start}-') or \
+            len(r.content) == 0:
+            raise OSError(f'Unexpected range response ({CONTENT_RANGE}) '+
+                          f'for bytes {start}-{END}!')
+        self.block_start = start
+        self.block = r.content
+        self.requests += 1
+        self.received += len(self.block)
+        
+    def readinto(self, b: object) -> int:
+        #fill the buffer completely, unless the end of the file is reached,
+        #as short reads of headers are considered truncated by zipfile
+        VIEW = memoryview(b).cast('B')
+        N = 0
+        while N < len(VIEW) and self.position < self.size:
+            OFFSET = self.position - self.block_start
+            if OFFSET < 0 or OFFSET >= len(self.block):
+                self._fetch(self.position, max(len(VIEW) - N, 
+                                               self.block_size))
+                OFFSET = 0
+            DATA = self.block[OFFSET:OFFSET + len(VIEW) - N]
+            VIEW[N:N + len(DATA)] = DATA
+            N += len(DATA)
+            self.position += len(DATA)
+        return N
+
+
+class DownloadManager(object):
+    """
+    Thread pool of concurrent file downloads, returning futures of the 
+    download status for each submitted file
+    """
+    def __init__(self, downloader: FileDownloader, workers: int = 1):
+        """
+        Parameters
+        ----------
+        downloader : FileDownloader
+            Downloader performing the actual (streaming) retrievals
+        workers : int, optional
+            Number of concurrent transfers
+        """
+        self.downloader = downloader
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        #futures of all pending downloads by target path
+        self.pending = {}
+        self.lock = threading.RLock()
+
+    def submit(self, url: str, path: str, headers: dict = None, 
+               size: int = None) -> Future:
+        """
+        Parameters
+        ----------
+        url : str
+            Url to retrieve
+        path : str
+            Target file path
+        headers : dict, optional
+            Additional request headers
+        size : int, optional
+            Expected file size [bytes]
+
+        Returns
+        -------
+        Future
+            Future of the download status; a target that is already being 
+            retrieved is not submitted twice
+        """
+        with self.lock:
+            future = self.pending.get(path, None)
+            if future is not None and not future.done():
+                return future
+            future = self.pool.submit(self.downloader.download, url, path, 
+                                      headers, size)
+            self.pending[path] = future
+            future.add_done_callback(lambda f: self._release(path, f))
+            return future
+
+    def _release(self, path: str, future: Future) -> None:
+        with self.lock:
+            if self.pending.get(path, None) is future:
+                del self.pending[path]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.pool.shutdown(wait=wait)
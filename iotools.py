@@ -20,12 +20,28 @@ from loguru import logger
 from typing import List, Dict
 
 import h5py
+import io
+import json
 import os
+import sys
+import zipfile
 
 import numpy as np
 import pandas as pd
 import xarray as xr
 
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import h5netcdf
+except ImportError:
+    h5netcdf = None
+
 
 """ Listing """
 # In[]
@@ -34,14 +50,193 @@ class ListingIO(object):
     def __init__(self, out: str):
         self.OUTPUT_PATH = out
         
+    def get_listing_file_name(self, carrier: str, sensor: str, yy: str, 
+                              jj: str) -> str:
+        return f'{carrier}_{sensor}_listing_{yy}_{jj}.csv'
+        
     def set_listing_file_name(self, lfn: str) -> None:
         self.path = os.path.join(self.OUTPUT_PATH, lfn)
+        
+    def listing_exists(self) -> bool:
+        return os.path.isfile(self.path)
 
     def to_csv(self, df: pd.DataFrame) -> None:
         df.to_csv(self.path, index=False)
 
     def from_csv(self) -> pd.DataFrame:
-        return pd.read_csv(self.path)
+        df = pd.read_csv(self.path)
+        #granule start times of the footprint columns
+        if 'start' in df.columns:
+            df['start'] = pd.to_datetime(df['start'])
+        return df
+    
+    def _get_state_path(self) -> str:
+        #hidden file next to the listing to not interfere with datasets
+        FOLDER, FILENAME = os.path.split(self.path)
+        return os.path.join(FOLDER, f'.{FILENAME}.state.json')
+    
+    def save_state(self, state: dict) -> None:
+        with open(self._get_state_path(), 'w') as f:
+            json.dump(state, f)
+            
+    def load_state(self) -> dict:
+        try:
+            with open(self._get_state_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save(self, df: pd.DataFrame, yy: str, jj: str) -> None:
+        self.to_csv(df)
+        
+    def save_report(self, df: pd.DataFrame, name: str) -> None:
+        #reports are always plain csv files next to the listings
+        df.to_csv(os.path.join(self.OUTPUT_PATH, name), index=False)
+        
+    def load(self) -> pd.DataFrame:
+        return self.from_csv()
+    
+    def load_bulk(self, carrier: str, sensor: str, days: list, aois: list,
+                  min_frac: float) -> dict:
+        """
+        Parameters
+        ----------
+        carrier : str
+            Carrier of the listings to load
+        sensor : str
+            Sensor of the listings to load
+        days : list
+            List of (yy, jj) tuples of the listings to load
+        aois : list
+            AOI's to keep from the stored listings
+        min_frac : float
+            Minimum overlap fraction to keep from the stored listings
+
+        Returns
+        -------
+        dict
+            Loaded listings per (yy, jj) day, reduced to the given AOI's and
+            minimum overlap fraction
+        """
+        listings = {}
+        for yy, jj in days:
+            LFN = self.get_listing_file_name(carrier, sensor, yy, jj)
+            self.set_listing_file_name(LFN)
+            df = self.load()
+            VALID = df['aoi'].isin(aois) & (df['frac'] >= min_frac)
+            listings[(yy, jj)] = df.loc[VALID].reset_index(drop=True)
+        return listings
+    
+    
+class ParquetListingIO(ListingIO):
+    """ 
+    Class for all listing-related I/O using a Parquet dataset partitioned by
+    carrier/sensor/year with one file per day, allowing for bulk loads
+    with predicate pushdown instead of parsing thousands of csv files
+    """
+    def __init__(self, out: str):
+        if pa is None:
+            logger.critical('The ParquetListingIO requires pyarrow!')
+            sys.exit()
+        super().__init__(out)
+        
+    def get_listing_file_name(self, carrier: str, sensor: str, yy: str, 
+                              jj: str) -> str:
+        return os.path.join(f'carrier={carrier}', f'sensor={sensor}',
+                            f'year={int(yy)}', f'{jj}.parquet')
+    
+    def save(self, df: pd.DataFrame, yy: str, jj: str) -> None:
+        #store day-of-year to allow for pushdown on the date range
+        df = df.assign(doy=np.int16(jj))
+        #write to temporary file first to never leave a broken day behind
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        FOLDER, FILENAME = os.path.split(self.path)
+        TMP_PATH = os.path.join(FOLDER, f'.{FILENAME}.tmp')
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False),
+                       TMP_PATH)
+        os.replace(TMP_PATH, self.path)
+        
+    def load(self) -> pd.DataFrame:
+        df = pq.read_table(self.path).to_pandas()
+        return df.drop('doy', axis=1)
+    
+    def load_bulk(self, carrier: str, sensor: str, days: list, aois: list,
+                  min_frac: float) -> dict:
+        #open dataset of the carrier/sensor partition
+        ROOT = os.path.join(self.OUTPUT_PATH, f'carrier={carrier}', 
+                            f'sensor={sensor}')
+        PARTITIONING = ds.partitioning(pa.schema([('year', pa.int32())]),
+                                       flavor='hive')
+        dataset = ds.dataset(ROOT, format='parquet', 
+                             partitioning=PARTITIONING)
+        #compile filter on date range, aois, and minimum overlap fraction
+        YEARS = {}
+        for yy, jj in days:
+            YEARS.setdefault(int(yy), []).append(int(jj))
+        #empty days are stored without (typed) columns, hence only days with
+        #entries make up the dataset and its schema
+        FILES = [fragment.path for fragment in dataset.get_fragments(
+            filter=ds.field('year').isin(list(YEARS)))
+            if fragment.metadata.num_rows > 0]
+        if len(FILES) == 0:
+            return {}
+        dataset = ds.dataset(FILES, format='parquet', 
+                             partitioning=PARTITIONING,
+                             partition_base_dir=ROOT)
+        DATES = None
+        for year, doys in YEARS.items():
+            EXPR = (ds.field('year') == year) & ds.field('doy').isin(doys)
+            DATES = EXPR if DATES is None else DATES | EXPR
+        FILTER = DATES & ds.field('aoi').isin(list(aois)) & \
+            (ds.field('frac') >= min_frac)
+        #load all matching rows at once
+        df = dataset.to_table(filter=FILTER).to_pandas()
+        #split into days
+        listings = {}
+        for (year, doy), day in df.groupby(['year', 'doy'], sort=True,
+                                           observed=True):
+            DAY = (f'{year:04d}', f'{doy:03d}')
+            day = day.drop(['year', 'doy'], axis=1)
+            listings[DAY] = day.reset_index(drop=True)
+        return listings
+
+
+class PendingListingIO(object):
+    """
+    Class for the pending work list of the diff mode, i.e., all added and 
+    replaced granules that are not processed yet, kept next to the listings
+    """
+    def __init__(self, path: str):
+        self.path = path
+        
+    def load(self) -> pd.DataFrame:
+        if not os.path.isfile(self.path):
+            return pd.DataFrame(columns=['change'])
+        df = pd.read_csv(self.path)
+        #granule start times of the footprint columns
+        if 'start' in df.columns:
+            df['start'] = pd.to_datetime(df['start'])
+        return df
+    
+    def save(self, df: pd.DataFrame) -> None:
+        if df.shape[0] == 0:
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+            return
+        #replace atomically to never lose the work list on interruptions
+        TMP_PATH = f'{self.path}.tmp'
+        df.to_csv(TMP_PATH, index=False)
+        os.replace(TMP_PATH, self.path)
+        
+    def complete(self, entries: pd.DataFrame) -> None:
+        #drop all pending entries of the processed granule(s)
+        df = self.load()
+        if df.shape[0] == 0:
+            return
+        COLUMN = 'mxd03' if 'mxd03' in df.columns else 'file'
+        DONE = df[COLUMN].isin(entries[COLUMN])
+        if DONE.any():
+            self.save(df.loc[~DONE])
 
 
 """ Swath handling """
@@ -92,6 +287,35 @@ class SwathInput(ABC):
         pass
     
 
+class ZipMemberSwathInput(SwathInput):
+    """ 
+    Parentclass for all swath inputs also reading members of zip files in 
+    place, i.e., without extracting them to disk
+    """
+    @abstractmethod
+    def load_member(self, zip_file: zipfile.ZipFile, member: str) -> None:
+        """
+        Parameters
+        ----------
+        zip_file : zipfile.ZipFile
+            Opened zip file containing the file/swath to load
+        member : str
+            Name of the zip member to load
+
+        Returns
+        -------
+        None
+            Stores the specific file handle, e.g., within self.fh, without 
+            extracting the member to disk
+        """
+        pass
+    
+    def supports_zip_members(self) -> bool:
+        #whether the optional dependencies of load_member() are available
+        return True
+    
+
+
 class SwathOutput(ABC):
     """ Parentclass for all output-related swath operations """
     @abstractmethod
@@ -175,9 +399,25 @@ class HDF4SwathInput(SwathInput):
         self.fh.end()
 
 
-class NetCDFSwathInput(SwathInput):
+class NetCDFSwathInput(ZipMemberSwathInput):
     def load(self, path: str) -> None:
+        self.member = None
         self.fh = xr.open_dataset(path)
+        
+    def load_member(self, zip_file: zipfile.ZipFile, member: str) -> None:
+        #stored members are read in place, while compressed ones are read 
+        #into memory once, as every backward seek within a compressed 
+        #member restarts its decompression
+        INFO = zip_file.getinfo(member)
+        if INFO.compress_type == zipfile.ZIP_STORED:
+            self.member = zip_file.open(INFO)
+        else:
+            self.member = io.BytesIO(zip_file.read(INFO))
+        self.fh = xr.open_dataset(self.member, engine='h5netcdf')
+        
+    def supports_zip_members(self) -> bool:
+        #netCDF4/HDF5 members are read via h5netcdf from file-like objects
+        return h5netcdf is not None
     
     def get_var(self, metavar: MetaVariable) -> NetCDFDataVariable:
         VAR = metavar.input_parameter['variable']
@@ -214,6 +454,8 @@ class NetCDFSwathInput(SwathInput):
 
     def close(self) -> None:
         self.fh.close()
+        if self.member is not None:
+            self.member.close()
         
         
 class HDF5SwathInput(SwathInput):
@@ -294,6 +536,14 @@ class SwathIO(object):
     def open_input_swath(self, path: str) -> None:
         self.swath_in.load(path)
         
+    def open_input_member(self, zip_file: zipfile.ZipFile, 
+                          member: str) -> None:
+        self.swath_in.load_member(zip_file, member)
+        
+    def supports_zip_members(self) -> bool:
+        return isinstance(self.swath_in, ZipMemberSwathInput) and \
+            self.swath_in.supports_zip_members()
+        
     def get_variable(self, metavar: MetaVariable) -> SwathVariable:
         return self.swath_in.get_var(metavar)
         
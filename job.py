@@ -88,6 +88,11 @@ class RetrievalJob(object):
         #initialize the correct listing module/processor
         self.lst = self.cfg.setup_listing_module()
         
+        APPLY_PLANNING = self.cfg.apply_planning
+        if APPLY_PLANNING:
+            #initialize the coverage planner
+            self.plan = self.cfg.setup_planning_module()
+        
         APPLY_RETRIEVAL = self.cfg.apply_swath_download
         if APPLY_RETRIEVAL:
             #initialize the correct retrieval module/processor
@@ -110,6 +115,24 @@ class RetrievalJob(object):
         #run the listing processor to compile the file listing
         listing = self.lst.compile_file_listing()
         
+        APPLY_DIFF = self.cfg.apply_listing_diff
+        if APPLY_DIFF:
+            #only retrieve added and replaced granules
+            listing = self.lst.get_listing_changes()
+            if listing.shape[0] == 0:
+                logger.info('No upstream listing changes!')
+                logger.info('Job complete! :)')
+                return
+        
+        APPLY_PLANNING = self.cfg.apply_planning
+        if APPLY_PLANNING:
+            #reduce listing to the granules necessary for full coverage
+            listing = self.plan.plan(listing)
+        
+        if APPLY_DIFF:
+            #keep the work list until all of its granules are processed
+            self.lst.save_pending_changes(listing)
+        
         APPLY_RETRIEVAL = self.cfg.apply_swath_download
         if APPLY_RETRIEVAL:
             #pass along listing information to retrieval processor
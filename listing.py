@@ -5,6 +5,8 @@
 
 
 # In[] 
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from loguru import logger
 
 
@@ -32,6 +34,17 @@ class Listing(object):
         logger.info(f'Compile file listing...')        
         #retrieve date strings for specified processing period
         date_str = self.proc.get_dates()
+        #keep track of existing listings to load them all at once
+        self.existing = []
+        
+        #decide on sequential or concurrent geoMeta retrieval
+        WORKERS = self.proc.get_listing_workers()
+        if WORKERS > 1:
+            self._compile_file_listing_concurrently(date_str, WORKERS)
+            #load all existing listings
+            self._load_existing_listings()
+            #returns the completed listing to the caller
+            return self.proc.get_listing()
         
         #loop over all dates
         for yy, jj in date_str:
@@ -45,25 +58,169 @@ class Listing(object):
             #check whether listing for specified date already exists
             OVERRIDE = self.proc.check_for_override_listing()
             LISTING_EXISTS = self.proc.check_for_existing_listing()
-            if LISTING_EXISTS and not OVERRIDE:
+            DIFF = self.proc.check_for_listing_diff()
+            if DIFF:
+                #recompile all listings to compare them to the stored ones
+                STORED = self.proc.get_stored_listing()
+            elif LISTING_EXISTS and not OVERRIDE:
                 logger.info(f'File listing does already exist!')
-                self.proc.load_listing()
-                continue
+                #refresh recent listings incrementally
+                if self.proc.check_for_incremental_listing():
+                    REFRESHED = self.proc.refresh_listing()
+                    if REFRESHED:
+                        continue
+                    logger.info(f'Incremental refresh impossible!')
+                else:
+                    self.existing.append((yy, jj))
+                    continue
             
             #get geoMeta listing file
             DOWNLOAD_COMPLETED = self.proc.get_geometa_file()
 
             #continue with next date in case something went wrong
             if not DOWNLOAD_COMPLETED:
+                #keep the stored listing if it cannot be compared
+                if DIFF and LISTING_EXISTS:
+                    self.existing.append((yy, jj))
                 continue
             
             #process listing
             self.proc.process_geometa_file() 
             
+            #keep track of all upstream changes
+            if DIFF:
+                self.proc.diff_listing(STORED)
+            
             #output listing csv file
             self.proc.save_listing()
             
+        #load all existing listings
+        self._load_existing_listings()
+            
         #returns the completed listing to the caller
         return self.proc.get_listing()
-         
- 
\ No newline at end of file
+    
+    def get_listing_changes(self) -> object:
+        """
+        Returns
+        -------
+        object
+            API function returning all added and replaced granules of the 
+            diff mode as pd.DataFrame
+        """
+        return self.proc.get_listing_changes()
+    
+    def save_pending_changes(self, listing: object) -> None:
+        """
+        Parameters
+        ----------
+        listing : object
+            The retrieval work list of the diff mode as pd.DataFrame, kept 
+            as pending until all of its granules are processed
+        """
+        self.proc.save_pending_changes(listing)
+    
+    def _load_existing_listings(self) -> None:
+        #bulk load all existing listings in a single call
+        if len(self.existing) > 0:
+            self.proc.load_listings(self.existing)
+
+    def _compile_file_listing_concurrently(self, date_str: list,
+                                           workers: int) -> None:
+        """
+        Parameters
+        ----------
+        date_str : list
+            List of (yy, jj) tuples to compile the listing for
+        workers : int
+            Number of concurrent geoMeta retrievals
+
+        Returns
+        -------
+        None
+            Concurrent version of the listing loop in which only the geoMeta
+            retrievals overlap; all days are still processed, stored, and
+            merged strictly in chronological order by the calling thread,
+            while the look-ahead is bounded to limit the number of fetched
+            but not yet processed listings held in memory
+        """
+        #status
+        logger.info(f'Retrieving file listings using {workers} workers...')
+        #allow for a few more days in flight than workers to keep them busy
+        LOOK_AHEAD = 2 * workers
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            #loop over all dates
+            for yy, jj in date_str:
+                #set current urls/listing file names
+                self.proc.set_current_url(yy, jj)
+                self.proc.set_current_lfn(yy, jj)
+
+                #check whether listing for specified date already exists
+                OVERRIDE = self.proc.check_for_override_listing()
+                LISTING_EXISTS = self.proc.check_for_existing_listing()
+                DIFF = self.proc.check_for_listing_diff()
+                if LISTING_EXISTS and not OVERRIDE and not DIFF:
+                    future = None
+                else:
+                    URLS = self.proc.get_current_urls()
+                    MAX_AGE = self.proc.get_listing_max_age()
+                    future = pool.submit(self.proc.fetch_geometa_files, URLS,
+                                         MAX_AGE)
+                pending.append((yy, jj, future))
+
+                #merge the oldest day once the look-ahead is exhausted
+                while len(pending) > LOOK_AHEAD:
+                    self._merge_listing_day(*pending.popleft())
+
+            #merge all remaining days
+            while pending:
+                self._merge_listing_day(*pending.popleft())
+
+    def _merge_listing_day(self, yy: str, jj: str, future: object) -> None:
+        #status
+        logger.info(f'Retrieving file listing for {jj}/{yy}...')
+
+        #reset current urls/listing file names to the merged day
+        self.proc.set_current_url(yy, jj)
+        self.proc.set_current_lfn(yy, jj)
+
+        #existing listing
+        if future is None:
+            logger.info(f'File listing does already exist!')
+            #load existing listing later on
+            if not self.proc.check_for_incremental_listing():
+                self.existing.append((yy, jj))
+                return
+            #refresh recent listings incrementally
+            REFRESHED = self.proc.refresh_listing()
+            if REFRESHED:
+                return
+            logger.info(f'Incremental refresh impossible!')
+            #get geoMeta listing file as fallback
+            DOWNLOAD_COMPLETED = self.proc.get_geometa_file()
+        else:
+            #hand over the fetched geoMeta listing file(s)
+            DOWNLOAD_COMPLETED = self.proc.set_geometa_files(future.result())
+
+        #recompile all listings to compare them to the stored ones
+        DIFF = self.proc.check_for_listing_diff()
+        LISTING_EXISTS = self.proc.check_for_existing_listing()
+        
+        #continue with next date in case something went wrong
+        if not DOWNLOAD_COMPLETED:
+            #keep the stored listing if it cannot be compared
+            if DIFF and LISTING_EXISTS:
+                self.existing.append((yy, jj))
+            return
+
+        #process listing
+        self.proc.process_geometa_file()
+
+        #keep track of all upstream changes
+        if DIFF:
+            self.proc.diff_listing(self.proc.get_stored_listing())
+
+        #output listing csv file
+        self.proc.save_listing()
@@ -123,6 +123,11 @@ class Meta(ABC):
     def urls(self) -> dict:
         return self.meta['urls'][self.carrier]
     
+    @property
+    def listing_filter(self) -> dict:
+        #product-specific geoMeta prefilter, e.g., night-time granules only
+        return self.meta.get('filter', None) or {}
+    
     @property
     def variables(self) -> List[str]:
         return [datavar.name for datavar in self.metadata]
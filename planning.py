@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[] 
+from loguru import logger
+
+import numpy as np
+import pandas as pd
+import shapely
+
+
+# In[]
+
+class CoveragePlanner(object):
+    """
+    Planning stage between listing and retrieval, selecting per AOI and time
+    bin only the minimal set of granules that is necessary to reach the 
+    coverage target using a greedy set cover on the granule footprints
+    """
+    #listing columns necessary for the planning
+    FOOTPRINT = ['start', 'lon1', 'lon2', 'lon3', 'lon4', 
+                 'lat1', 'lat2', 'lat3', 'lat4']
+    
+    def __init__(self, config: object):
+        """
+        Parameters
+        ----------
+        config : object
+            The job's Configuration() class
+        """
+        #status
+        logger.info(f'Setup coverage planner...')
+        self.cfg = config
+        self.aoi = config.aoi_data
+    
+    """ API for run """
+    def plan(self, listing: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parameters
+        ----------
+        listing : pd.DataFrame
+            The completed file listing with one entry per granule and AOI
+
+        Returns
+        -------
+        pd.DataFrame
+            Reduced listing only containing the selected granule/AOI 
+            entries; entries without footprint information, e.g., from 
+            listings compiled by earlier versions, are always kept
+        """
+        #status
+        logger.info(f'Plan granule selection...')
+        if listing.shape[0] == 0:
+            return listing
+        if not all([column in listing.columns for column in self.FOOTPRINT]):
+            logger.warning(f'Listing lacks footprints, skip planning!')
+            return listing
+        
+        #assign all entries to their time bins
+        BIN = pd.to_datetime(listing['start']).dt.floor(
+            f'{self.cfg.planning_bin}h')
+        #entries without footprint information can not be planned
+        RING = listing[self.FOOTPRINT[1:]].to_numpy(dtype=float)
+        PLANNABLE = np.isfinite(RING).all(axis=1) & BIN.notna().to_numpy()
+        
+        SELECTED = ~PLANNABLE
+        for (aoi, _), group in listing.loc[PLANNABLE].groupby(
+                [listing['aoi'].astype(str), BIN], sort=False):
+            IDX = self.select_granules(aoi, group)
+            SELECTED[listing.index.get_indexer(IDX)] = True
+        
+        #status
+        logger.info(f'Selected {SELECTED.sum()}/{len(SELECTED)} listing '+
+                    f'entries')
+        return listing.loc[SELECTED].reset_index(drop=True)
+    
+    def select_granules(self, aoi: str, group: pd.DataFrame) -> pd.Index:
+        """
+        Parameters
+        ----------
+        aoi : str
+            AOI of all entries of the group
+        group : pd.DataFrame
+            Listing entries of one AOI and time bin
+
+        Returns
+        -------
+        pd.Index
+            Index of the selected entries, greedily adding the granule 
+            with the largest additional AOI coverage until either the 
+            coverage target is reached or no granule adds at least the
+            minimum gain
+        """
+        TARGET = self.cfg.get_planning_target(aoi)
+        MIN_GAIN = self.cfg.get_planning_min_gain(aoi)
+        
+        #clip all swath footprints to the aoi polygon
+        LON = group[self.FOOTPRINT[1:5]].to_numpy(dtype=float)
+        LAT = group[self.FOOTPRINT[5:9]].to_numpy(dtype=float)
+        SWATH_POLYS = self.aoi.create_swath_polys(aoi, LON, LAT)
+        AOI_POLY = self.aoi.get_aoi(aoi).get_aoi_poly()
+        AOI_AREA = AOI_POLY.area
+        POLYS = shapely.intersection(SWATH_POLYS, AOI_POLY)
+        
+        #prefer larger fractions in case of equal gains
+        candidates = list(np.argsort(-group['frac'].to_numpy(), 
+                                     kind='stable'))
+        candidates = [i for i in candidates if POLYS[i] is not None]
+        covered = shapely.Polygon()
+        selected = []
+        COVERAGE = 0.0
+        while candidates and COVERAGE < TARGET:
+            #additional coverage [%] of all remaining granules
+            GAINS = shapely.area(shapely.difference(POLYS[candidates], 
+                                                    covered))
+            GAINS = GAINS / AOI_AREA * 100
+            BEST = int(np.argmax(GAINS))
+            if GAINS[BEST] < MIN_GAIN:
+                break
+            idx = candidates.pop(BEST)
+            selected.append(idx)
+            covered = shapely.union(covered, POLYS[idx])
+            COVERAGE = covered.area / AOI_AREA * 100
+        return group.index[sorted(selected)]
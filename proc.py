@@ -5,12 +5,27 @@
 
 # In[] 
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from loguru import logger
 from typing import List, Dict
 
-from iotools import ListingIO
 from data import ListingData
+from data import GeoMetaListing
+from data import GeoMetaParser
+from data import GeoMetaFilter
+from data import GranuleIndex
+from data import ListingDiff
+from cache import HttpCache
+from cache import OverlapCache
+from cache import GranuleCache
+from scratch import ScratchManager
+from download import DownloadManager
+from download import FileDownloader
+from download import HttpRangeReader
+from download import create_session
+from retry import CircuitBreaker
+from retry import RetryPolicy
 from data import SwathVariable
 from data import DataVariable
 from data import DataStack
@@ -23,7 +38,10 @@ import pandas as pd
 import numpy as np
 
 import requests
+import io
+import json
 import os
+import re
 import sys
 import zipfile
 
@@ -54,10 +72,14 @@ class ListingProcessor(object):
         self._set_token()
         self._set_url()
         self._set_output_path()
+        self._set_session()
         #modules
         self._set_aoi_handler()
         self._set_listing_data()
         self._set_listing_io()
+        self._set_listing_cache()
+        self._set_overlap_cache()
+        self._set_listing_filter()
         self._set_error_handler()
         
     """ Internal Getters/Setters for Processor Setup """        
@@ -92,10 +114,52 @@ class ListingProcessor(object):
     def _set_listing_data(self) -> None:
         #initiate listing data container
         self.data = ListingData()
+        #and the container of all upstream changes in the diff mode
+        self.diff = ListingDiff()
         
     def _set_listing_io(self) -> None:
         #initiate i/o handler
-        self.io = ListingIO(self.lstout)
+        self.io = self.cfg.listing_handler(self.lstout)
+        #and the one of the pending work list of the diff mode
+        self.pending = self.cfg.setup_pending_io()
+        
+    def _set_session(self) -> None:
+        #initiate pooled http session shared by all listing retrievals, 
+        #retrying failed requests and pausing them during host outages
+        POOL_SIZE = max(self.cfg.listing_workers, 2)
+        POLICY = RetryPolicy(**self.cfg.retry_policy)
+        BREAKER = CircuitBreaker(**self.cfg.circuit_breaker)
+        self.session = create_session(self.token, POOL_SIZE, POLICY, BREAKER)
+        
+    def _set_listing_cache(self) -> None:
+        #initiate http cache for listing retrievals if specified
+        if self.cfg.apply_listing_cache:
+            CACHE_PATH = os.path.join(self.lstout, 'cache')
+            MAX_AGE = self.cfg.listing_cache_max_age
+            #status
+            logger.info(f'Set listing cache directory: {CACHE_PATH}')
+            self.cache = HttpCache(CACHE_PATH, MAX_AGE, self.session)
+        else:
+            self.cache = None
+            
+    def _set_overlap_cache(self) -> None:
+        #initiate persistent swath/aoi overlap cache if specified
+        if self.cfg.apply_overlap_cache:
+            CACHE_FILE = os.path.join(self.lstout, 'cache', 'overlap.sqlite')
+            #status
+            logger.info(f'Set overlap cache: {CACHE_FILE}')
+            self.aoi.set_overlap_cache(OverlapCache(CACHE_FILE))
+            
+    def _set_listing_filter(self) -> None:
+        #product-specific prefilter, overridden by all user-specified keys
+        FILTER = dict(self.meta.listing_filter)
+        FILTER.update({key: value 
+                       for key, value in self.cfg.listing_filter.items() 
+                       if value is not None})
+        self.filter = GeoMetaFilter(**FILTER)
+        #status
+        if self.filter.active:
+            logger.info(f'Set geoMeta prefilter: {FILTER}')
         
     def _set_error_handler(self) -> None:
         #initiate download error handler
@@ -156,6 +220,47 @@ class ListingProcessor(object):
         """
         self.process.set_current_lfn(yy, jj)
         
+    def get_current_urls(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            API function returning a copy of all current url's, e.g., to 
+            hand them over to a worker thread
+        """
+        return self.process.get_current_urls()
+    
+    def get_listing_max_age(self) -> float:
+        """
+        Returns
+        -------
+        float
+            API function returning the maximum age [s] of cached listings 
+            for the current day; listings of days that are considered final
+            are never revalidated
+        """
+        #always revalidate in the diff mode to detect upstream changes
+        if self.cfg.apply_listing_diff:
+            return 0.0
+        FINAL_AFTER = self.cfg.listing_cache_final_after
+        if FINAL_AFTER is not None:
+            yy, jj = self.process.get_current_day()
+            DAY = datetime.strptime(f'{yy}-{jj}', '%Y-%j').date()
+            TODAY = datetime.now(timezone.utc).date()
+            if (TODAY - DAY).days >= FINAL_AFTER:
+                return float('inf')
+        return self.cfg.listing_cache_max_age
+    
+    def get_listing_workers(self) -> int:
+        """
+        Returns
+        -------
+        int
+            API function returning the number of concurrent geoMeta 
+            retrievals to use while compiling the listing
+        """
+        return self.cfg.listing_workers
+        
     def check_for_override_listing(self) -> bool:
         """
         Returns
@@ -176,9 +281,9 @@ class ListingProcessor(object):
             file does already exist or not
         """
         #compile path to potential listing
-        path = os.path.join(self.lstout, self.process.get_current_lfn())
+        self.io.set_listing_file_name(self.process.get_current_lfn())
         #check for existance and return to caller
-        return os.path.isfile(path)
+        return self.io.listing_exists()
     
     def load_listing(self) -> None:
         """
@@ -186,6 +291,22 @@ class ListingProcessor(object):
         into the data container
         """
         self.process.load_listing()
+        
+    def load_listings(self, days: list) -> None:
+        """
+        Parameters
+        ----------
+        days : list
+            List of (yy, jj) tuples of existing listings
+
+        Returns
+        -------
+        None
+            API function dealing with the bulk loading of several existing 
+            listing files into the data container, reduced to the current 
+            AOI's and minimum overlap fraction
+        """
+        self.process.load_listings(days)
     
     def save_listing(self) -> None:
         """
@@ -193,6 +314,151 @@ class ListingProcessor(object):
         the data container
         """
         self.process.save_listing()
+        #keep track of the processed geoMeta extent for later refreshes
+        if self.cfg.apply_incremental_listing:
+            self.listing.save_geometa_state()
+            
+    def check_for_listing_diff(self) -> bool:
+        """
+        Returns
+        -------
+        bool
+            API function returning whether freshly compiled listings are to
+            be compared against the stored ones
+        """
+        return self.cfg.apply_listing_diff
+    
+    def get_stored_listing(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pd.DataFrame
+            API function returning the stored listing of the current day, 
+            reduced to the current AOI's and minimum overlap fraction, or an
+            empty listing if it does not exist yet
+        """
+        return self.process.get_stored_listing()
+    
+    def diff_listing(self, stored: pd.DataFrame) -> None:
+        """
+        Parameters
+        ----------
+        stored : pd.DataFrame
+            The stored listing of the current day as returned by 
+            get_stored_listing()
+
+        Returns
+        -------
+        None
+            API function comparing the freshly compiled listing of the 
+            current day against the stored one by granule and production 
+            time stamp, keeping track of all added, removed, and replaced 
+            granules
+        """
+        CURRENT = self.process.get_current_listing()
+        STORED_KEYS = self.listing.get_granule_keys(stored)
+        CURRENT_KEYS = self.listing.get_granule_keys(CURRENT)
+        N = self.diff.add_day(stored, CURRENT, STORED_KEYS, CURRENT_KEYS)
+        #status
+        logger.info(f'Listing changes: {N["added"]} added, '+
+                    f'{N["removed"]} removed, {N["replaced"]} replaced')
+        
+    def get_listing_changes(self) -> pd.DataFrame:
+        """
+        Returns
+        -------
+        pd.DataFrame
+            API function returning the retrieval work list of the diff mode,
+            i.e., all added and replaced granules including their change, 
+            after storing the full change report next to the listings; 
+            pending granules of earlier runs are retrieved again unless 
+            they changed upstream once more
+        """
+        CHANGES = self.diff.get_changes()
+        if CHANGES.shape[0] > 0:
+            CARRIER = self.cfg.carrier.lower()
+            SENSOR = self.cfg.sensor.lower()
+            TIMESTAMP = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+            REPORT = f'{CARRIER}_{SENSOR}_changes_{TIMESTAMP}.csv'
+            #status
+            logger.info(f'Store listing change report: {REPORT}')
+            self.io.save_report(CHANGES, REPORT)
+        WORK = self.diff.get_work_listing()
+        PENDING = self.pending.load()
+        if PENDING.shape[0] > 0:
+            PENDING_KEYS, _ = self.listing.get_granule_keys(PENDING)
+            CHANGED_KEYS, _ = self.listing.get_granule_keys(CHANGES)
+            KEEP = ~pd.Series(PENDING_KEYS).isin(CHANGED_KEYS).values
+            #status
+            logger.info(f'Resume {KEEP.sum()} pending listing entries')
+            if WORK.shape[0] == 0:
+                return PENDING.loc[KEEP].reset_index(drop=True)
+            WORK = pd.concat([PENDING.loc[KEEP], WORK], ignore_index=True)
+        return WORK
+    
+    def save_pending_changes(self, df: pd.DataFrame) -> None:
+        """
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The retrieval work list of the diff mode
+
+        Returns
+        -------
+        None
+            API function storing the work list as pending until its 
+            granules are processed, so that neither a failed retrieval nor 
+            an interrupted job lose any upstream change
+        """
+        self.pending.save(df)
+            
+    def check_for_incremental_listing(self) -> bool:
+        """
+        Returns
+        -------
+        bool
+            API function returning whether the existing listing of the 
+            current day is to be refreshed incrementally
+        """
+        if not self.cfg.apply_incremental_listing:
+            return False
+        yy, jj = self.process.get_current_day()
+        DAY = datetime.strptime(f'{yy}-{jj}', '%Y-%j').date()
+        TODAY = datetime.now(timezone.utc).date()
+        return (TODAY - DAY).days < self.cfg.incremental_listing_days
+    
+    def refresh_listing(self) -> bool:
+        """
+        Returns
+        -------
+        bool
+            API function to incrementally refresh the existing listing of 
+            the current day by processing only the granules appended to its 
+            geoMeta file since the last run; returning False in case a full
+            listing is necessary instead
+        """
+        #load the existing listing and the processed geoMeta extent
+        self.process.load_listing()
+        STATE = self.io.load_state()
+        if STATE is None:
+            return False
+        EXISTING = self.process.get_current_listing()
+        
+        #get the appended geoMeta tail
+        TAIL_COMPLETED = self.listing.get_geometa_tail(STATE)
+        if not TAIL_COMPLETED:
+            return False
+        
+        #process new granules only and append them to the existing ones
+        self.listing.process_geometa_file()
+        APPENDED = self.process.get_current_listing()
+        DAY = self.process.get_current_day()
+        self.data.add_to_listing(EXISTING, DAY)
+        self.data.add_to_listing(APPENDED, DAY, append=True)
+        
+        #output listing file
+        self.save_listing()
+        return True
     
     def get_listing(self) -> pd.DataFrame:
         """
@@ -211,6 +477,41 @@ class ListingProcessor(object):
             respective ListingHandler() class
         """
         return self.listing.get_geometa_file()
+    
+    def fetch_geometa_files(self, urls: dict, max_age: float = None) -> dict:
+        """
+        Parameters
+        ----------
+        urls : dict
+            The url's of one day as returned by get_current_urls()
+        max_age : float, optional
+            The maximum age of cached listings as returned by 
+            get_listing_max_age()
+
+        Returns
+        -------
+        dict
+            API function to download/retrieve the respective geoMeta file(s)
+            of one day without altering the processor state, i.e., to be 
+            called from worker threads in the concurrent listing mode
+        """
+        return self.listing.fetch_geometa_files(urls, max_age)
+    
+    def set_geometa_files(self, listings: dict) -> bool:
+        """
+        Parameters
+        ----------
+        listings : dict
+            The fetched listings of one day as returned by 
+            fetch_geometa_files()
+
+        Returns
+        -------
+        bool
+            API function to hand over previously fetched geoMeta file(s) for
+            the current day; returning the status on their success
+        """
+        return self.listing.set_geometa_files(listings)
 
     def process_geometa_file(self) -> None:
         """
@@ -275,21 +576,29 @@ class ListingProcessHandler(ABC):
     def set_current_lfn(self, yy: str, jj: str) -> None:
         CARRIER = self.ref.cfg.carrier.lower()
         SENSOR = self.ref.cfg.sensor.lower()
-        self.current_lfn = f'{CARRIER}_{SENSOR}_listing_{yy}_{jj}.csv'
+        LFN = self.ref.io.get_listing_file_name(CARRIER, SENSOR, yy, jj)
+        self.current_lfn = LFN
+        self.current_day = (yy, jj)
     
     def get_current_url(self, url_type: str) -> str:
         return self.current_url[url_type]
+    
+    def get_current_urls(self) -> dict:
+        return dict(self.current_url)
 
     def get_current_lfn(self) -> str:
         return self.current_lfn
     
+    def get_current_day(self) -> tuple:
+        return self.current_day
+    
     def save_listing(self) -> None:
         N = self.ref.data.get_number_of_entries()
         if N > 0:
             LISTING_FILE = self.get_current_lfn()
             self.ref.io.set_listing_file_name(LISTING_FILE)
-            LISTING_DATA = self.ref.data.get_listing()
-            self.ref.io.to_csv(LISTING_DATA)
+            LISTING_DATA = self.ref.data.get_current_listing()
+            self.ref.io.save(LISTING_DATA, *self.get_current_day())
         else:
             logger.critical(f'No listing available/retrievable!')
             sys.exit()       
@@ -297,12 +606,40 @@ class ListingProcessHandler(ABC):
     def load_listing(self) -> None:
         LISTING_FILE = self.get_current_lfn()
         self.ref.io.set_listing_file_name(LISTING_FILE)
-        LOADED_LISTING_FILE = self.ref.io.from_csv()
-        self.ref.data.add_to_listing(LOADED_LISTING_FILE)
+        LOADED_LISTING_FILE = self.ref.io.load()
+        self.ref.data.add_to_listing(LOADED_LISTING_FILE, 
+                                     self.get_current_day())
+        
+    def load_listings(self, days: list) -> None:
+        CARRIER = self.ref.cfg.carrier.lower()
+        SENSOR = self.ref.cfg.sensor.lower()
+        AOIS = self.ref.aoi.get_aois()
+        MIN_FRAC = self.ref.cfg.listing_min_fraction
+        #status
+        logger.info(f'Loading {len(days)} existing file listings...')
+        LISTINGS = self.ref.io.load_bulk(CARRIER, SENSOR, days, AOIS, 
+                                         MIN_FRAC)
+        for DAY, LOADED_LISTING in LISTINGS.items():
+            self.ref.data.add_to_listing(LOADED_LISTING, DAY)
+        
+    def get_stored_listing(self) -> pd.DataFrame:
+        LISTING_FILE = self.get_current_lfn()
+        self.ref.io.set_listing_file_name(LISTING_FILE)
+        if not self.ref.io.listing_exists():
+            return pd.DataFrame()
+        df = self.ref.io.load()
+        #same reduction as for the bulk loading of existing listings
+        AOIS = list(self.ref.aoi.get_aois())
+        MIN_FRAC = self.ref.cfg.listing_min_fraction
+        VALID = df['aoi'].isin(AOIS) & (df['frac'] >= MIN_FRAC)
+        return df.loc[VALID].reset_index(drop=True)
         
     def get_listing(self) -> pd.DataFrame:
         return self.ref.data.get_listing()
     
+    def get_current_listing(self) -> pd.DataFrame:
+        return self.ref.data.get_current_listing()
+    
     
 class ModisListingProcessHandler(ListingProcessHandler):
     def set_current_url(self, yy: str, jj: str) -> None:
@@ -313,11 +650,14 @@ class ModisListingProcessHandler(ListingProcessHandler):
         meta_url = f'{self.ref.url["meta"]}{yy}/{GEOMETA}'
         mxd3_url = f'{self.ref.url["mxd03"]}{yy}/{jj}/' 
         mxd2_url = f'{self.ref.url["mxd02"]}{yy}/{jj}/' 
+        #machine-readable directory listing of the MXD021KM files
+        mxd2_lst = f'{self.ref.url["mxd02"]}{yy}/{jj}.json'
         
         #set current urls
         self.current_url = {'meta': meta_url,
                             'mxd03': mxd3_url,
-                            'mxd02': mxd2_url
+                            'mxd02': mxd2_url,
+                            'mxd02_listing': mxd2_lst,
                             }
     def _compile_geometa_filename(self, yy: str, mm: str, dd: str) -> str:
         #get prefix
@@ -350,6 +690,10 @@ class ListingRetrievalHandler(ABC):
         self.ref = host_class
         #allocate dict for temporary listing
         self.temporary_listing = {}
+        #processed extent of the current geoMeta file
+        self.geometa_state = None
+        #streaming parser of the geoMeta listing entries
+        self.parser = GeoMetaParser()
     
     @abstractmethod
     def get_geometa_file(self) -> bool:
@@ -364,6 +708,17 @@ class ListingRetrievalHandler(ABC):
     def _get_current_url_type(self) -> str:
         return self.current_url_type
     
+    def get_listing_url_types(self) -> list:
+        """
+        Returns
+        -------
+        list
+            All url types that need to be retrieved per day to compile the 
+            listing; child classes extend this if more than the geoMeta 
+            file is necessary
+        """
+        return ['meta']
+    
     def get_listing_file(self) -> bool:
         """
         Returns
@@ -376,11 +731,117 @@ class ListingRetrievalHandler(ABC):
         URL = self.ref.process.get_current_url(URL_TYPE)
         
         #call download function
-        REQUEST_OBJ = self.download_listing(URL)
+        MAX_AGE = self.ref.get_listing_max_age()
+        LISTING = self.fetch_listing(URL_TYPE, URL, MAX_AGE)
         
+        #store it and return status
+        return self.store_listing_file(URL_TYPE, LISTING)
+    
+    def fetch_listing_file(self, url: str, max_age: float = None) -> bytes:
+        """
+        Parameters
+        ----------
+        url : str
+            sensor/carrier specific listing url
+        max_age : float, optional
+            Maximum age [s] of a cached listing before it is revalidated
+
+        Returns
+        -------
+        bytes
+            The raw listing or None in case the retrieval failed; does not 
+            alter any state of the handler and is therefore safe to be called 
+            from several worker threads at once
+        """
+        #failed requests are already retried by the session
+        try:
+            REQUEST_OBJ = self.download_listing(url, max_age)
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Listing retrieval failed: {e}')
+            return None
         if REQUEST_OBJ.status_code == 200:
-            LISTING = self._parse_byte_listing(REQUEST_OBJ.content)
-            self.temporary_listing[URL_TYPE] = LISTING
+            return REQUEST_OBJ.content
+        else:
+            return None
+    
+    def fetch_geometa_listing(self, url: str, 
+                              max_age: float = None) -> GeoMetaListing:
+        """
+        Parameters
+        ----------
+        url : str
+            sensor/carrier specific geoMeta url
+        max_age : float, optional
+            Maximum age [s] of a cached listing before it is revalidated
+
+        Returns
+        -------
+        GeoMetaListing
+            The geoMeta listing parsed while it is streamed, i.e., without
+            holding its raw content, or None in case the retrieval failed; 
+            safe to be called from several worker threads at once
+        """
+        try:
+            REQUEST_OBJ = self.download_listing(url, max_age, stream=True)
+            if REQUEST_OBJ.status_code != 200:
+                REQUEST_OBJ.close()
+                return None
+            #listings served from the cache are already in memory
+            if getattr(REQUEST_OBJ, 'from_cache', False):
+                CHUNKS = [REQUEST_OBJ.content]
+            else:
+                CHUNKS = REQUEST_OBJ.iter_content(chunk_size=1024**2)
+            return self.parser.parse_stream(CHUNKS)
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Listing retrieval failed: {e}')
+            return None
+    
+    def fetch_listing(self, url_type: str, url: str, 
+                      max_age: float = None) -> object:
+        #geoMeta listings are parsed on the fly, all others are kept raw
+        if url_type == 'meta':
+            return self.fetch_geometa_listing(url, max_age)
+        return self.fetch_listing_file(url, max_age)
+    
+    def fetch_geometa_files(self, urls: dict, max_age: float = None) -> dict:
+        """
+        Parameters
+        ----------
+        urls : dict
+            The url's of one day as compiled by the ListingProcessHandler
+        max_age : float, optional
+            Maximum age [s] of cached listings before they are revalidated
+
+        Returns
+        -------
+        dict
+            The raw listings (or None on failure) for all necessary url 
+            types of this day
+        """
+        return {URL_TYPE: self.fetch_listing(URL_TYPE, urls[URL_TYPE], 
+                                             max_age)
+                for URL_TYPE in self.get_listing_url_types()}
+    
+    def store_listing_file(self, url_type: str, listing: bytes) -> bool:
+        """
+        Parameters
+        ----------
+        url_type : str
+            The url type the listing was retrieved from
+        listing : object
+            The raw listing, the parsed GeoMetaListing, or None in case 
+            the retrieval failed
+
+        Returns
+        -------
+        bool
+            True/False on the retrieval process completion.
+        """
+        if listing is not None:
+            self.temporary_listing[url_type] = listing
+            #keep track of the processed extent of full geoMeta files
+            if url_type == 'meta':
+                self._set_geometa_state(listing)
             #status
             logger.info(f'Retrieval complete!')
             #reset counter
@@ -394,12 +855,35 @@ class ListingRetrievalHandler(ABC):
             self.ref.error.increase_crit_counter()
             return False
         
-    def download_listing(self, url: str) -> object:
+    def set_geometa_files(self, listings: dict) -> bool:
+        """
+        Parameters
+        ----------
+        listings : dict
+            The fetched listings of one day as returned by 
+            fetch_geometa_files()
+
+        Returns
+        -------
+        bool
+            True/False on the retrieval process completion of all listings
+        """
+        STATUS = [self.store_listing_file(URL_TYPE, listings[URL_TYPE])
+                  for URL_TYPE in self.get_listing_url_types()]
+        return all(STATUS)
+        
+    def download_listing(self, url: str, max_age: float = None,
+                         stream: bool = False) -> object:
         """
         Parameters
         ----------
         url : str
             sensor/carrier specific download url
+        max_age : float, optional
+            Maximum age [s] of a cached listing before it is revalidated
+        stream : bool, optional
+            Whether to defer the content retrieval of uncached requests, 
+            e.g., to parse the listing while it arrives
 
         Returns
         -------
@@ -409,15 +893,113 @@ class ListingRetrievalHandler(ABC):
         #status
         logger.info(f'Retrieving listing file...')
         
-        #requests call
+        #requests call, served from/revalidated against the cache if set
         headers = {'Authorization': "Bearer {}".format(self.ref.token)}
-        r = requests.get(url, headers=headers)
+        if self.ref.cache is not None:
+            r = self.ref.cache.get(url, headers, max_age)
+        else:
+            r = self.ref.session.get(url, headers=headers, stream=stream)
 
         #return request object
         return r
         
-    def _parse_byte_listing(self, byte_listing) -> list:
-        return byte_listing.decode('UTF-8').split('\n')
+    def _set_geometa_state(self, listing: GeoMetaListing, 
+                           state: dict = None) -> None:
+        #only complete lines, i.e., up to the last line break, count
+        NBYTES = listing.nbytes
+        NLINES = listing.nlines
+        #extend the previous state in case of an appended tail
+        if state is not None:
+            NBYTES += state['bytes']
+            NLINES += state['lines']
+        self.geometa_state = {'url': self.ref.process.get_current_url('meta'),
+                              'bytes': NBYTES,
+                              'lines': NLINES,
+                              }
+        
+    def save_geometa_state(self) -> None:
+        """
+        Stores the processed extent of the current geoMeta file next to 
+        the listing for later incremental refreshes
+        """
+        if self.geometa_state is not None:
+            self.ref.io.save_state(self.geometa_state)
+    
+    def get_geometa_tail(self, state: dict) -> bool:
+        """
+        Parameters
+        ----------
+        state : dict
+            Processed extent of the geoMeta file as stored by 
+            save_geometa_state()
+
+        Returns
+        -------
+        bool
+            Whether the appended tail of the geoMeta file could be retrieved
+            (potentially being empty); False requires a full listing instead
+        """
+        #get url to download from
+        URL = self.ref.process.get_current_url('meta')
+        OFFSET = state['bytes']
+        if state.get('url') != URL:
+            return False
+        
+        #status
+        logger.info(f'Retrieving appended listing file tail...')
+        #requests call for the tail only
+        headers = {'Authorization': "Bearer {}".format(self.ref.token),
+                   'Range': f'bytes={OFFSET}-'}
+        try:
+            r = self.ref.session.get(url=URL, headers=headers)
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Listing retrieval failed: {e}')
+            return False
+        
+        #partial content, i.e., appended data
+        if r.status_code == 206:
+            TAIL = r.content
+        #range is ignored by the server
+        elif r.status_code == 200:
+            TAIL = r.content[OFFSET:]
+        #nothing appended
+        elif r.status_code == 416:
+            TAIL = b''
+        else:
+            #status
+            logger.info(f'Retrieval incomplete!')
+            logger.error(f'Error with file listing retrieval!')
+            #increase coutner
+            self.ref.error.increase_crit_counter()
+            return False
+        
+        #geoMeta file was replaced rather than appended upstream
+        TOTAL = self._get_total_size(r)
+        if TOTAL is not None and TOTAL < OFFSET:
+            logger.info(f'Listing file was replaced upstream!')
+            return False
+        
+        #only keep complete lines of the tail
+        TAIL = TAIL[:TAIL.rfind(b'\n') + 1]
+        LISTING = self.parser.parse_stream([TAIL], header_lines=0)
+        self.temporary_listing['meta'] = LISTING
+        self._set_geometa_state(LISTING, state)
+        #status
+        N = LISTING.nlines
+        logger.info(f'Retrieval complete! ({N} new entries)')
+        #reset counter
+        self.ref.error.reset_crit_counter()
+        return True
+    
+    def _get_total_size(self, r: object) -> int:
+        #returns the full size of the remote file if stated by the server
+        if r.status_code == 200:
+            return len(r.content)
+        CONTENT_RANGE = r.headers.get('Content-Range', '')
+        TOTAL = CONTENT_RANGE.split('/')[-1]
+        if TOTAL.isdigit():
+            return int(TOTAL)
+        return None
     
     @abstractmethod
     def process_geometa_file(self) -> None:
@@ -429,63 +1011,99 @@ class ListingRetrievalHandler(ABC):
         #parse listing
         self._parse_geometa_listing()
         
-        #allocate dataframe for listing storage
-        df = pd.DataFrame()
-        #loop over entries
-        for lst_entry in self.geometa:
-            #check for overlap with specified aoi's
-            aois, frac = self._validate_aoi_overlap(lst_entry)
-            
-            #process in case of overlap
-            if len(aois) > 0:
-                #get swath name from listing entry
-                SWATH = lst_entry[0]
-                #compile lists of aois/overlap fractions
-                AOI = [aoi for aoi in aois]
-                FRC = [frc for frc in frac]
-                #compose dict
-                d = {'url': self.ref.process.get_current_url('data'),
-                     'file': SWATH,
-                     'aoi': AOI,
-                     'frac': FRC,
-                     }
-                #append to df
-                df = pd.concat([df, pd.DataFrame(d)])
-        #update listing
-        df = df.reset_index().drop('index', axis=1)
-        #store in data container
-        self.ref.data.add_to_listing(df)
+        #check for overlap of all entries with specified aoi's
+        IDX, AOI, FRC = self._validate_aoi_overlap()
+        
+        #get swath names from listing entries
+        SWATHS = self.geometa.file[IDX].tolist()
+        #get url
+        URL = self.ref.process.get_current_url('data')
+        
+        #add all overlapping entries column-wise to the data container
+        self.ref.data.add_entries(url=[URL]*len(SWATHS),
+                                  file=SWATHS,
+                                  aoi=AOI.tolist(),
+                                  frac=FRC.tolist(),
+                                  **self._get_footprint_columns(IDX))
+        #materialize the day's listing in the data container
+        self.ref.data.commit_entries(self.ref.process.get_current_day())
     
     def _parse_geometa_listing(self) -> None:         
-        #listing file consists of various meta information w/ 
-        #line[0]:=file_name; line[9:12]:=RingLON; 
-        #line[13:16]:=RingLAT       
-        lst = [[s[0], s[9], s[10], s[11], s[12], s[13], s[14], s[15], s[16]]
-               for s in [e.split(',') 
-                         for e in self.temporary_listing['meta'][3:-1]]]
+        #typed columns of the necessary information, i.e., file names, 
+        #start times, flags, and rings, as parsed during the retrieval
+        self.geometa = self.temporary_listing['meta'].entries
         
-        #update temporary listing
-        self.geometa = lst
+        #drop all entries not passing the prefilter before overlap testing
+        if self.ref.filter.active:
+            VALID = self.ref.filter.apply(self.geometa)
+            #status
+            logger.info(f'Prefilter keeps {VALID.sum()}/{len(VALID)} '+
+                        f'geoMeta entries')
+            self.geometa = self.geometa[VALID]
         
-    def _validate_aoi_overlap(self, lst_entry: list) -> (list, list):
+    def get_granule_keys(self, df: pd.DataFrame) -> tuple:
+        """
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Listing of one day
+
+        Returns
+        -------
+        tuple
+            Granule keys identifying the acquisition and the production 
+            time stamps of all entries; for Sentinel-3 products, the 
+            mission, product type, and sensing period form the key, while 
+            the creation time stamp and baseline collection change on 
+            reprocessing; for LAADS products, e.g., VIIRS, the production 
+            time stamp is stripped from the file name as for MODIS
+        """
+        if df.shape[0] == 0:
+            return [], []
+        PATTERN = re.compile(r'^(.*_\d{8}T\d{6}_\d{8}T\d{6})_(\d{8}T\d{6})'+
+                             r'_.*_(\w+)\.SEN3')
+        #e.g., VNP03MOD.A2020245.0000.002.2021012345678.nc
+        LAADS_PATTERN = re.compile(r'^(\w+\.A\d{7}\.\d{4}\.\d{3})\.(\d{13})'+
+                                   r'\.\w+$')
+        KEYS, PRODUCTION = [], []
+        for granule in df['file'].astype(str):
+            MATCH = PATTERN.match(granule)
+            LAADS_MATCH = LAADS_PATTERN.match(granule)
+            if MATCH is not None:
+                KEYS.append(MATCH.group(1))
+                PRODUCTION.append(f'{MATCH.group(2)}_{MATCH.group(3)}')
+            elif LAADS_MATCH is not None:
+                KEYS.append(LAADS_MATCH.group(1))
+                PRODUCTION.append(LAADS_MATCH.group(2))
+            else:
+                KEYS.append(granule)
+                PRODUCTION.append('')
+        return KEYS, PRODUCTION
+    
+    def _get_footprint_columns(self, idx: np.array) -> dict:
+        #start time and bounding ring of the given entries, used for the 
+        #coverage planning of the retrieval
+        COLUMNS = {'start': self.geometa.start[idx].tolist()}
+        for i in range(4):
+            COLUMNS[f'lon{i+1}'] = self.geometa.lon[idx, i].tolist()
+        for i in range(4):
+            COLUMNS[f'lat{i+1}'] = self.geometa.lat[idx, i].tolist()
+        return COLUMNS
+        
+    def _validate_aoi_overlap(self) -> tuple:
         #check for overlap to exclude non-matching links from listing
-        AOIS = []
-        FRAC = []
         
-        #get aois to process
-        aois_to_check = self.ref.aoi.get_aois()
+        #swath bounding ring coordinates of all entries
+        LON = self.geometa.lon
+        LAT = self.geometa.lat
         
-        #check for overlap of bounding box with predefined aoi polygons
-        for aoi in aois_to_check:    
-            #check for overlap
-            grid = self.ref.aoi.get_aoi(aoi)
-            overlap, frac = grid.check_overlap_with_aoi(lst_entry)
-            if overlap and frac >= 5.0:
-                AOIS.append(aoi)
-                FRAC.append(frac)
+        #check for overlap of all bounding boxes with predefined aoi polygons
+        GRANULES = self.geometa.file.tolist()
+        IDX, AOIS, FRAC = self.ref.aoi.check_overlap(LON, LAT, GRANULES)
+        VALID = FRAC >= self.ref.cfg.listing_min_fraction
         
-        #return
-        return AOIS, FRAC
+        #return entry indices, aois and fractions of all valid overlaps
+        return IDX[VALID], AOIS[VALID], FRAC[VALID]
 
 
 class SlstrListingRetrievalHandler(ListingRetrievalHandler):
@@ -517,83 +1135,109 @@ class ModisListingRetrievalHandler(ListingRetrievalHandler):
         #call retrieval function and return its status
         STATUS_GEOMETA = self.get_listing_file()
         #set current url type to use
-        self._set_current_url_type('mxd02')
+        self._set_current_url_type('mxd02_listing')
         #call retrieval function and return its status
         STATUS_MXD02 = self.get_listing_file()
         #return status
-        return (STATUS_GEOMETA, STATUS_MXD02)
+        return all((STATUS_GEOMETA, STATUS_MXD02))
+    
+    def get_listing_url_types(self) -> list:
+        return ['meta', 'mxd02_listing']
+    
+    def get_geometa_tail(self, state: dict) -> bool:
+        """
+        Pairing of new MXD03 granules requires an up-to-date MXD021KM
+        listing in addition to the appended geoMeta tail
+        """
+        STATUS_GEOMETA = super().get_geometa_tail(state)
+        if not STATUS_GEOMETA:
+            return False
+        #set current url type to use
+        self._set_current_url_type('mxd02_listing')
+        #call retrieval function and return its status
+        STATUS_MXD02 = self.get_listing_file()
+        #return status
+        return all((STATUS_GEOMETA, STATUS_MXD02))
     
     def process_geometa_file(self) -> None:
         """
-        Sensor-specific adaptation of the base function, primarily allowing 
-        for a better matchmaking with the MXD021KM files through the use of 
-        datetags stored in the listing dataframe
+        Sensor-specific adaptation of the base function, pairing all MXD03
+        granules with their MXD021KM counterparts of the same acquisition 
+        and dropping all orphans, so that only complete granule pairs reach
+        the retrieval
         """
         #parse listing
         self._parse_geometa_listing()
         
-        #allocate dataframe for listing storage
-        df = pd.DataFrame()
+        #check for overlap of all entries with specified aoi's
+        IDX, AOI, FRC = self._validate_aoi_overlap()
         
-        #loop over entries
-        for lst_entry in self.geometa:
-            #check for overlap with specified aoi's
-            aois, frac = self._validate_aoi_overlap(lst_entry)
-            
-            #process in case of overlap
-            if len(aois) > 0:
-                #compile filename and date tag
-                HDF_FILE = lst_entry[0]
-                HDF_PARTS = HDF_FILE.split('.')
-                HDF_TAG = '.'.join(HDF_PARTS[1:4])
-                #compile lists of aois/overlap fractions
-                AOI = [aoi for aoi in aois]
-                FRC = [frc for frc in frac]
-                #get url's
-                URLS = self.ref.process.get_current_url('mxd03')
-                #compose dict
-                d = {'tag': HDF_TAG,
-                     'url_mxd03': URLS,
-                     'mxd03': HDF_FILE,
-                     'aoi': AOI,
-                     'frac': FRC,
-                     }
-                #append to df
-                df = pd.concat([df, pd.DataFrame(d)])
-            
-        #update listing
-        df_geometa = df.reset_index().drop('index', axis=1)
+        #compile filenames
+        HDF_FILES = self.geometa.file[IDX].tolist()
         
-        #parse mxd02 listing
+        #pair them with the indexed mxd02 files by acquisition tag
         self._parse_mxd02_listing()
+        MXD02_FILES = [self.mxd02.get(HDF_FILE) for HDF_FILE in HDF_FILES]
+        PAIRED = np.array([MXD02_FILE is not None 
+                           for MXD02_FILE in MXD02_FILES], dtype=bool)
         
-        #create search tags for mxd02
-        TAGS = ['.'.join(lst_entry.split('.')[1:4])
-                for lst_entry in self.mxd02]
+        #report orphans
+        ORPHANS = sorted(set(np.array(HDF_FILES, dtype=object)[~PAIRED]))
+        if len(ORPHANS) > 0:
+            logger.warning(f'Dropping {len(ORPHANS)} MXD03 granule(s) '+
+                           f'without MXD021KM counterpart: {ORPHANS}')
         
         #get url's
-        URLS = self.ref.process.get_current_url('mxd02')
-        
-        #compile df
-        df_mxd02 = pd.DataFrame({'tag': TAGS,
-                                 'url_mxd02': URLS,
-                                 'mxd02': self.mxd02})
-        
-        #join them on tags and rearrange them
-        df = df_geometa.join(df_mxd02.set_index('tag'), on='tag')
-        df.drop('tag', axis=1, inplace=True)
-        df = df[['url_mxd03', 'mxd03', 'url_mxd02', 'mxd02', 'aoi', 'frac']]
+        URL_MXD03 = self.ref.process.get_current_url('mxd03')
+        URL_MXD02 = self.ref.process.get_current_url('mxd02')
+        
+        #compile df column-wise in a single step of complete pairs only
+        df = pd.DataFrame({'url_mxd03': URL_MXD03,
+                           'mxd03': HDF_FILES,
+                           'url_mxd02': URL_MXD02,
+                           'mxd02': MXD02_FILES,
+                           'aoi': AOI,
+                           'frac': FRC,
+                           **self._get_footprint_columns(IDX),
+                           })
+        df = df.loc[PAIRED].reset_index(drop=True)
         #store in data container
-        self.ref.data.add_to_listing(df)
-
+        self.ref.data.add_to_listing(df, self.ref.process.get_current_day())
+
+    def get_granule_keys(self, df: pd.DataFrame) -> tuple:
+        """
+        MODIS granules are identified by their acquisition tag, while the 
+        production time stamps of both MXD03 and MXD021KM may change
+        """
+        if df.shape[0] == 0:
+            return [], []
+        MXD03 = df['mxd03'].astype(str).tolist()
+        MXD02 = df['mxd02'].astype(str).tolist()
+        KEYS = [GranuleIndex.get_tag(granule) for granule in MXD03]
+        PRODUCTION = [f'{self._get_production(m03)}_'+
+                      f'{self._get_production(m02)}' 
+                      for m03, m02 in zip(MXD03, MXD02)]
+        return KEYS, PRODUCTION
+    
+    def _get_production(self, granule: str) -> str:
+        #e.g., MOD03.A2020245.0000.061.2020245123456.hdf
+        PARTS = granule.split('.')
+        return PARTS[4] if len(PARTS) > 5 else ''
+    
     def _parse_mxd02_listing(self) -> None:
-        #create list of file links 
-        SEARCH_STR = '<a class="btn btn-default" href="/archive/allData/'
-        LST = [line.split('"')[3].split('/')[-1] \
-               for line in self.temporary_listing['mxd02'] 
-               if SEARCH_STR in line]
-        #update temporary listing
-        self.mxd02 = LST
+        #machine-readable directory listing, either as plain list or nested
+        #within a content field
+        try:
+            CONTENT = json.loads(self.temporary_listing['mxd02_listing'])
+        except ValueError:
+            logger.error(f'Error with MXD021KM listing parsing!')
+            CONTENT = []
+        if isinstance(CONTENT, dict):
+            CONTENT = CONTENT.get('content', [])
+        LST = [entry['name'] for entry in CONTENT 
+               if entry.get('name', '').endswith('.hdf')]
+        #update temporary listing as index of the acquisition tags
+        self.mxd02 = GranuleIndex(LST)
 
 
 
@@ -632,12 +1276,18 @@ class RetrievalProcessor(object):
         self._set_carrier()
         self._set_token()
         self._set_output_path()
+        self._set_session()
         #modules
         self._set_aoi_handler()
         self._set_swath_meta()
         self._set_swath_io()
         self._set_error_handler()
+        self._set_downloader()
+        self._set_prefetcher()
+        self._set_granule_cache()
+        self._set_scratch_manager()
         self._set_zip_handler()
+        self._set_pending_changes()
         
     """ Internal Getters/Setters for Processor Setup """        
     def _set_carrier(self) -> None:
@@ -681,8 +1331,82 @@ class RetrievalProcessor(object):
         #initiate download error handler
         self.error = DownloadErrorHandler()
         
+    def _set_session(self) -> None:
+        #initiate pooled, authenticated http session with one kept-alive 
+        #connection per concurrent transfer, retrying failed requests and 
+        #pausing them during host outages
+        WORKERS = self.cfg.download_workers
+        self.policy = RetryPolicy(**self.cfg.retry_policy)
+        BREAKER = CircuitBreaker(**self.cfg.circuit_breaker)
+        self.session = create_session(self.token, max(WORKERS, 2), 
+                                      self.policy, BREAKER)
+        
+    def _set_downloader(self) -> None:
+        #initiate streaming swath downloader
+        CHUNK_SIZE = self.cfg.download_chunk_size
+        PROGRESS = self.cfg.download_progress_step
+        WORKERS = self.cfg.download_workers
+        #status
+        logger.info(f'Set download chunk size: {CHUNK_SIZE / 1024**2:.1f} MB')
+        logger.info(f'Set number of concurrent downloads: {WORKERS}')
+        self.downloader = FileDownloader(CHUNK_SIZE, self.session, PROGRESS,
+                                         self.policy)
+        #and the pool of concurrent transfers to submit swaths to
+        self.downloads = DownloadManager(self.downloader, WORKERS)
+        
+    def _set_prefetcher(self) -> None:
+        #initiate background retrieval of the upcoming swaths if specified
+        self.prefetch_count = self.cfg.prefetch_count
+        self.prefetched = {}
+        if self.prefetch_count > 0:
+            #status
+            logger.info(f'Set number of prefetched swaths: '+
+                        f'{self.prefetch_count}')
+            self.prefetcher = ThreadPoolExecutor(
+                max_workers=self.prefetch_count)
+        else:
+            self.prefetcher = None
+        
+    def _set_granule_cache(self) -> None:
+        #initiate persistent raw granule cache if specified
+        if self.cfg.apply_granule_cache:
+            CACHE_PATH = self.cfg.granule_cache_path
+            BUDGET = self.cfg.granule_cache_budget
+            #status
+            logger.info(f'Set granule cache directory: {CACHE_PATH} '+
+                        f'({BUDGET / 1024**3:.0f} GB)')
+            self.granules = GranuleCache(CACHE_PATH, BUDGET)
+        else:
+            self.granules = None
+        
+    def _set_scratch_manager(self) -> None:
+        #initiate bookkeeping of the scratch space against a quota, where 
+        #cached granules are the least valuable data
+        QUOTA = self.cfg.scratch_quota
+        if QUOTA > 0:
+            #status
+            logger.info(f'Set scratch quota: {QUOTA / 1024**3:.1f} GB')
+        self.scratch = ScratchManager(QUOTA)
+        if self.granules is not None:
+            self.scratch.add_evictable(self.granules.get_size, 
+                                       self.granules.evict)
+        
     def _set_zip_handler(self) -> None:
-        self.zip = ZipFileHandler(self.rawout)
+        #read the members of zip files in place instead of extracting them 
+        #if specified and supported by the input handler
+        IN_PLACE = self.cfg.read_zip_members
+        if IN_PLACE and not self.io.supports_zip_members():
+            logger.warning(f'Zip members cannot be read in place, they are '+
+                           f'extracted instead!')
+            IN_PLACE = False
+        self.zip = ZipFileHandler(self.rawout, IN_PLACE, self.scratch)
+        
+    def _set_pending_changes(self) -> None:
+        #pending work list of the diff mode to be cleared swath by swath
+        if self.cfg.apply_listing_diff:
+            self.pending = self.cfg.setup_pending_io()
+        else:
+            self.pending = None
         
     """ High-level API's """
     def set_swath_id(self, entry: pd.Series) -> None:
@@ -766,6 +1490,36 @@ class RetrievalProcessor(object):
         """
         return self.listing
     
+    def get_prefetch_count(self) -> int:
+        """
+        Returns
+        -------
+        int
+            API function to return the number of upcoming swaths retrieved 
+            in the background while the current one is processed
+        """
+        return self.prefetch_count
+    
+    def prefetch_swath(self, entry: pd.Series) -> None:
+        """
+        Parameters
+        ----------
+        entry : pd.Series
+            Upcoming swath of the parsed listing
+
+        Returns
+        -------
+        None
+            API function to be called by the Retrieval() Class to retrieve 
+            (and unpack) an upcoming swath in the background, without 
+            altering the state of the currently processed swath
+        """
+        URLS = tuple(self.swath.get_swath_urls(entry))
+        if self.prefetcher is None or URLS in self.prefetched:
+            return
+        self.prefetched[URLS] = self.prefetcher.submit(
+            self.retrieval.prefetch_swath_file, URLS)
+    
     def get_swath_file(self) -> bool:
         """
         Returns
@@ -773,6 +1527,20 @@ class RetrievalProcessor(object):
         bool
             API function to return the status of the swath retrieval process
         """
+        #wait for the background retrieval of the current swath if any
+        URLS = tuple(self.swath.get_swath_urls())
+        PREFETCHED = self.prefetched.pop(URLS, None)
+        if PREFETCHED is not None:
+            #the current swath must not wait for scratch space
+            for URL in URLS:
+                SWATH = URL.split('/')[-1]
+                self.scratch.prioritize(os.path.join(self.rawout, SWATH))
+            try:
+                PREFETCHED.result()
+            except Exception as e:
+                #any failure of the worker is retried in the foreground
+                logger.warning(f'Background retrieval failed: {e}, '+
+                               'retrieving in the foreground...')
         STATUS = self.retrieval.get_swath_file()
         return STATUS
 
@@ -784,6 +1552,30 @@ class RetrievalProcessor(object):
         META_STACK = self.meta.data
         self.swath.load_and_process_swath(META_STACK)
             
+    def complete_swath(self) -> None:
+        """
+        API function removing the current swath from the pending work list 
+        of the diff mode after it was processed
+        """
+        if self.pending is None:
+            return
+        ENTRIES = self.swath.get_listing_entries()
+        self.pending.complete(self.raw_listing.loc[ENTRIES])
+        
+    def remove_outdated_output(self) -> None:
+        """
+        API function removing all existing output files of the current 
+        swath if it is part of the work list of the diff mode, i.e., it was
+        replaced upstream or its earlier processing was interrupted, so 
+        that its outputs are written anew instead of being appended to
+        """
+        if 'change' not in self.raw_listing.columns:
+            return
+        ENTRIES = self.swath.get_listing_entries()
+        CHANGE = self.raw_listing['change'].loc[ENTRIES]
+        if CHANGE.isin(['added', 'replaced']).any():
+            self.swath.remove_output_swaths()
+            
     def save_swath(self) -> None:
         """
         API function to handle the swath saving to h5 format by separating 
@@ -806,6 +1598,15 @@ class RetrievalProcessor(object):
         """
         self.swath.cleanup()
         
+    def close_downloads(self) -> None:
+        """
+        API function to shut down the pool of concurrent downloads and 
+        background retrievals after all swaths have been processed
+        """
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+        self.downloads.shutdown()
+        
     def identify_resample_aois(self) -> None:
         """
         API function to identify the current swath-specific AOI's that it 
@@ -834,7 +1635,9 @@ class RetrievalProcessor(object):
 class DownloadErrorHandler(object):
     """
     Convenience class to handle the download error management for swath and 
-    listing retrieval to reduce boilerplate code
+    listing retrieval to reduce boilerplate code; host outages are handled 
+    by the retry policy and circuit breaker of the session, so consecutive 
+    failures are only reported while the job continues
     """
     def __init__(self, crit: int = 5):
         #counters for download failures
@@ -843,11 +1646,11 @@ class DownloadErrorHandler(object):
         
     def increase_crit_counter(self) -> None:
         self.current_download_failures += 1
-        if self.current_download_failures == self.critical_download_failures:
-            msg = f'Critical value ({self.critical_download_failures}) of '\
-                f'download failures reached!'
-            logger.critical(msg)
-            sys.exit()
+        if self.current_download_failures % self.critical_download_failures \
+            == 0:
+            msg = f'{self.current_download_failures} consecutive download '\
+                f'failures!'
+            logger.error(msg)
             
     def reset_crit_counter(self) -> None:
         self.current_download_failures = 0
@@ -859,8 +1662,14 @@ class ZipFileHandler(object):
     Convenience class to handle the management of swath's downloaded as ZIP
     files to reduce boilerplate code
     """
-    def __init__(self, outpath: str):
+    def __init__(self, outpath: str, in_place: bool = False, 
+                 scratch: ScratchManager = None):
         self.outpath = outpath
+        #account extracted content against the scratch quota
+        self.scratch = scratch or ScratchManager()
+        #read zip members in place, which keeps the zip file opened
+        self.in_place = in_place
+        self.opened = False
     
     def set_zip_path(self, swath: str) -> None:
         #save zip file location and output path
@@ -869,25 +1678,182 @@ class ZipFileHandler(object):
     def get_zip_path(self) -> str:
         return self.zippath
         
-    def load_zip_file(self) -> None:
+    def load_zip_file(self) -> bool:
         #open zipfile and stores content pathing/folder structure
         ZIPPATH = self.get_zip_path()
-        self.zipfile = zipfile.ZipFile(ZIPPATH, 'r')
+        try:
+            self.zipfile = zipfile.ZipFile(ZIPPATH, 'r')
+        except zipfile.BadZipFile:
+            logger.error(f'Corrupt zip file: {os.path.basename(ZIPPATH)}!')
+            os.remove(ZIPPATH)
+            self.scratch.release(ZIPPATH)
+            return False
+        self._set_zip_content()
+        self.opened = self.in_place
+        return True
+    
+    def load_zip_content(self, content: bytes) -> bool:
+        #open a zip file retrieved into memory, whose members are always 
+        #read in place
+        try:
+            self.zipfile = zipfile.ZipFile(io.BytesIO(content), 'r')
+        except zipfile.BadZipFile:
+            logger.error(f'Corrupt zip file: '+
+                         f'{os.path.basename(self.get_zip_path())}!')
+            self.scratch.release(self.get_zip_path())
+            return False
+        self._set_zip_content()
+        self.opened = True
+        return True
+    
+    def _set_zip_content(self) -> None:
+        #store content pathing/folder structure of the opened zip file
         ZIPLIST = self.zipfile.namelist()
         self.ziplist = [os.path.join(z[0],z[1]) 
                         for z in [f.split('/') for f in ZIPLIST[1:]]]
         self.zipdir = ZIPLIST[0]
+        self.members = {os.path.basename(f): f for f in ZIPLIST[1:]}
+        self.extpath = os.path.join(self.outpath, self.zipdir)
         
     def extract_zip_file(self) -> None:
-        #extract file content and store folder location w/ zip folder
-        self.zipfile.extractall(self.outpath)
+        #extract file content and store folder location w/ zip folder, 
+        #unless it was already extracted in the background
+        self.extpath = os.path.join(self.outpath, self.zipdir)
+        if not self._is_extracted(self.zipfile):
+            SIZE = self._get_content_size(self.zipfile.infolist())
+            self.scratch.reserve(self.extpath, SIZE, block=False)
+            self.zipfile.extractall(self.outpath)
+        
+    def _is_extracted(self, zip_file: zipfile.ZipFile) -> bool:
+        for member in zip_file.infolist():
+            PATH = os.path.join(self.outpath, member.filename)
+            if member.is_dir():
+                continue
+            if not os.path.isfile(PATH) or \
+                os.path.getsize(PATH) != member.file_size:
+                return False
+        return True
+    
+    @staticmethod
+    def _get_content_size(members: list) -> int:
+        #uncompressed size [bytes] of the given zip members
+        return sum([member.file_size for member in members])
+    
+    def extract_remote_zip(self, session: object, url: str, members: list,
+                           block_size: int = 8 * 1024**2, 
+                           block: bool = False) -> tuple:
+        """
+        Parameters
+        ----------
+        session : object
+            http session to use for the range requests
+        url : str
+            url of the remote zip file
+        members : list
+            file names of the zip members to extract
+        block_size : int, optional
+            minimum number of bytes retrieved per range request
+        block : bool, optional
+            whether to wait for scratch space, e.g., in the background
+
+        Returns
+        -------
+        tuple
+            the zip folder and the extracted members, or None if the remote 
+            zip file cannot be read; only the central directory and the 
+            selected members are retrieved, while members already extracted,
+            e.g., in the background, are skipped
+        """
+        try:
+            reader = HttpRangeReader(session, url, block_size)
+            with zipfile.ZipFile(reader) as f:
+                ZIPDIR = f.namelist()[0]
+                SELECTED = [info for info in f.infolist() 
+                            if os.path.basename(info.filename) in members]
+                #accounted with the (non-existent) zip file itself
+                SWATH = url.split('/')[-1]
+                self.scratch.reserve(os.path.join(self.outpath, SWATH),
+                                     self._get_content_size(SELECTED), block)
+                for info in SELECTED:
+                    PATH = os.path.join(self.outpath, info.filename)
+                    if os.path.isfile(PATH) and \
+                        os.path.getsize(PATH) == info.file_size:
+                        continue
+                    f.extract(info, self.outpath)
+        except (zipfile.BadZipFile, OSError) as e:
+            logger.error(f'Remote zip file retrieval failed: {e}')
+            self.scratch.release(os.path.join(self.outpath, 
+                                              url.split('/')[-1]))
+            return None
+        #status
+        logger.info(f'Retrieved {len(SELECTED)} zip members: '+
+                    f'{reader.received / 1e6:.1f}/{reader.size / 1e6:.1f} MB '+
+                    f'in {reader.requests} requests')
+        return ZIPDIR, [info.filename for info in SELECTED]
+    
+    def load_remote_zip_file(self, session: object, url: str, members: list,
+                             block_size: int = 8 * 1024**2) -> bool:
+        #retrieve selected members and store the pathing/folder structure
+        RESULT = self.extract_remote_zip(session, url, members, block_size)
+        if RESULT is None:
+            return False
+        self.zipdir, ZIPLIST = RESULT
+        self.ziplist = [os.path.join(z[0],z[1]) 
+                        for z in [f.split('/') for f in ZIPLIST]]
         self.extpath = os.path.join(self.outpath, self.zipdir)
+        self.opened = False
+        return True
+    
+    def extract_zip(self, swath: str) -> bool:
+        """
+        Parameters
+        ----------
+        swath : str
+            zip file name within the output path
+
+        Returns
+        -------
+        bool
+            extraction successful? True/False; stateless counterpart of 
+            load_zip_file()/extract_zip_file() for background extractions
+        """
+        try:
+            with zipfile.ZipFile(os.path.join(self.outpath, swath)) as f:
+                if not self._is_extracted(f):
+                    #optional, i.e., skipped without enough scratch space
+                    EXTPATH = os.path.join(self.outpath, f.namelist()[0])
+                    SIZE = self._get_content_size(f.infolist())
+                    if not self.scratch.try_reserve(EXTPATH, SIZE):
+                        return False
+                    f.extractall(self.outpath)
+        except zipfile.BadZipFile:
+            return False
+        return True
         
     def get_unzip_path(self) -> str:
         return self.extpath
+    
+    def is_opened(self) -> bool:
+        #whether the members are read in place from the opened zip file
+        return self.opened
+    
+    def get_zip_file(self) -> zipfile.ZipFile:
+        return self.zipfile
+    
+    def get_member(self, filename: str) -> str:
+        #returns the zip member name corresponding to the given file name
+        return self.members[os.path.basename(filename)]
         
     def close_zip_file(self) -> None:
         self.zipfile.close()
+        self.opened = False
+    
+    def remove_content(self) -> None:
+        #close zip files read in place, else remove the extracted content
+        if self.is_opened():
+            self.close_zip_file()
+        else:
+            self.remove_extracted_content()
         
     def remove_extracted_content(self) -> None:
         logger.info(f'Removing extracted zip-file content...')
@@ -896,6 +1862,7 @@ class ZipFileHandler(object):
             os.remove(f)
         logger.info(f'Removing extracted zip-file folder...')
         os.rmdir(self.extpath)
+        self.scratch.release(self.extpath)
 
    
 """ Swath Handling """
@@ -906,7 +1873,7 @@ class SwathHandler(ABC):
      
     @abstractmethod
     def set_swath_id(self, entry: pd.Series) -> None:
-        SWATH = entry[0]
+        SWATH = entry.iloc[0]
         self.id = SWATH
 
     @abstractmethod
@@ -916,6 +1883,12 @@ class SwathHandler(ABC):
             SWATH = SWATH.split('/')[-1]
         return SWATH
     
+    def get_swath_urls(self, entry: pd.Series = None) -> list:
+        #returns all download urls of the given or the current swath
+        if entry is None:
+            return [self.id]
+        return [entry.iloc[0]]
+    
     @abstractmethod
     def load_and_process_swath(self, metastack: MetaStack) -> None:
         #keep track of currently loaded data
@@ -923,9 +1896,7 @@ class SwathHandler(ABC):
         #loop over all meta variables in meta data
         for metavar in metastack:
             #open file connection
-            FILENAME = metavar.input_file
-            FILEPATH = os.path.join(self.ref.rawout, FILENAME)
-            self.ref.io.open_input_swath(FILEPATH)
+            self._open_input_swath(metavar)
             #get variable and export to DataVariable
             datavar = self.ref.io.get_variable(metavar)
             #close file connection
@@ -936,6 +1907,11 @@ class SwathHandler(ABC):
             loaded_data.append(datavar)
         #store data
         self.ref.swathstack = DataStack(loaded_data)    
+        
+    def _open_input_swath(self, metavar: MetaVariable) -> None:
+        FILENAME = metavar.input_file
+        FILEPATH = os.path.join(self.ref.rawout, FILENAME)
+        self.ref.io.open_input_swath(FILEPATH)
 
 
     @abstractmethod
@@ -945,6 +1921,11 @@ class SwathHandler(ABC):
         AOI_LIST = LISTING['aoi'].loc[LISTING['file']==SWATH].tolist()
         self.ref.overlapping_aois = AOI_LIST
         
+    def get_listing_entries(self) -> pd.Series:
+        #mask of all raw listing entries of the current swath
+        SWATH = self.get_swath_id(swath_only=True)
+        return self.ref.raw_listing['file'] == SWATH
+        
     def resample_swath(self, datastack: DataStack) -> None:
         #get data types and subset
         list_of_datatypes = np.unique(datastack.datatypes)
@@ -1066,6 +2047,17 @@ class SwathHandler(ABC):
         #compile and return
         return f'{CARRIER}_{SENSOR}_{DATE}_{VERSION}_{EXT}.h5'
     
+    def remove_output_swaths(self) -> None:
+        #all output files of the current swath share their name up to the 
+        #processing state, i.e., raw or the resampled AOI's
+        PREFIX = self._compile_output_swath_name()[:-len('raw.h5')]
+        for f in os.scandir(self.ref.out):
+            if f.is_file() and f.name.startswith(PREFIX) and \
+                f.name.endswith('.h5'):
+                #status
+                logger.info(f'Removing outdated output file: {f.name}')
+                os.remove(f.path)
+    
     @abstractmethod
     def _get_date_from_swath_file(self) -> str:
         pass
@@ -1085,8 +2077,16 @@ class SwathHandler(ABC):
     def _remove_swath(self, swath: str) -> bool:
         FILENAME = swath
         FILEPATH = os.path.join(self.ref.rawout, FILENAME)
+        #nothing to remove, e.g., for members retrieved from remote zip files
+        if not os.path.isfile(FILEPATH):
+            self.ref.scratch.release(FILEPATH)
+            return True
         try:
+            #keep the raw granule for later jobs if specified
+            if self.ref.granules is not None:
+                self.ref.granules.add(FILENAME, FILEPATH)
             self.ref.io.cleanup(FILEPATH)
+            self.ref.scratch.release(FILEPATH)
             return True
         except:
             return False    
@@ -1115,6 +2115,14 @@ class SlstrSwathHandler(SwathHandler):
         """
         UNZIPPATH = self.ref.zip.get_unzip_path()
         self.ref.meta.update_input_parameter(UNZIPPATH)
+    
+    def _open_input_swath(self, metavar: MetaVariable) -> None:
+        #read the member in place from the opened zip file if specified
+        if self.ref.zip.is_opened():
+            MEMBER = self.ref.zip.get_member(metavar.input_file)
+            self.ref.io.open_input_member(self.ref.zip.get_zip_file(), MEMBER)
+        else:
+            super()._open_input_swath(metavar)
         
     def _get_date_from_swath_file(self) -> str:
         #get swath id
@@ -1129,8 +2137,8 @@ class SlstrSwathHandler(SwathHandler):
         return f'{yyjj}_{hhmm}'
     
     def cleanup(self) -> None:
-        #remove extracted zipfile content
-        self.ref.zip.remove_extracted_content()
+        #close or remove extracted zipfile content
+        self.ref.zip.remove_content()
         #remove the zip file that was downloaded
         super().cleanup()
         
@@ -1161,6 +2169,14 @@ class OlciSwathHandler(SwathHandler):
         """
         UNZIPPATH = self.ref.zip.get_unzip_path()
         self.ref.meta.update_input_parameter(UNZIPPATH)
+    
+    def _open_input_swath(self, metavar: MetaVariable) -> None:
+        #read the member in place from the opened zip file if specified
+        if self.ref.zip.is_opened():
+            MEMBER = self.ref.zip.get_member(metavar.input_file)
+            self.ref.io.open_input_member(self.ref.zip.get_zip_file(), MEMBER)
+        else:
+            super()._open_input_swath(metavar)
         
     def _get_date_from_swath_file(self) -> str:
         #get swath id
@@ -1175,8 +2191,8 @@ class OlciSwathHandler(SwathHandler):
         return f'{yyjj}_{hhmm}'
     
     def cleanup(self) -> None:
-        #remove extracted zipfile content
-        self.ref.zip.remove_extracted_content()
+        #close or remove extracted zipfile content
+        self.ref.zip.remove_content()
         #remove the zip file that was downloaded
         super().cleanup()
         
@@ -1186,9 +2202,15 @@ class OlciSwathHandler(SwathHandler):
         
 class ModisSwathHandler(SwathHandler):
     def set_swath_id(self, entry: pd.Series) -> None:
-        SWATHS = {'mxd03': entry[0],'mxd02': entry[1]}
+        SWATHS = {'mxd03': entry.iloc[0],'mxd02': entry.iloc[1]}
         self.id = SWATHS
     
+    def get_swath_urls(self, entry: pd.Series = None) -> list:
+        #returns both MXD03 and MXD02 urls of the given or the current swath
+        if entry is None:
+            return [self.id['mxd03'], self.id['mxd02']]
+        return [entry.iloc[0], entry.iloc[1]]
+    
     def get_swath_id(self, swath_only: bool) -> tuple:
         URLS = self.id
         if swath_only:
@@ -1247,6 +2269,11 @@ class ModisSwathHandler(SwathHandler):
         LISTING = self.ref.raw_listing
         AOI_LIST = LISTING['aoi'].loc[LISTING['mxd03']==SWATH].tolist()
         self.ref.overlapping_aois = AOI_LIST
+        
+    def get_listing_entries(self) -> pd.Series:
+        #mask of all raw listing entries of the current MXD03/MXD02 pair
+        SWATH = self.get_swath_id(swath_only=True)['mxd03']
+        return self.ref.raw_listing['mxd03'] == SWATH
     
 
 """ Retrieval procedure """
@@ -1254,6 +2281,10 @@ class RetrievalHandler(ABC):
     def __init__(self, host_class: object):
         #keep instance of the host class to use this as nestes class
         self.ref = host_class
+        #swath files retrieved into memory in the background
+        self.fetched = {}
+        #remote sizes of swath files to be retrieved to disk instead
+        self.sizes = {}
     
     @abstractmethod
     def parse_swath_listing(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -1316,9 +2347,9 @@ class RetrievalHandler(ABC):
                             if f.is_file()]
         #retrieve current swath id's
         SWATH = self.ref.swath.get_swath_id(swath_only=True)
-        #only download in case do not already exist
-        SWATH_EXISTS = SWATH in DOWNLOADED_FILES
+        #only download in case do not already exist (completely)
         URL = self.ref.swath.get_swath_id(swath_only=False)
+        SWATH_EXISTS = self.check_swath_file(SWATH, URL, DOWNLOADED_FILES)
         if not SWATH_EXISTS:
             status = self.download_swath(URL)
         else:
@@ -1329,6 +2360,236 @@ class RetrievalHandler(ABC):
         #return
         return status
 
+    def prefetch_swath_file(self, urls: tuple) -> bool:
+        """
+        Parameters
+        ----------
+        urls : tuple
+            all download urls of an upcoming swath
+        
+        Returns
+        -------
+        Bool :
+            background retrieval successful? True/False; runs in a worker 
+            thread and therefore leaves the error handling and the state of 
+            the current swath to get_swath_file()
+        """
+        futures = []
+        for URL in urls:
+            SWATH = URL.split('/')[-1]
+            PATH = os.path.join(self.ref.rawout, SWATH)
+            if os.path.isfile(PATH) or self.restore_swath_file(SWATH):
+                continue
+            #wait for enough scratch space
+            self.reserve_swath_file(URL, PATH)
+            future = self.ref.downloads.submit(URL, PATH)
+            future.add_done_callback(
+                lambda f, PATH=PATH: self.release_swath_file(PATH, f))
+            futures.append(future)
+        STATUS = all([future.result() for future in futures])
+        if STATUS:
+            self.prepare_swath_file(urls)
+        return STATUS
+    
+    def reserve_swath_file(self, url: str, path: str, 
+                           block: bool = True) -> None:
+        """
+        Parameters
+        ----------
+        url : str
+            sensor/carrier specific download url
+        path : str
+            target path of the swath file
+        block : bool, optional
+            whether to wait for enough scratch space, e.g., for background 
+            retrievals, or to exceed the scratch quota for the current swath
+
+        Returns
+        -------
+        None
+            Accounts the swath file against the scratch quota until it is 
+            removed after processing or its retrieval fails
+        """
+        #size already requested to decide on memory or disk if any
+        SIZE = self.sizes.pop(url, None)
+        if not self.ref.scratch.is_limited():
+            return
+        if SIZE is None:
+            SIZE = self.ref.downloader.get_remote_size(url) or 0
+        self.ref.scratch.reserve(path, SIZE, block)
+        
+    def release_swath_file(self, path: str, future: object) -> None:
+        #release the scratch space of failed retrievals
+        if future.exception() is not None or not future.result():
+            self.ref.scratch.release(path)
+    
+    def prepare_swath_file(self, urls: tuple) -> None:
+        """
+        Parameters
+        ----------
+        urls : tuple
+            all download urls of a retrieved upcoming swath
+
+        Returns
+        -------
+        None
+            Hook to unpack prefetched swath files in the background
+        """
+        pass
+    
+    def check_swath_file(self, swath: str, url: str, 
+                         downloaded_files: list) -> bool:
+        """
+        Parameters
+        ----------
+        swath : str
+            swath file name
+        url : str
+            sensor/carrier specific download url
+        downloaded_files : list
+            all files currently stored in the temporary directory
+        
+        Returns
+        -------
+        Bool :
+            swath file already present and complete? True/False; 
+            incomplete files, e.g., left by an interrupted job, are removed
+        """
+        if swath not in downloaded_files:
+            return self.restore_swath_file(swath)
+        PATH = os.path.join(self.ref.rawout, swath)
+        if self.ref.downloader.verify(PATH, url):
+            return True
+        #status
+        logger.warning(f'Swath file: {swath} is incomplete or unverified!')
+        os.remove(PATH)
+        return False
+        
+    def check_for_remote_zip(self, url: str) -> bool:
+        """
+        Parameters
+        ----------
+        url : str
+            sensor/carrier specific download url of a zipped swath
+        
+        Returns
+        -------
+        Bool :
+            retrieve only the necessary members of the remote zip file? 
+            True/False; local (downloaded or cached) zip files take 
+            precedence
+        """
+        if not self.ref.cfg.apply_remote_zip:
+            return False
+        SWATH = url.split('/')[-1]
+        PATH = os.path.join(self.ref.rawout, SWATH)
+        return not os.path.isfile(PATH) and not self.restore_swath_file(SWATH)
+    
+    def get_zip_members(self) -> list:
+        #returns the file names of all zip members referenced by the meta data
+        return sorted(set([os.path.basename(var.input_file) 
+                           for var in self.ref.meta.data]))
+    
+    def get_remote_zip_file(self, url: str, background: bool = False) -> bool:
+        """
+        Parameters
+        ----------
+        url : str
+            sensor/carrier specific download url of a zipped swath
+        background : bool, optional
+            whether called by a background retrieval, which leaves the state
+            of the zip handler and the error handling untouched
+
+        Returns
+        -------
+        Bool :
+            retrieval of all necessary zip members successful? True/False
+        """
+        MEMBERS = self.get_zip_members()
+        BLOCK_SIZE = self.ref.cfg.download_chunk_size
+        if background:
+            RESULT = self.ref.zip.extract_remote_zip(self.ref.session, url, 
+                                                     MEMBERS, BLOCK_SIZE, 
+                                                     block=True)
+            return RESULT is not None
+        #status
+        logger.info(f'Retrieving zip members of swath file: '+
+                    f'{url.split("/")[-1]}')
+        SUCCESS = self.ref.zip.load_remote_zip_file(self.ref.session, url,
+                                                    MEMBERS, BLOCK_SIZE)
+        if SUCCESS:
+            self.ref.error.reset_crit_counter()
+        else:
+            self.ref.error.increase_crit_counter()
+        return SUCCESS
+    
+    def fetch_swath_file(self, url: str, background: bool = False) -> bytes:
+        """
+        Parameters
+        ----------
+        url : str
+            sensor/carrier specific download url of a zipped swath
+        background : bool, optional
+            whether called by a background retrieval, which keeps the 
+            content for get_swath_file() and leaves the error handling 
+            untouched
+
+        Returns
+        -------
+        bytes :
+            swath file content retrieved into memory or None if the swath 
+            file needs to be on disk, i.e., it is already available locally,
+            its members cannot be read in place, it is kept in the granule 
+            cache, or it exceeds the in-memory limit
+        """
+        LIMIT = self.ref.cfg.in_memory_limit
+        if LIMIT == 0 or not self.ref.zip.in_place or \
+            self.ref.granules is not None:
+            return None
+        #swath file already retrieved in the background
+        if not background and url in self.fetched:
+            return self.fetched.pop(url)
+        SWATH = url.split('/')[-1]
+        if os.path.isfile(os.path.join(self.ref.rawout, SWATH)):
+            return None
+        #single HEAD request deciding on memory or disk, whose size is kept
+        #for the scratch reservation of swath files retrieved to disk
+        SIZE = self.ref.downloader.get_remote_size(url)
+        CONTENT = None
+        if SIZE is not None and SIZE <= LIMIT:
+            CONTENT = self.ref.downloader.fetch(url, LIMIT, SIZE)
+        if CONTENT is None:
+            self.sizes[url] = SIZE
+            return None
+        if background:
+            self.fetched[url] = CONTENT
+        else:
+            #status
+            logger.info(f'Retrieved swath file into memory: {SWATH}')
+            self.ref.error.reset_crit_counter()
+        return CONTENT
+    
+    def restore_swath_file(self, swath: str) -> bool:
+        """
+        Parameters
+        ----------
+        swath : str
+            swath file name
+        
+        Returns
+        -------
+        Bool :
+            swath file restored from the granule cache? True/False
+        """
+        if self.ref.granules is None:
+            return False
+        PATH = os.path.join(self.ref.rawout, swath)
+        RESTORED = self.ref.granules.get(swath, PATH)
+        #cached granules are complete by definition
+        if RESTORED:
+            self.ref.downloader.set_verified(PATH)
+        return RESTORED
+        
     def download_swath(self, url: str) -> bool:
         """
         Parameters
@@ -1341,20 +2602,47 @@ class RetrievalHandler(ABC):
         Bool :
             download successful? True/False
         """
+        return self.complete_swath_download(self.submit_swath(url))
+    
+    def submit_swath(self, url: str) -> object:
+        """
+        Parameters
+        ----------
+        url : str
+            sensor/carrier specific download url
+        
+        Returns
+        -------
+        Future :
+            download status of the swath streamed to disk in chunks by the
+            pool of concurrent transfers
+        """
         #solely the swath file name
         swath = url.split('/')[-1]
         
         #status
         logger.info(f'Retrieving swath file: {swath}')
+        PATH = os.path.join(self.ref.rawout, swath)
+        self.reserve_swath_file(url, PATH, block=False)
+        future = self.ref.downloads.submit(url, PATH)
+        future.add_done_callback(lambda f: self.release_swath_file(PATH, f))
+        return future
+    
+    def complete_swath_download(self, future: object) -> bool:
+        """
+        Parameters
+        ----------
+        future : Future
+            download status as returned by submit_swath()
+        
+        Returns
+        -------
+        Bool :
+            download successful? True/False
+        """
+        SUCCESS = future.result()
 
-        #requests call
-        headers = {'Authorization': "Bearer {}".format(self.ref.token)}
-        r = requests.get(url, headers=headers)
-
-        if r.status_code == 200:
-            #store downloaded swath
-            with open(os.path.join(self.ref.rawout, swath), "wb") as f:
-                f.write(r.content)
+        if SUCCESS:
             #status
             logger.info(f'Retrieval complete!')
             self.ref.error.reset_crit_counter()
@@ -1375,20 +2663,50 @@ class SlstrRetrievalHandler(RetrievalHandler):
         return super().check_for_existing_swaths(df)
     
     def get_swath_file(self) -> bool:
+        #retrieve only the necessary members of remote zip files if specified
+        URL = self.ref.swath.get_swath_id(swath_only=False)
+        if self.check_for_remote_zip(URL):
+            self.ref.zip.set_zip_path(URL.split('/')[-1])
+            return self.get_remote_zip_file(URL)
+        #keep small swath files in memory if specified
+        CONTENT = self.fetch_swath_file(URL)
+        if CONTENT is not None:
+            self.ref.zip.set_zip_path(URL.split('/')[-1])
+            return self.ref.zip.load_zip_content(CONTENT)
         #get swath file
         STATUS =  super().get_swath_file()
+        if not STATUS:
+            return STATUS
         #get swath id to initialize zip handler
         SWATH = self.ref.swath.get_swath_id(swath_only=True)
         self.ref.zip.set_zip_path(SWATH)
-        #load zip file
-        #TODO exception handler for BadZipFile exception! return bad STATUS
-        self.ref.zip.load_zip_file()
+        #load zip file, while corrupt ones are removed to be retrieved again
+        if not self.ref.zip.load_zip_file():
+            return False
+        #read zip members in place if specified
+        if self.ref.zip.is_opened():
+            return STATUS
         #extract zip file
         self.ref.zip.extract_zip_file()
         #close zip file connection
         self.ref.zip.close_zip_file()
         return STATUS
     
+    def prefetch_swath_file(self, urls: tuple) -> bool:
+        #retrieve only the necessary members of remote zip files if specified
+        if self.check_for_remote_zip(urls[0]):
+            return self.get_remote_zip_file(urls[0], background=True)
+        #keep small swath files in memory if specified
+        if self.fetch_swath_file(urls[0], background=True) is not None:
+            return True
+        return super().prefetch_swath_file(urls)
+    
+    def prepare_swath_file(self, urls: tuple) -> None:
+        #unpack the prefetched zip file in the background, unless its 
+        #members are read in place
+        if not self.ref.zip.in_place:
+            self.ref.zip.extract_zip(urls[0].split('/')[-1])
+    
     
 class OlciRetrievalHandler(RetrievalHandler): 
     def parse_swath_listing(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -1398,19 +2716,49 @@ class OlciRetrievalHandler(RetrievalHandler):
         return super().check_for_existing_swaths(df)
     
     def get_swath_file(self) -> bool:
+        #retrieve only the necessary members of remote zip files if specified
+        URL = self.ref.swath.get_swath_id(swath_only=False)
+        if self.check_for_remote_zip(URL):
+            self.ref.zip.set_zip_path(URL.split('/')[-1])
+            return self.get_remote_zip_file(URL)
+        #keep small swath files in memory if specified
+        CONTENT = self.fetch_swath_file(URL)
+        if CONTENT is not None:
+            self.ref.zip.set_zip_path(URL.split('/')[-1])
+            return self.ref.zip.load_zip_content(CONTENT)
         #get swath file
         STATUS =  super().get_swath_file()
+        if not STATUS:
+            return STATUS
         #get swath id to initialize zip handler
         SWATH = self.ref.swath.get_swath_id(swath_only=True)
         self.ref.zip.set_zip_path(SWATH)
-        #load zip file
-        #TODO exception handler for BadZipFile exception! return bad STATUS
-        self.ref.zip.load_zip_file()
+        #load zip file, while corrupt ones are removed to be retrieved again
+        if not self.ref.zip.load_zip_file():
+            return False
+        #read zip members in place if specified
+        if self.ref.zip.is_opened():
+            return STATUS
         #extract zip file
         self.ref.zip.extract_zip_file()
         #close zip file connection
         self.ref.zip.close_zip_file()
         return STATUS
+    
+    def prefetch_swath_file(self, urls: tuple) -> bool:
+        #retrieve only the necessary members of remote zip files if specified
+        if self.check_for_remote_zip(urls[0]):
+            return self.get_remote_zip_file(urls[0], background=True)
+        #keep small swath files in memory if specified
+        if self.fetch_swath_file(urls[0], background=True) is not None:
+            return True
+        return super().prefetch_swath_file(urls)
+    
+    def prepare_swath_file(self, urls: tuple) -> None:
+        #unpack the prefetched zip file in the background, unless its 
+        #members are read in place
+        if not self.ref.zip.in_place:
+            self.ref.zip.extract_zip(urls[0].split('/')[-1])
 
 
 class ModisRetrievalHandler(RetrievalHandler):      
@@ -1419,10 +2767,18 @@ class ModisRetrievalHandler(RetrievalHandler):
         MODIS specific function dealing with the file duality of MXD03 and 
         MXD02 necessary to get the full dataset
         """
+        #drop incomplete pairs of listings compiled by earlier versions
+        PAIRED = df['mxd03'].notna() & df['mxd02'].notna()
+        if not PAIRED.all():
+            logger.warning(f'Dropping {(~PAIRED).sum()} incomplete MODIS '+
+                           f'listing entries!')
+        df = df.loc[PAIRED]
         mxd03 = df['url_mxd03'].astype(str) + df['mxd03'].astype(str)
         mxd02 = df['url_mxd02'].astype(str) + df['mxd02'].astype(str)
-        return pd.DataFrame({'mxd03': mxd03.unique(),
-                             'mxd02': mxd02.unique()})
+        #keep unique pairs instead of unique files per column
+        return pd.DataFrame({'mxd03': mxd03.to_numpy(),
+                             'mxd02': mxd02.to_numpy()}
+                            ).drop_duplicates(ignore_index=True)
 
     def check_for_existing_swaths(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -1458,18 +2814,16 @@ class ModisRetrievalHandler(RetrievalHandler):
         SWATHS = self.ref.swath.get_swath_id(swath_only=True)
         URLS = self.ref.swath.get_swath_id(swath_only=False)
 
-        #only download in case do not already exist
-        MXD03_EXISTS = SWATHS['mxd03'] in downloaded_files
-        if not MXD03_EXISTS:
-            MXD03_SUCCESS = self.download_swath(URLS['mxd03'])
-        else:
-            MXD03_SUCCESS = True
-        MXD02_EXISTS = SWATHS['mxd02'] in downloaded_files
-        if not MXD02_EXISTS and MXD03_SUCCESS:
-            MXD02_SUCCESS = self.download_swath(URLS['mxd02'])
-        else:
-            MXD02_SUCCESS = True
+        #only download in case do not already exist, while both files are
+        #retrieved concurrently
+        futures = {}
+        for PRODUCT in ['mxd03', 'mxd02']:
+            if not self.check_swath_file(SWATHS[PRODUCT], URLS[PRODUCT], 
+                                         downloaded_files):
+                futures[PRODUCT] = self.submit_swath(URLS[PRODUCT])
+        STATUS = [self.complete_swath_download(future) 
+                  for future in futures.values()]
             
-        return all((MXD03_SUCCESS, MXD02_SUCCESS))
+        return all(STATUS)
 
 
@@ -51,37 +51,57 @@ class Retrieval(object):
         #file due to several AOIs being specified
         self.proc.parse_swath_listing(self.listing)
 
-        #check for previously or already downloaded and processed files
-        self.proc.check_for_existing_swaths()
+        #check for previously or already downloaded and processed files, 
+        #while replaced granules of the diff mode are always reprocessed
+        if not self.proc.cfg.apply_listing_diff:
+            self.proc.check_for_existing_swaths()
         
         #receive the final, cleared-up swath listing
         LISTING = self.proc.get_listing()
 
-        #loop over all listing entries
-        for _, swath in LISTING.iterrows():          
-            #make processor aware of currently processed swaths
-            self.proc.set_swath_id(swath)
-
-            #download the swath files
-            DOWNLOAD_COMPLETED = self.proc.get_swath_file()
-            #continue with next entry in case something went wrong
-            if not DOWNLOAD_COMPLETED:
-                continue
-
-            #load swath data
-            self.proc.load_swath()            
-
-            #resample swath data if specified
-            APPLY_RESAMPLING = self.proc.cfg.apply_resampling
-            if APPLY_RESAMPLING:
-                #id aoi's for current swath
-                self.proc.identify_resample_aois()
-                #resample
-                self.proc.resample_swath()
-
-            #save swath data to h5 format
-            self.proc.save_swath()
-
-            #clean-up afterwards
-            self.proc.cleanup()  
+        #loop over all listing entries, while the pool of concurrent 
+        #downloads is always released
+        PREFETCH = self.proc.get_prefetch_count()
+        try:
+            for i, (_, swath) in enumerate(LISTING.iterrows()):
+                #make processor aware of currently processed swaths
+                self.proc.set_swath_id(swath)
+
+                #download the swath files
+                DOWNLOAD_COMPLETED = self.proc.get_swath_file()
+
+                #keep the next swaths retrieving in the background, only 
+                #after the current one to not queue it behind them
+                for _, upcoming in LISTING.iloc[i+1:i+1+PREFETCH].iterrows():
+                    self.proc.prefetch_swath(upcoming)
+
+                #continue with next entry in case something went wrong
+                if not DOWNLOAD_COMPLETED:
+                    continue
+
+                #load swath data
+                self.proc.load_swath()            
+
+                #resample swath data if specified
+                APPLY_RESAMPLING = self.proc.cfg.apply_resampling
+                if APPLY_RESAMPLING:
+                    #id aoi's for current swath
+                    self.proc.identify_resample_aois()
+                    #resample
+                    self.proc.resample_swath()
+
+                #write the outputs of changed granules of the diff mode anew
+                self.proc.remove_outdated_output()
+
+                #save swath data to h5 format
+                self.proc.save_swath()
+
+                #clean-up afterwards
+                self.proc.cleanup()  
+
+                #the swath is no longer pending in the diff mode
+                self.proc.complete_swath()
+        finally:
+            #release the pool of concurrent downloads
+            self.proc.close_downloads()
 
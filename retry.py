@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from loguru import logger
+from urllib.parse import urlparse
+
+import random
+import threading
+import time
+
+import requests
+
+
+# In[]
+
+class RetryPolicy(object):
+    """
+    Per-request retry policy with exponential backoff and full jitter,
+    honoring the Retry-After header of rate-limited (429) or unavailable
+    (503) responses
+    """
+    STATUS = (408, 429, 500, 502, 503, 504)
+
+    def __init__(self, retries: int = 5, backoff: float = 1.0,
+                 max_backoff: float = 120.0, jitter: bool = True):
+        """
+        Parameters
+        ----------
+        retries : int, optional
+            Maximum number of retries per request
+        backoff : float, optional
+            Base delay [s] doubled with every retry
+        max_backoff : float, optional
+            Upper bound [s] of the delay between two attempts, which also
+            caps the delay requested by the server
+        jitter : bool, optional
+            Whether to draw the delay uniformly from [0, backoff] to spread
+            the retries of concurrent requests
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def is_retryable(self, status_code: int) -> bool:
+        return status_code in self.STATUS
+
+    def get_delay(self, attempt: int, retry_after: float = None) -> float:
+        """
+        Parameters
+        ----------
+        attempt : int
+            Number of the failed attempt, starting at 0
+        retry_after : float, optional
+            Delay [s] requested by the server
+
+        Returns
+        -------
+        float
+            Delay [s] before the next attempt
+        """
+        DELAY = min(self.max_backoff, self.backoff * 2**attempt)
+        if self.jitter:
+            DELAY = random.uniform(0, DELAY)
+        if retry_after is not None:
+            DELAY = max(DELAY, min(retry_after, self.max_backoff))
+        return DELAY
+
+    @staticmethod
+    def get_retry_after(r: object) -> float:
+        #delay [s] given either in seconds or as http date
+        RETRY_AFTER = r.headers.get('Retry-After', None)
+        if RETRY_AFTER is None:
+            return None
+        if RETRY_AFTER.strip().isdigit():
+            return float(RETRY_AFTER)
+        try:
+            DATE = parsedate_to_datetime(RETRY_AFTER)
+        except (TypeError, ValueError):
+            return None
+        return max((DATE - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class CircuitBreaker(object):
+    """
+    Host-level circuit breaker pausing all requests to a host after several
+    consecutive failures; once the cool-down has passed, a single probe
+    request is let through, closing the circuit on success or reopening it
+    with a doubled cool-down on failure
+    """
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0,
+                 max_cooldown: float = 900.0):
+        """
+        Parameters
+        ----------
+        threshold : int, optional
+            Number of consecutive failures opening the circuit of a host
+        cooldown : float, optional
+            Initial pause [s] before probing the host again
+        max_cooldown : float, optional
+            Upper bound [s] of the pause between two probes
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.hosts = {}
+        self.condition = threading.Condition()
+
+    def _get_state(self, host: str) -> dict:
+        return self.hosts.setdefault(host, {'failures': 0,
+                                            'open_until': 0.0,
+                                            'cooldown': self.cooldown,
+                                            'probing': False})
+
+    def is_open(self, host: str) -> bool:
+        with self.condition:
+            return self._get_state(host)['failures'] >= self.threshold
+
+    def acquire(self, host: str) -> None:
+        """
+        Parameters
+        ----------
+        host : str
+            Host of the upcoming request
+
+        Returns
+        -------
+        None
+            Blocks while the circuit of the host is open and, once the
+            cool-down has passed, while another request is probing it
+        """
+        with self.condition:
+            while True:
+                state = self._get_state(host)
+                if state['failures'] < self.threshold:
+                    return
+                WAIT = state['open_until'] - time.monotonic()
+                if WAIT > 0:
+                    self.condition.wait(WAIT)
+                elif not state['probing']:
+                    state['probing'] = True
+                    #status
+                    logger.info(f'Probing {host}...')
+                    return
+                else:
+                    self.condition.wait()
+
+    def record_success(self, host: str) -> None:
+        with self.condition:
+            state = self._get_state(host)
+            if state['failures'] >= self.threshold:
+                #status
+                logger.info(f'{host} is reachable again!')
+            state.update({'failures': 0,
+                          'cooldown': self.cooldown,
+                          'probing': False})
+            self.condition.notify_all()
+
+    def record_failure(self, host: str) -> None:
+        with self.condition:
+            state = self._get_state(host)
+            state['failures'] += 1
+            #failed probe, pause for longer
+            if state['probing']:
+                state['probing'] = False
+                state['cooldown'] = min(2 * state['cooldown'],
+                                        self.max_cooldown)
+            elif state['failures'] != self.threshold:
+                return
+            state['open_until'] = time.monotonic() + state['cooldown']
+            #status
+            logger.warning(f'{state["failures"]} consecutive failures, '+
+                           f'pausing requests to {host} for '+
+                           f'{state["cooldown"]:.0f} s!')
+            self.condition.notify_all()
+
+
+class RetrySession(object):
+    """
+    Wrapper of a requests.Session retrying failed requests according to the
+    RetryPolicy and guarding all hosts with a CircuitBreaker
+    """
+    def __init__(self, session: object, policy: RetryPolicy = None,
+                 breaker: CircuitBreaker = None):
+        """
+        Parameters
+        ----------
+        session : object
+            requests.Session to perform the actual requests
+        policy : RetryPolicy, optional
+            Per-request retry policy
+        breaker : CircuitBreaker, optional
+            Host-level circuit breaker
+        """
+        self.session = session
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+    @property
+    def headers(self) -> dict:
+        return self.session.headers
+
+    def request(self, method: str, url: str, **kwargs) -> object:
+        """
+        Parameters
+        ----------
+        method : str
+            Http method
+        url : str
+            Url to request
+        **kwargs
+            Further arguments of requests.Session.request()
+
+        Returns
+        -------
+        object
+            requests.Response of the first successful or non-retryable
+            attempt or of the last attempt; connection errors of the last
+            attempt are raised
+        """
+        HOST = urlparse(url).netloc
+        for attempt in range(self.policy.retries + 1):
+            LAST_ATTEMPT = attempt == self.policy.retries
+            self.breaker.acquire(HOST)
+            try:
+                r = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.breaker.record_failure(HOST)
+                if LAST_ATTEMPT:
+                    raise
+                REASON, RETRY_AFTER = str(e), None
+            else:
+                if not self.policy.is_retryable(r.status_code):
+                    self.breaker.record_success(HOST)
+                    return r
+                self.breaker.record_failure(HOST)
+                if LAST_ATTEMPT:
+                    return r
+                REASON = f'status {r.status_code}'
+                RETRY_AFTER = self.policy.get_retry_after(r)
+                r.close()
+            DELAY = self.policy.get_delay(attempt, RETRY_AFTER)
+            #status
+            logger.warning(f'Request failed ({REASON}), retry '+
+                           f'{attempt + 1}/{self.policy.retries} in '+
+                           f'{DELAY:.1f} s...')
+            time.sleep(DELAY)
+
+    def get(self, url: str, **kwargs) -> object:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> object:
+        return self.request('HEAD', url, **kwargs)
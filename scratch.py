@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from loguru import logger
+from typing import Callable
+
+import os
+import threading
+
+
+# In[]
+
+class ScratchManager(object):
+    """
+    Bookkeeping of the scratch space taken by in-flight and retrieved swath
+    files, extracted content, and cached granules against a disk quota;
+    blocking reservations wait until enough space is released
+    (backpressure), while evictable data is removed first in the order of
+    increasing value
+    """
+    def __init__(self, quota: int = 0):
+        """
+        Parameters
+        ----------
+        quota : int, optional
+            Maximum scratch usage [bytes] or 0 for unlimited scratch space
+        """
+        self.quota = quota
+        #reserved bytes by file/folder path
+        self.reserved = {}
+        #reservations needed for the current swath, which never wait
+        self.urgent = set()
+        self.evictables = []
+        #sizes of the evictable data, which are only queried again once
+        #space is released and not on every wake-up of a waiting reservation
+        self.evictable_sizes = None
+        self.condition = threading.Condition()
+
+    def is_limited(self) -> bool:
+        return self.quota > 0
+
+    def add_evictable(self, get_size: Callable[[], int],
+                      evict: Callable[[int], None]) -> None:
+        """
+        Parameters
+        ----------
+        get_size : Callable[[], int]
+            Returns the current size [bytes] of the evictable data
+        evict : Callable[[int], None]
+            Reduces the evictable data to the given size [bytes]
+
+        Returns
+        -------
+        None
+            Evictable data, e.g., cached granules, counting towards the quota
+            and evicted in the order of registration, i.e., the least
+            valuable data is to be registered first
+        """
+        self.evictables.append((get_size, evict))
+
+    def get_usage(self) -> int:
+        with self.condition:
+            self.evictable_sizes = None
+            return sum(self.reserved.values()) + \
+                sum(self._get_evictable_sizes())
+
+    def _get_evictable_sizes(self) -> list:
+        if self.evictable_sizes is None:
+            self.evictable_sizes = [get_size() for get_size, _ in 
+                                    self.evictables]
+        return self.evictable_sizes
+
+    def _fits(self, key: str, size: int) -> bool:
+        #usage by all other reservations and the evictable data
+        USED = sum([SIZE for KEY, SIZE in self.reserved.items()
+                    if KEY != key])
+        SIZES = self._get_evictable_sizes()
+        EVICTABLE = sum(SIZES)
+        USED += EVICTABLE
+        if USED + size <= self.quota:
+            return True
+        #evict the least valuable data first, but only if this suffices
+        if USED - EVICTABLE + size > self.quota:
+            return False
+        for i, (get_size, evict) in enumerate(self.evictables):
+            SIZE = SIZES[i]
+            if SIZE == 0:
+                continue
+            evict(max(SIZE - (USED + size - self.quota), 0))
+            SIZES[i] = get_size()
+            USED -= SIZE - SIZES[i]
+            if USED + size <= self.quota:
+                return True
+        return False
+
+    def reserve(self, key: str, size: int, block: bool = True) -> None:
+        """
+        Parameters
+        ----------
+        key : str
+            Path of the file/folder to reserve scratch space for
+        size : int
+            Number of bytes to reserve
+        block : bool, optional
+            Whether to wait until the reservation fits into the quota,
+            unless no other reservation can release space or the
+            reservation is needed for the current swath, or to exceed the
+            quota immediately, e.g., for the current swath itself
+
+        Returns
+        -------
+        None
+        """
+        if not self.is_limited():
+            return
+        NAME = os.path.basename(os.path.normpath(key))
+        with self.condition:
+            self.evictable_sizes = None
+            WAITING = False
+            while not self._fits(key, size):
+                OTHERS = any([KEY != key for KEY in self.reserved])
+                if not block or not OTHERS or key in self.urgent:
+                    logger.warning(f'Scratch quota exceeded by {NAME}!')
+                    break
+                if not WAITING:
+                    #status
+                    logger.info(f'Waiting for scratch space: {NAME} '+
+                                f'({size / 1e6:.1f} MB)...')
+                    WAITING = True
+                self.condition.wait()
+            self.reserved[key] = size
+
+    def try_reserve(self, key: str, size: int) -> bool:
+        """
+        Parameters
+        ----------
+        key : str
+            Path of the file/folder to reserve scratch space for
+        size : int
+            Number of bytes to reserve
+
+        Returns
+        -------
+        bool
+            Whether the reservation fits into the quota; otherwise, nothing
+            is reserved, e.g., to skip optional extractions
+        """
+        if not self.is_limited():
+            return True
+        with self.condition:
+            self.evictable_sizes = None
+            if not self._fits(key, size):
+                return False
+            self.reserved[key] = size
+            return True
+
+    def prioritize(self, key: str) -> None:
+        #let the (pending) reservation of the current swath pass
+        if not self.is_limited():
+            return
+        with self.condition:
+            self.urgent.add(key)
+            self.condition.notify_all()
+
+    def release(self, key: str) -> None:
+        if not self.is_limited():
+            return
+        with self.condition:
+            self.urgent.discard(key)
+            if self.reserved.pop(key, None) is not None:
+                #released data may have been added to the evictable data
+                self.evictable_sizes = None
+                self.condition.notify_all()
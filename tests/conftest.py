@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import hashlib
+import os
+import sys
+import threading
+
+import pytest
+
+#modules live in the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# In[]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the local stand-in server serving in-memory files
+    with Range/If-Range and ETag/If-None-Match support, while scripted
+    actions per path, e.g., 429/503 responses or dropped connections, take
+    precedence
+    """
+    protocol_version = 'HTTP/1.1'
+    #answer the many small range requests without delayed segments
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self._respond(body=False)
+
+    def do_GET(self) -> None:
+        self._respond(body=True)
+
+    def _send(self, status: int, headers: dict, content: bytes,
+              body: bool) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+    def _respond(self, body: bool) -> None:
+        server = self.server.stand_in
+        server.log.append((self.command, self.path, dict(self.headers)))
+        #scripted actions
+        ACTION = server.next_action(self.path)
+        if ACTION is not None:
+            if ACTION.get('drop', False):
+                #announce the full body, but close the connection early
+                CONTENT = server.files.get(self.path, b'')
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(CONTENT)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(CONTENT[:ACTION.get('after', 0)])
+                    self.wfile.flush()
+                self.close_connection = True
+                return
+            self._send(ACTION['status'], ACTION.get('headers', {}),
+                       ACTION.get('content', b''), body)
+            return
+        if self.path not in server.files:
+            self._send(404, {}, b'', body)
+            return
+        CONTENT = server.files[self.path]
+        ETAG = f'"{hashlib.sha1(CONTENT).hexdigest()}"'
+        HEADERS = {'ETag': ETAG, 'Accept-Ranges': 'bytes'}
+        if self.headers.get('If-None-Match') == ETAG:
+            self._send(304, HEADERS, b'', False)
+            return
+        RANGE = self.headers.get('Range')
+        IF_RANGE = self.headers.get('If-Range')
+        if RANGE is not None and IF_RANGE in (None, ETAG):
+            START, END = RANGE.split('=')[1].split('-')
+            START = int(START)
+            END = min(int(END), len(CONTENT) - 1) if END else \
+                len(CONTENT) - 1
+            if START >= len(CONTENT):
+                HEADERS['Content-Range'] = f'bytes */{len(CONTENT)}'
+                self._send(416, HEADERS, b'', body)
+                return
+            HEADERS['Content-Range'] = \
+                f'bytes {START}-{END}/{len(CONTENT)}'
+            self._send(206, HEADERS, CONTENT[START:END + 1], body)
+            return
+        self._send(200, HEADERS, CONTENT, body)
+
+
+class StandInServer(object):
+    """ Local HTTP stand-in for the remote data/listing servers """
+    def __init__(self):
+        self.files = {}
+        self.actions = {}
+        self.log = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stand_in = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        return f'http://127.0.0.1:{self.httpd.server_port}{path}'
+
+    def script(self, path: str, *actions: dict) -> None:
+        #actions answering the next requests to the path in the given order
+        with self.lock:
+            self.actions.setdefault(path, []).extend(actions)
+
+    def next_action(self, path: str) -> dict:
+        with self.lock:
+            ACTIONS = self.actions.get(path, [])
+            return ACTIONS.pop(0) if ACTIONS else None
+
+    def requests(self, path: str, method: str = None) -> list:
+        return [entry for entry in self.log if entry[1] == path and
+                (method is None or entry[0] == method)]
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server() -> StandInServer:
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.close()
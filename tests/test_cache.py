@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from cache import GranuleCache, HttpCache
+
+import os
+import time
+
+import pytest
+import requests
+
+
+# In[]
+
+def test_fresh_entries_are_served_without_requests(server, tmp_path):
+    server.files['/listing'] = b'listing'
+    cache = HttpCache(str(tmp_path), max_age=3600)
+    r = cache.get(server.url('/listing'))
+    assert r.content == b'listing' and not getattr(r, 'from_cache', False)
+    r = cache.get(server.url('/listing'))
+    assert r.content == b'listing' and r.from_cache
+    assert len(server.requests('/listing')) == 1
+    #overriding the default maximum age
+    cache.get(server.url('/listing'), max_age=0)
+    assert len(server.requests('/listing')) == 2
+
+
+def test_stale_entries_are_revalidated_with_their_etag(server, tmp_path):
+    server.files['/listing'] = b'listing'
+    cache = HttpCache(str(tmp_path), max_age=0)
+    ETAG = cache.get(server.url('/listing')).headers['ETag']
+    #unchanged upstream
+    r = cache.get(server.url('/listing'))
+    assert r.status_code == 200 and r.content == b'listing' and r.from_cache
+    _, _, HEADERS = server.requests('/listing')[-1]
+    assert HEADERS['If-None-Match'] == ETAG
+    #changed upstream
+    server.files['/listing'] = b'changed listing'
+    r = cache.get(server.url('/listing'))
+    assert r.content == b'changed listing'
+    assert cache.get(server.url('/listing')).content == b'changed listing'
+    assert len(server.requests('/listing')) == 4
+
+
+def test_failed_revalidations_serve_the_stale_entry(server, tmp_path):
+    server.files['/listing'] = b'listing' * 100
+    cache = HttpCache(str(tmp_path), max_age=0)
+    cache.get(server.url('/listing'))
+    server.script('/listing', {'status': 503}, {'drop': True, 'after': 10})
+    for _ in range(2):
+        r = cache.get(server.url('/listing'))
+        assert r.content == b'listing' * 100 and r.from_cache
+    #unreachable server
+    URL = server.url('/listing')
+    server.close()
+    r = cache.get(URL)
+    assert r.content == b'listing' * 100 and r.from_cache
+
+
+def test_failed_retrievals_without_entry_are_raised(server, tmp_path):
+    server.files['/listing'] = b'listing' * 100
+    server.script('/listing', {'drop': True, 'after': 10})
+    cache = HttpCache(str(tmp_path))
+    with pytest.raises(requests.exceptions.RequestException):
+        cache.get(server.url('/listing'))
+
+
+def create_granule(path: str, size: int) -> str:
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_granules_are_restored_from_the_cache(tmp_path):
+    cache = GranuleCache(str(tmp_path / 'cache'), 10000)
+    SOURCE = create_granule(str(tmp_path / 'a.zip'), 1000)
+    assert not cache.get('a.zip', str(tmp_path / 'restored.zip'))
+    cache.add('a.zip', SOURCE)
+    assert cache.get('a.zip', str(tmp_path / 'restored.zip'))
+    assert read(str(tmp_path / 'restored.zip')) == read(SOURCE)
+    #identical content of different granules is stored once
+    os.link(SOURCE, str(tmp_path / 'b.zip'))
+    cache.add('b.zip', str(tmp_path / 'b.zip'))
+    assert cache.get_size() == 1000
+    #granules exceeding the budget are not cached at all
+    cache.add('c.zip', create_granule(str(tmp_path / 'c.zip'), 20000))
+    assert not cache.get('c.zip', str(tmp_path / 'restored.zip'))
+
+
+def test_cached_granules_are_not_hashed_again(tmp_path, monkeypatch):
+    cache = GranuleCache(str(tmp_path / 'cache'), 10000)
+    HASHED = []
+    get_checksum = GranuleCache.get_checksum
+    monkeypatch.setattr(GranuleCache, 'get_checksum', staticmethod(
+        lambda path: HASHED.append(path) or get_checksum(path)))
+    SOURCE = create_granule(str(tmp_path / 'a.zip'), 1000)
+    cache.add('a.zip', SOURCE)
+    #restored granules share the inode of their object
+    os.remove(SOURCE)
+    assert cache.get('a.zip', SOURCE)
+    cache.add('a.zip', SOURCE)
+    assert HASHED == [SOURCE]
+    #changed granules of the same name are
+    os.remove(SOURCE)
+    create_granule(SOURCE, 2000)
+    cache.add('a.zip', SOURCE)
+    assert HASHED == [SOURCE, SOURCE]
+    assert cache.get('a.zip', str(tmp_path / 'restored.zip'))
+    assert read(str(tmp_path / 'restored.zip')) == read(SOURCE)
+
+
+def test_least_recently_used_granules_are_evicted(tmp_path):
+    cache = GranuleCache(str(tmp_path / 'cache'), 2500)
+    for name in ['a.zip', 'b.zip']:
+        cache.add(name, create_granule(str(tmp_path / name), 1000))
+        time.sleep(0.01)
+    #recently restored granules are kept
+    assert cache.get('a.zip', str(tmp_path / 'restored.zip'))
+    time.sleep(0.01)
+    cache.add('c.zip', create_granule(str(tmp_path / 'c.zip'), 1000))
+    assert cache.get_size() == 2000
+    assert not cache.get('b.zip', str(tmp_path / 'restored.zip'))
+    assert cache.get('a.zip', str(tmp_path / 'restored.zip'))
+    time.sleep(0.01)
+    assert cache.get('c.zip', str(tmp_path / 'restored.zip'))
+    #a smaller budget, e.g., to free scratch space
+    cache.evict(1000)
+    assert cache.get_size() == 1000
+    assert not cache.get('a.zip', str(tmp_path / 'restored.zip'))
+    assert cache.get('c.zip', str(tmp_path / 'restored.zip'))
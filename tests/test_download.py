@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from download import FileDownloader, HttpRangeReader
+from proc import SlstrRetrievalHandler, ZipFileHandler
+from types import SimpleNamespace
+
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+import pytest
+import requests
+
+
+# In[]
+
+def create_zip() -> tuple:
+    #small zip file of stored and compressed members of various sizes
+    MEMBERS = {'SWATH.SEN3/': b'',
+               'SWATH.SEN3/xfdumanifest.xml': b'<xml/>' * 7,
+               'SWATH.SEN3/S7_BT_in.nc': os.urandom(601),
+               'SWATH.SEN3/flags_in.nc': b'flags' * 97,
+               'SWATH.SEN3/geodetic_in.nc': os.urandom(1033),
+               'SWATH.SEN3/empty.nc': b'',
+               }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as f:
+        for i, (name, content) in enumerate(MEMBERS.items()):
+            COMPRESSION = zipfile.ZIP_DEFLATED if i % 2 else zipfile.ZIP_STORED
+            f.writestr(name, content, compress_type=COMPRESSION)
+    return buffer.getvalue(), MEMBERS
+
+
+def get_block_sizes(content: bytes) -> list:
+    #block boundaries at, right before, and right after every local header
+    #and the central directory, as well as plain small block sizes
+    with zipfile.ZipFile(io.BytesIO(content)) as f:
+        OFFSETS = [info.header_offset for info in f.infolist()]
+        OFFSETS.append(f.start_dir)
+    SIZES = set(range(1, 48))
+    for OFFSET in OFFSETS:
+        SIZES.update([OFFSET - 1, OFFSET, OFFSET + 1, OFFSET + 30])
+    return sorted([SIZE for SIZE in SIZES if SIZE > 0])
+
+
+def test_range_reader_reads_members_across_block_boundaries(server):
+    CONTENT, MEMBERS = create_zip()
+    server.files['/swath.zip'] = CONTENT
+    session = requests.Session()
+    for BLOCK_SIZE in get_block_sizes(CONTENT):
+        reader = HttpRangeReader(session, server.url('/swath.zip'),
+                                 BLOCK_SIZE)
+        with zipfile.ZipFile(reader) as f:
+            for name, content in MEMBERS.items():
+                assert f.read(name) == content, BLOCK_SIZE
+        assert reader.size == len(CONTENT)
+
+
+def test_range_reader_fills_reads_up_to_the_end_of_file(server):
+    CONTENT = os.urandom(1000)
+    server.files['/file.bin'] = CONTENT
+    reader = HttpRangeReader(requests, server.url('/file.bin'), 64)
+    reader.seek(60)
+    #read crossing the end of the cached block
+    assert reader.read(10) == CONTENT[60:70]
+    assert reader.read(100) == CONTENT[70:170]
+    reader.seek(-5, io.SEEK_END)
+    assert reader.read(10) == CONTENT[-5:]
+    assert reader.read(10) == b''
+
+
+def test_range_reader_rejects_misplaced_ranges(server):
+    server.files['/file.bin'] = os.urandom(1000)
+    reader = HttpRangeReader(requests, server.url('/file.bin'), 64)
+    server.script('/file.bin', {'status': 206, 'content': b'x' * 64,
+                                'headers': {'Content-Range':
+                                            'bytes 0-63/1000'}})
+    reader.seek(100)
+    with pytest.raises(OSError):
+        reader.read(10)
+
+
+def test_range_reader_requires_range_support(server):
+    server.files['/file.bin'] = os.urandom(1000)
+    reader = HttpRangeReader(requests, server.url('/file.bin'), 64)
+    server.script('/file.bin', {'status': 200, 'content': b'x' * 1000})
+    with pytest.raises(OSError):
+        reader.read(10)
+
+
+def test_remote_zip_extracts_only_selected_members(server, tmp_path):
+    CONTENT, MEMBERS = create_zip()
+    server.files['/swath.zip'] = CONTENT
+    handler = ZipFileHandler(str(tmp_path))
+    handler.set_zip_path('swath.zip')
+    assert handler.load_remote_zip_file(requests.Session(), 
+                                        server.url('/swath.zip'),
+                                        ['S7_BT_in.nc', 'flags_in.nc'], 16)
+    EXTRACTED = sorted(os.listdir(handler.get_unzip_path()))
+    assert EXTRACTED == ['S7_BT_in.nc', 'flags_in.nc']
+    for name in EXTRACTED:
+        with open(os.path.join(handler.get_unzip_path(), name), 'rb') as f:
+            assert f.read() == MEMBERS[f'SWATH.SEN3/{name}']
+    handler.remove_extracted_content()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_fetch_decides_on_memory_or_disk_before_the_transfer(server):
+    server.files['/small.zip'] = os.urandom(1000)
+    server.files['/large.zip'] = os.urandom(5000)
+    downloader = FileDownloader(session=requests.Session(), progress_step=0)
+    assert downloader.fetch(server.url('/small.zip'), 2000) == \
+        server.files['/small.zip']
+    assert downloader.fetch(server.url('/large.zip'), 2000) is None
+    #a single HEAD request, but no transfer of swath files for the disk
+    assert [entry[0] for entry in server.requests('/large.zip')] == ['HEAD']
+    #known sizes require no HEAD request at all
+    assert downloader.fetch(server.url('/large.zip'), 2000, 5000) is None
+    assert downloader.fetch(server.url('/small.zip'), 2000, 1000) == \
+        server.files['/small.zip']
+    assert len(server.requests('/large.zip')) == 1
+    assert len(server.requests('/small.zip', 'HEAD')) == 1
+
+
+def leave_part(downloader: FileDownloader, url: str, path: str, 
+               content: bytes, total: int, validator: str) -> None:
+    #partial file and state of an interrupted retrieval
+    with open(downloader.get_part_path(path), 'wb') as f:
+        f.write(content)
+    with open(downloader.get_state_path(path), 'w') as f:
+        json.dump({'url': url, 'total': total, 'validator': validator}, f)
+
+
+def get_etag(content: bytes) -> str:
+    return f'"{hashlib.sha1(content).hexdigest()}"'
+
+
+def test_download_resumes_partial_files(server, tmp_path):
+    CONTENT = os.urandom(5000)
+    server.files['/swath.zip'] = CONTENT
+    URL, PATH = server.url('/swath.zip'), str(tmp_path / 'swath.zip')
+    downloader = FileDownloader(session=requests.Session(), progress_step=0)
+    leave_part(downloader, URL, PATH, CONTENT[:2000], 5000, get_etag(CONTENT))
+    assert downloader.download(URL, PATH)
+    #only the remainder of the same upstream file is retrieved
+    _, _, HEADERS = server.requests('/swath.zip', 'GET')[0]
+    assert HEADERS['Range'] == 'bytes=2000-'
+    assert HEADERS['If-Range'] == get_etag(CONTENT)
+    with open(PATH, 'rb') as f:
+        assert f.read() == CONTENT
+    assert os.listdir(str(tmp_path)) == ['swath.zip']
+
+
+def test_download_restarts_on_a_changed_upstream_file(server, tmp_path):
+    CONTENT = os.urandom(5000)
+    server.files['/swath.zip'] = CONTENT
+    URL, PATH = server.url('/swath.zip'), str(tmp_path / 'swath.zip')
+    downloader = FileDownloader(session=requests.Session(), progress_step=0)
+    leave_part(downloader, URL, PATH, os.urandom(2000), 5000, '"outdated"')
+    assert downloader.download(URL, PATH)
+    with open(PATH, 'rb') as f:
+        assert f.read() == CONTENT
+    assert os.listdir(str(tmp_path)) == ['swath.zip']
+
+
+def test_download_completes_fully_retrieved_partial_files(server, tmp_path):
+    CONTENT = os.urandom(5000)
+    server.files['/swath.zip'] = CONTENT
+    URL, PATH = server.url('/swath.zip'), str(tmp_path / 'swath.zip')
+    downloader = FileDownloader(session=requests.Session(), progress_step=0)
+    leave_part(downloader, URL, PATH, CONTENT, 5000, get_etag(CONTENT))
+    assert downloader.download(URL, PATH)
+    #the range beyond the end of the file is not satisfiable
+    _, _, HEADERS = server.requests('/swath.zip', 'GET')[0]
+    assert HEADERS['Range'] == 'bytes=5000-'
+    with open(PATH, 'rb') as f:
+        assert f.read() == CONTENT
+    assert os.listdir(str(tmp_path)) == ['swath.zip']
+
+
+def test_download_rejects_files_of_unexpected_size(server, tmp_path):
+    server.files['/swath.zip'] = os.urandom(5000)
+    URL, PATH = server.url('/swath.zip'), str(tmp_path / 'swath.zip')
+    downloader = FileDownloader(session=requests.Session(), progress_step=0)
+    #too small files are kept to be resumed
+    assert not downloader.download(URL, PATH, size=6000)
+    assert not os.path.isfile(PATH)
+    assert os.path.getsize(downloader.get_part_path(PATH)) == 5000
+    #too large ones cannot be resumed at all
+    assert not downloader.download(URL, PATH, size=4000)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_check_swath_file_removes_incomplete_leftovers(server, tmp_path):
+    server.files['/complete.zip'] = os.urandom(5000)
+    server.files['/incomplete.zip'] = os.urandom(5000)
+    downloader = FileDownloader(session=requests.Session(), progress_step=0)
+    ref = SimpleNamespace(rawout=str(tmp_path), downloader=downloader,
+                          granules=None)
+    handler = SlstrRetrievalHandler(ref)
+    for name, size in [('complete.zip', 5000), ('incomplete.zip', 2000),
+                       ('unknown.zip', 5000), ('retrieved.zip', 5000)]:
+        with open(tmp_path / name, 'wb') as f:
+            f.write(os.urandom(size))
+    downloader.set_verified(str(tmp_path / 'retrieved.zip'))
+    FILES = os.listdir(str(tmp_path))
+    for name, complete in [('complete.zip', True), 
+                           ('incomplete.zip', False),
+                           ('unknown.zip', False), 
+                           ('retrieved.zip', True)]:
+        assert handler.check_swath_file(name, server.url(f'/{name}'), 
+                                        FILES) == complete
+    #files of unknown size are retrieved again
+    assert sorted(os.listdir(str(tmp_path))) == ['complete.zip', 
+                                                 'retrieved.zip']
+    assert len(server.requests('/retrieved.zip')) == 0
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from data import ListingData
+from iotools import HDF4SwathInput, HDF5SwathOutput, NetCDFSwathInput
+from iotools import ParquetListingIO, SwathIO
+
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+
+# In[]
+
+def save_day(io: ParquetListingIO, df: pd.DataFrame, jj: str) -> None:
+    io.set_listing_file_name(io.get_listing_file_name('s3a', 'slstr', 
+                                                      '2020', jj))
+    io.save(df, '2020', jj)
+
+
+@pytest.mark.parametrize('columns', [{}, {'file': [], 'aoi': [], 'url': [],
+                                          'frac': []}])
+def test_parquet_bulk_load_skips_empty_days(tmp_path, columns):
+    pytest.importorskip('pyarrow')
+    io = ParquetListingIO(str(tmp_path))
+    #empty day first, as it would otherwise define the dataset schema
+    EMPTY = ListingData()
+    EMPTY.add_to_listing(pd.DataFrame(columns), ('2020', '244'))
+    save_day(io, EMPTY.get_current_listing(), '244')
+    DAY = ListingData()
+    DAY.add_entries(file=['S3A_SL_1_RBT_1.zip', 'S3A_SL_1_RBT_2.zip'],
+                    aoi=['arc', 'ant'], url=['https://host/'] * 2, 
+                    frac=[0.5, 0.01])
+    DAY.commit_entries(('2020', '245'))
+    save_day(io, DAY.get_current_listing(), '245')
+    LISTINGS = io.load_bulk('s3a', 'slstr', [('2020', '244'), 
+                                             ('2020', '245')], 
+                            ['arc', 'ant'], 0.1)
+    assert list(LISTINGS) == [('2020', '245')]
+    assert LISTINGS[('2020', '245')]['file'].tolist() == \
+        ['S3A_SL_1_RBT_1.zip']
+
+
+def test_parquet_bulk_load_of_empty_days_only(tmp_path):
+    pytest.importorskip('pyarrow')
+    io = ParquetListingIO(str(tmp_path))
+    save_day(io, pd.DataFrame(), '244')
+    assert io.load_bulk('s3a', 'slstr', [('2020', '244')], ['arc'], 0.) == {}
+
+
+@pytest.mark.parametrize('compression', [zipfile.ZIP_STORED, 
+                                         zipfile.ZIP_DEFLATED])
+def test_netcdf_members_are_read_in_place(compression):
+    pytest.importorskip('h5netcdf')
+    DATA = np.arange(20, dtype='f4').reshape(4, 5)
+    ds = xr.Dataset({'S7_BT_in': (('rows', 'columns'), DATA)})
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as f:
+        f.writestr('SWATH.SEN3/S7_BT_in.nc', ds.to_netcdf(engine='h5netcdf'),
+                   compress_type=compression)
+    swath_in = NetCDFSwathInput()
+    assert SwathIO(swath_in, HDF5SwathOutput()).supports_zip_members()
+    with zipfile.ZipFile(buffer) as f:
+        swath_in.load_member(f, 'SWATH.SEN3/S7_BT_in.nc')
+        assert np.array_equal(swath_in.fh['S7_BT_in'].values, DATA)
+        swath_in.close()
+
+
+def test_zip_members_require_a_member_input():
+    swath_io = SwathIO(HDF4SwathInput(), HDF5SwathOutput())
+    assert not swath_io.supports_zip_members()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from data import GeoMetaEntries, GeoMetaFilter, GeoMetaParser
+from datetime import time
+from proc import SlstrListingRetrievalHandler
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+
+# In[]
+
+def create_entries() -> GeoMetaEntries:
+    #one granule every two hours of a single day
+    START = np.arange('2020-09-01T00:00', '2020-09-02T00:00', 120,
+                      dtype='datetime64[m]').astype('datetime64[ns]')
+    N = len(START)
+    return GeoMetaEntries(np.array([f'granule_{i}' for i in range(N)]),
+                          START, np.array(['N'] * N), np.zeros((N, 4)),
+                          np.zeros((N, 4)))
+
+
+@pytest.mark.parametrize('window', ["[22:00, 04:00]",
+                                    "['22:00', '04:00']",
+                                    "[1320, 240]"])
+def test_time_of_day_filter_accepts_yaml_windows(window):
+    #unquoted HH:MM values are read as sexagesimal minutes by YAML
+    TIME_OF_DAY = yaml.safe_load(f'time_of_day: {window}')['time_of_day']
+    entries = create_entries()
+    VALID = GeoMetaFilter(time_of_day=TIME_OF_DAY).apply(entries)
+    HOURS = entries.start[VALID].astype('datetime64[h]').astype(int) % 24
+    assert HOURS.tolist() == [0, 2, 4, 22]
+
+
+def test_time_of_day_filter_accepts_times():
+    entries = create_entries()
+    FILTER = GeoMetaFilter(time_of_day=[time(8, 0), time(12, 30)])
+    VALID = FILTER.apply(entries)
+    HOURS = entries.start[VALID].astype('datetime64[h]').astype(int) % 24
+    assert HOURS.tolist() == [8, 10, 12]
+
+
+def test_granule_keys_strip_the_production_time_stamps():
+    FILES = ['VNP03MOD.A2020245.0000.002.2021012345678.nc',
+             'VNP03MOD.A2020245.0000.002.2022098765432.nc',
+             'S3A_SL_1_RBT____20200901T020000_20200901T020300_'+
+             '20200901T235959_0179_062_024______LN2_O_NT_004.SEN3.zip',
+             'unknown.zip']
+    handler = SlstrListingRetrievalHandler(None)
+    KEYS, PRODUCTION = handler.get_granule_keys(pd.DataFrame({'file': FILES}))
+    assert KEYS == ['VNP03MOD.A2020245.0000.002', 
+                    'VNP03MOD.A2020245.0000.002',
+                    'S3A_SL_1_RBT____20200901T020000_20200901T020300',
+                    'unknown.zip']
+    assert PRODUCTION == ['2021012345678', '2022098765432', 
+                          '20200901T235959_004', '']
+
+
+def test_streamed_listings_match_the_parsed_content():
+    HEADER = b'# header\n# header\nGranuleID,StartDateTime,...\n'
+    LINES = [f'S3A_{i}.zip,2020-09-01 {i % 24:02d}:00,x,x,N,x,x,x,x,'
+             f'1,2,3,4,{i},5,6,7,8\n'.encode() for i in range(50)]
+    CONTENT = HEADER + b''.join(LINES) + b'S3A_incomplete.zip,2020'
+    parser = GeoMetaParser(chunk_size=7)
+    EXPECTED = parser.parse(CONTENT)
+    for CHUNK_SIZE in [1, 5, 64, len(CONTENT)]:
+        CHUNKS = [CONTENT[i:i + CHUNK_SIZE] 
+                  for i in range(0, len(CONTENT), CHUNK_SIZE)]
+        LISTING = parser.parse_stream(iter(CHUNKS))
+        assert LISTING.entries.file.tolist() == EXPECTED.file.tolist()
+        assert np.array_equal(LISTING.entries.lat, EXPECTED.lat)
+        #extent of all complete lines
+        assert LISTING.nbytes == CONTENT.rfind(b'\n') + 1
+        assert LISTING.nlines == 53
+    assert len(EXPECTED) == 50
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from aoi import AoiData
+from cfg import Configuration
+from conftest import ROOT
+from planning import CoveragePlanner
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+# In[]
+
+#footprints relative to the weddell AOI (-66/-78.5 to -18/-69)
+WEST = ([-70, -42, -42, -70], [-65, -65, -82, -82])
+EAST = ([-42, -14, -14, -42], [-65, -65, -82, -82])
+FULL = ([-70, -14, -14, -70], [-65, -65, -82, -82])
+#within the west half
+INNER = ([-66, -64, -64, -66], [-69, -69, -78.5, -78.5])
+#covering ~4.6 % of the east half
+SLIVER = ([-20, -18, -18, -20], [-69, -69, -78.5, -78.5])
+
+
+@pytest.fixture(scope='module')
+def aoi_data() -> AoiData:
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(ROOT)
+        return AoiData(['weddell', 'brunt'], 1.0)
+
+
+def create_planner(aoi_data: AoiData, planning: dict) -> CoveragePlanner:
+    #configuration reduced to the planning and listing sections
+    config = Configuration.__new__(Configuration)
+    config.config = {'planning': planning, 'listing': {'min_frac': 1.0}}
+    config.aoidata = aoi_data
+    return CoveragePlanner(config)
+
+
+def create_listing(entries: list) -> pd.DataFrame:
+    #one entry per (granule, aoi, footprint, start hour)
+    rows = []
+    for granule, aoi, footprint, hour in entries:
+        LON, LAT = footprint if footprint is not None else \
+            ([np.nan] * 4, [np.nan] * 4)
+        row = {'file': granule, 'aoi': aoi, 'frac': 10.0,
+               'start': pd.Timestamp(2020, 9, 1, hour, 30)}
+        row.update({f'lon{i + 1}': LON[i] for i in range(4)})
+        row.update({f'lat{i + 1}': LAT[i] for i in range(4)})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def test_planning_stops_once_the_target_is_reached(aoi_data):
+    planner = create_planner(aoi_data, {'target': 95.0})
+    listing = create_listing([('west', 'weddell', WEST, 1),
+                              ('full', 'weddell', FULL, 1),
+                              ('east', 'weddell', EAST, 1),
+                              ('west', 'weddell', WEST, 2),
+                              ('east', 'weddell', EAST, 2)])
+    PLANNED = planner.plan(listing)
+    #the full footprint suffices, while every time bin is planned apart
+    assert PLANNED['file'].tolist() == ['full', 'west', 'east']
+    assert PLANNED['start'].dt.hour.tolist() == [1, 2, 2]
+
+
+def test_granules_below_the_minimum_gain_are_dropped(aoi_data):
+    listing = create_listing([('west', 'weddell', WEST, 1),
+                              ('inner', 'weddell', INNER, 1),
+                              ('sliver', 'weddell', SLIVER, 1)])
+    planner = create_planner(aoi_data, {'target': 99.0, 'min_gain': 5.0})
+    assert planner.plan(listing)['file'].tolist() == ['west']
+    #granules within already covered areas never add any coverage
+    planner = create_planner(aoi_data, {'target': 99.0, 'min_gain': 1.0})
+    assert planner.plan(listing)['file'].tolist() == ['west', 'sliver']
+
+
+def test_entries_without_footprints_are_always_kept(aoi_data):
+    planner = create_planner(aoi_data, {'target': 95.0})
+    listing = create_listing([('full', 'weddell', FULL, 1),
+                              ('unknown', 'weddell', None, 1),
+                              ('east', 'weddell', EAST, 1)])
+    assert planner.plan(listing)['file'].tolist() == ['full', 'unknown']
+    #listings of earlier versions are not planned at all
+    LEGACY = listing[['file', 'aoi', 'frac']]
+    assert planner.plan(LEGACY).equals(LEGACY)
+
+
+def test_planning_thresholds_apply_per_aoi(aoi_data):
+    planner = create_planner(aoi_data, {'target': {'weddell': 40.0,
+                                                   'default': 95.0},
+                                        'min_gain': {'brunt': 50.0}})
+    listing = create_listing([('west', 'weddell', WEST, 1),
+                              ('east', 'weddell', EAST, 1),
+                              ('west', 'brunt', WEST, 1),
+                              ('east', 'brunt', EAST, 1)])
+    PLANNED = planner.plan(listing)
+    #half of the weddell AOI suffices, while the brunt AOI lies entirely
+    #within the east footprint
+    assert PLANNED[['file', 'aoi']].values.tolist() == [['west', 'weddell'],
+                                                        ['east', 'brunt']]
+    #by index of the given group
+    GROUP = listing.loc[listing['aoi'] == 'brunt']
+    assert planner.select_granules('brunt', GROUP).tolist() == [3]
+
+
+def test_swath_polygons_require_a_known_aoi(aoi_data):
+    with pytest.raises(KeyError):
+        aoi_data.create_swath_polys('ross-west', np.zeros((1, 4)),
+                                    np.zeros((1, 4)))
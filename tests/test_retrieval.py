@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from concurrent.futures import ThreadPoolExecutor
+from conftest import ROOT
+from proc import RetrievalProcessor
+from retrieval import Retrieval
+from scratch import ScratchManager
+from types import SimpleNamespace
+
+import io
+import os
+import shutil
+import zipfile
+
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+import yaml
+
+
+# In[]
+
+DATA = '/archive/allData/450/S3A_SL_1_RBT/'
+META = '/archive/geoMetaSentinel3A/450/SLSTR/'
+GEOMETA = f'{META}2020/S3A_SL_1_RBT_2020-09-01.txt'
+
+CONFIG = """meta:
+    sensor: SLSTR
+    carrier: s3a
+    aoi: [weddell]
+    scale: 1.0
+    version: test-v1p0
+io:
+    input: NetCDFSwathInput
+    output: HDF5SwathOutput
+    path: {path}
+authentication:
+    token: abc
+date:
+    start: 2020-09-01
+    stop:  2020-09-01
+listing:
+    override: False
+    modules:
+        process: ListingProcessHandler
+        retrieval: ListingRetrievalHandler
+    filter:
+        daynight: [D, N, B]
+    diff:
+        apply: True
+retrieval:
+    apply: True
+    download:
+        workers: 1
+        progress: 0
+    modules:
+        swath: SwathHandler
+        retrieval: RetrievalHandler
+resampling:
+    apply: False
+    modules:
+        base: Resampling
+"""
+
+VARIABLES = {
+    'lat_nadir': {
+        'datatype': 'geo',
+        'input_parameter': {'file': 'geodetic_in.nc',
+                            'variable': 'latitude_in'},
+        'output_parameter': {'group': 'geo', 'variable': 'lat',
+                             'longname': 'latitude'}},
+    'lon_nadir': {
+        'datatype': 'geo',
+        'input_parameter': {'file': 'geodetic_in.nc',
+                            'variable': 'longitude_in'},
+        'output_parameter': {'group': 'geo', 'variable': 'lon',
+                             'longname': 'longitude'}},
+    's7_nadir': {
+        'datatype': 'radiance',
+        'input_parameter': {'file': 'S7_BT_in.nc', 'variable': 'S7_BT_in'},
+        'grid_parameter': {'longitude': 'lon_nadir',
+                           'latitude': 'lat_nadir'},
+        'process_parameter': {'exclusion_variable': 'S7_exception_in'},
+        'output_parameter': {'group': 'bt', 'variable': 's7_nadir',
+                             'longname': 'slstr_ch7_brightness_temperature'}},
+    }
+
+FILES = {'geodetic_in.nc': ['latitude_in', 'longitude_in'],
+         'S7_BT_in.nc': ['S7_BT_in', 'S7_exception_in']}
+
+
+def granule(start: str, production: str) -> str:
+    return f'S3A_SL_1_RBT____20200901T{start}_20200901T{start[:2]}0300_' + \
+        f'{production}_0179_062_024______LN2_O_NT_004.SEN3.zip'
+
+
+def geometa(granules: list) -> bytes:
+    #granules covering the weddell AOI
+    LINES = ['# fake geoMeta', '# generated',
+             '# GranuleID,StartDateTime,ArchiveSet,OrbitNumber,' + \
+             'DayNightFlag,EastBoundingCoord,NorthBoundingCoord,' + \
+             'SouthBoundingCoord,WestBoundingCoord,GRingLongitude1,' + \
+             'GRingLongitude2,GRingLongitude3,GRingLongitude4,' + \
+             'GRingLatitude1,GRingLatitude2,GRingLatitude3,GRingLatitude4']
+    for name in granules:
+        TIME = name[25:27] + ':' + name[27:29]
+        LINES.append(f'{name},2020-09-01 {TIME},450,1000,N,0,0,0,0,' + \
+                     '-60,-20,-20,-60,-70,-70,-78,-78')
+    return ('\n'.join(LINES) + '\n').encode()
+
+
+def swath(name: str, value: float) -> bytes:
+    #zipped SEN3 folder with constant data of all variables
+    FOLDER = name[:-4]
+    BUFFER = io.BytesIO()
+    with zipfile.ZipFile(BUFFER, 'w') as z:
+        z.writestr(FOLDER + '/', '')
+        for f, variables in FILES.items():
+            ds = xr.Dataset({v: (('rows', 'columns'),
+                                 np.full((4, 5), value, dtype='f4'))
+                             for v in variables})
+            z.writestr(f'{FOLDER}/{f}', ds.to_netcdf(engine='h5netcdf'))
+    return BUFFER.getvalue()
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch, server):
+    #cwd-relative aoi/meta/cfg folders of a retrieval job
+    shutil.copytree(os.path.join(ROOT, 'aoi'), tmp_path / 'aoi')
+    os.makedirs(tmp_path / 'meta')
+    os.makedirs(tmp_path / 'cfg')
+    URLS = {'s3a': {'data': server.url(DATA), 'meta': server.url(META)}}
+    with open(tmp_path / 'meta' / 'slstr_test-v1p0.yaml', 'w') as f:
+        yaml.safe_dump({'urls': URLS, 'filter': {'daynight': ['N', 'B']},
+                        'variables': VARIABLES}, f)
+    with open(tmp_path / 'cfg' / 'config.yaml', 'w') as f:
+        f.write(CONFIG.format(path=tmp_path / 'out'))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run_job() -> None:
+    from job import RetrievalJob
+    job = RetrievalJob({'cfg': 'config.yaml'})
+    job.validate()
+    job.setup()
+    job.run()
+
+
+def test_replaced_granules_are_processed_anew(workspace, server):
+    KEPT = granule('030000', '20200901T235959')
+    OLD = granule('020000', '20200901T235959')
+    NEW = granule('020000', '20200902T120000')
+    server.files[GEOMETA] = geometa([OLD, KEPT])
+    server.files[f'{DATA}2020/245/{OLD}'] = swath(OLD, 1.0)
+    server.files[f'{DATA}2020/245/{KEPT}'] = swath(KEPT, 1.0)
+    run_job()
+    #upstream reprocessing of one granule with a new production time
+    server.files[GEOMETA] = geometa([NEW, KEPT])
+    server.files[f'{DATA}2020/245/{NEW}'] = swath(NEW, 2.0)
+    run_job()
+    OUTPUT = workspace / 'out'
+    with h5py.File(OUTPUT / 's3a_slstr_2020245_020000_test-v1p0_raw.h5',
+                   'r') as f:
+        assert np.all(f['bt/s7_nadir'][()] == 2.0)
+    with h5py.File(OUTPUT / 's3a_slstr_2020245_030000_test-v1p0_raw.h5',
+                   'r') as f:
+        assert np.all(f['bt/s7_nadir'][()] == 1.0)
+    #only the replaced granule was retrieved again
+    assert len(server.requests(f'{DATA}2020/245/{KEPT}', 'GET')) == 1
+    assert len(server.requests(f'{DATA}2020/245/{NEW}', 'GET')) == 1
+
+
+def test_failed_retrievals_remain_pending(workspace, server):
+    FIRST = granule('020000', '20200901T235959')
+    SECOND = granule('030000', '20200901T235959')
+    server.files[GEOMETA] = geometa([FIRST, SECOND])
+    server.files[f'{DATA}2020/245/{FIRST}'] = swath(FIRST, 1.0)
+    run_job()
+    OUTPUT = workspace / 'out'
+    PENDING = OUTPUT / 'listing' / 's3a_slstr_pending.csv'
+    SECOND_OUTPUT = OUTPUT / 's3a_slstr_2020245_030000_test-v1p0_raw.h5'
+    assert not os.path.isfile(SECOND_OUTPUT)
+    with open(PENDING) as f:
+        assert SECOND in f.read()
+    #no upstream changes, but the failed granule is still retrieved
+    server.files[f'{DATA}2020/245/{SECOND}'] = swath(SECOND, 1.0)
+    run_job()
+    assert os.path.isfile(SECOND_OUTPUT)
+    assert not os.path.isfile(PENDING)
+    assert len(server.requests(f'{DATA}2020/245/{FIRST}', 'GET')) == 1
+
+
+class RecordingProcessor(object):
+    #stand-in for the retrieval processor recording the API calls
+    def __init__(self, prefetch: int, fail: bool = False):
+        self.cfg = SimpleNamespace(apply_listing_diff=True, 
+                                   apply_resampling=False)
+        self.prefetch = prefetch
+        self.fail = fail
+        self.calls = []
+
+    def __getattr__(self, name: str) -> object:
+        return lambda *args: self.calls.append(name)
+
+    def parse_swath_listing(self, listing: pd.DataFrame) -> None:
+        self.listing = listing
+
+    def get_listing(self) -> pd.DataFrame:
+        return self.listing
+
+    def get_prefetch_count(self) -> int:
+        return self.prefetch
+
+    def set_swath_id(self, entry: pd.Series) -> None:
+        self.calls.append(('swath', entry['swaths']))
+
+    def prefetch_swath(self, entry: pd.Series) -> None:
+        self.calls.append(('prefetch', entry['swaths']))
+
+    def get_swath_file(self) -> bool:
+        self.calls.append('get_swath_file')
+        return True
+
+    def load_swath(self) -> None:
+        if self.fail:
+            raise OSError('corrupt swath')
+        self.calls.append('load_swath')
+
+
+def test_prefetches_follow_the_current_swath():
+    proc = RecordingProcessor(1)
+    retrieval = Retrieval(proc)
+    retrieval.set_listing(pd.DataFrame({'swaths': ['a', 'b', 'c']}))
+    retrieval.retrieve_and_process()
+    CALLS = [call for call in proc.calls 
+             if isinstance(call, tuple) or call == 'get_swath_file']
+    assert CALLS == [('swath', 'a'), 'get_swath_file', ('prefetch', 'b'),
+                     ('swath', 'b'), 'get_swath_file', ('prefetch', 'c'),
+                     ('swath', 'c'), 'get_swath_file']
+    assert proc.calls[-1] == 'close_downloads'
+
+
+def test_downloads_are_released_on_failures():
+    proc = RecordingProcessor(1, fail=True)
+    retrieval = Retrieval(proc)
+    retrieval.set_listing(pd.DataFrame({'swaths': ['a', 'b']}))
+    with pytest.raises(OSError):
+        retrieval.retrieve_and_process()
+    assert proc.calls[-1] == 'close_downloads'
+
+
+class BackgroundRetrieval(object):
+    #stand-in for the retrieval handler of a processor
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.prefetched = []
+        self.retrieved = 0
+
+    def prefetch_swath_file(self, urls: tuple) -> bool:
+        if self.fail:
+            raise OSError('connection lost')
+        self.prefetched.append(urls)
+        return True
+
+    def get_swath_file(self) -> bool:
+        self.retrieved += 1
+        return True
+
+
+class CurrentSwath(object):
+    #stand-in for the swath handler of a processor
+    def __init__(self, url: str):
+        self.id = url
+
+    def get_swath_urls(self, entry: pd.Series = None) -> list:
+        return [self.id if entry is None else entry.iloc[0]]
+
+
+def create_processor(retrieval: BackgroundRetrieval, 
+                     prefetch: int) -> RetrievalProcessor:
+    #processor reduced to the parts of the background retrievals
+    proc = RetrievalProcessor.__new__(RetrievalProcessor)
+    proc.prefetch_count = prefetch
+    proc.prefetched = {}
+    proc.prefetcher = ThreadPoolExecutor(max_workers=prefetch) \
+        if prefetch > 0 else None
+    proc.swath = CurrentSwath('https://host/b.zip')
+    proc.retrieval = retrieval
+    proc.scratch = ScratchManager(0)
+    proc.rawout = 'tmp'
+    return proc
+
+
+def test_prefetched_swaths_are_retrieved_once_in_the_background():
+    retrieval = BackgroundRetrieval(fail=False)
+    proc = create_processor(retrieval, 2)
+    ENTRY = pd.Series({'swaths': 'https://host/b.zip'})
+    proc.prefetch_swath(ENTRY)
+    proc.prefetch_swath(ENTRY)
+    assert proc.get_swath_file()
+    assert retrieval.prefetched == [('https://host/b.zip',)]
+    assert proc.prefetched == {}
+    proc.prefetcher.shutdown()
+
+
+def test_failed_background_retrievals_fall_back_to_the_foreground():
+    retrieval = BackgroundRetrieval(fail=True)
+    proc = create_processor(retrieval, 1)
+    proc.prefetch_swath(pd.Series({'swaths': 'https://host/b.zip'}))
+    assert proc.get_swath_file()
+    assert retrieval.retrieved == 1 and proc.prefetched == {}
+    proc.prefetcher.shutdown()
+    #without prefetching, swaths are only retrieved in the foreground
+    retrieval = BackgroundRetrieval(fail=False)
+    proc = create_processor(retrieval, 0)
+    proc.prefetch_swath(pd.Series({'swaths': 'https://host/b.zip'}))
+    assert proc.get_swath_file()
+    assert retrieval.prefetched == [] and retrieval.retrieved == 1
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from retry import CircuitBreaker, RetryPolicy, RetrySession
+
+import threading
+import time
+
+import pytest
+import requests
+
+
+# In[]
+
+@pytest.fixture
+def delays(monkeypatch) -> list:
+    #record the backoff delays instead of sleeping
+    DELAYS = []
+    monkeypatch.setattr('retry.time.sleep', DELAYS.append)
+    return DELAYS
+
+
+def create_session(retries: int = 3, threshold: int = 10, 
+                   cooldown: float = 30.0) -> RetrySession:
+    return RetrySession(requests.Session(),
+                        RetryPolicy(retries=retries, backoff=1.0,
+                                    max_backoff=8.0, jitter=False),
+                        CircuitBreaker(threshold=threshold, 
+                                       cooldown=cooldown))
+
+
+def test_retry_after_of_rate_limited_requests(server, delays):
+    server.files['/file'] = b'content'
+    server.script('/file', 
+                  {'status': 429, 'headers': {'Retry-After': '5'}},
+                  {'status': 429, 'headers': {'Retry-After': '3600'}})
+    r = create_session().get(server.url('/file'))
+    assert r.status_code == 200 and r.content == b'content'
+    assert len(server.requests('/file')) == 3
+    #server delay honored, but capped at the maximum backoff
+    assert delays == [5.0, 8.0]
+
+
+def test_exponential_backoff_until_retries_are_exhausted(server, delays):
+    server.files['/file'] = b'content'
+    server.script('/file', *[{'status': 503}] * 5)
+    r = create_session(retries=3).get(server.url('/file'))
+    assert r.status_code == 503
+    assert len(server.requests('/file')) == 4
+    assert delays == [1.0, 2.0, 4.0]
+
+
+def test_dropped_connections_are_retried(server, delays):
+    server.files['/file'] = b'content' * 1000
+    server.script('/file', {'drop': True, 'after': 100}, 
+                  {'drop': True, 'after': 0})
+    r = create_session().get(server.url('/file'))
+    assert r.content == b'content' * 1000
+    assert len(server.requests('/file')) == 3
+    assert delays == [1.0, 2.0]
+
+
+def test_dropped_connections_of_the_last_attempt_are_raised(server, delays):
+    server.files['/file'] = b'content' * 1000
+    server.script('/file', *[{'drop': True, 'after': 10}] * 3)
+    with pytest.raises(requests.exceptions.RequestException):
+        create_session(retries=2).get(server.url('/file'))
+    assert len(server.requests('/file')) == 3
+
+
+def test_circuit_breaker_pauses_and_probes_the_host(server, delays):
+    server.files['/file'] = b'content'
+    server.script('/file', *[{'status': 503}] * 3)
+    session = create_session(retries=2, threshold=3, cooldown=0.5)
+    HOST = server.url('').split('//')[1]
+    assert session.get(server.url('/file')).status_code == 503
+    assert session.breaker.is_open(HOST)
+    #next request waits for the cool-down and probes the host
+    START = time.monotonic()
+    assert session.get(server.url('/file')).status_code == 200
+    assert time.monotonic() - START >= 0.4
+    assert not session.breaker.is_open(HOST)
+    assert len(server.requests('/file')) == 4
+
+
+def test_circuit_breaker_lets_a_single_probe_through():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.2)
+    for _ in range(2):
+        breaker.record_failure('host')
+    assert breaker.is_open('host')
+    PROBES = []
+    def request() -> None:
+        breaker.acquire('host')
+        PROBES.append(time.monotonic())
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    #only the probe passed, the others wait for its outcome
+    assert len(PROBES) == 1
+    breaker.record_success('host')
+    for thread in threads:
+        thread.join(timeout=5)
+    assert len(PROBES) == 3 and not breaker.is_open('host')
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Dr. Stephan Paul (AWI/iceXai; stephan.paul@awi.de)
+"""
+
+
+# In[]
+from proc import ZipFileHandler
+from scratch import ScratchManager
+
+import threading
+import time
+
+
+# In[]
+
+class Evictable(object):
+    #stand-in for the granule cache counting its size queries
+    def __init__(self, size: int):
+        self.size = size
+        self.queries = 0
+
+    def get_size(self) -> int:
+        self.queries += 1
+        return self.size
+
+    def evict(self, budget: int) -> None:
+        self.size = min(self.size, budget)
+
+
+def test_reservations_evict_only_if_this_suffices():
+    scratch = ScratchManager(100)
+    cache = Evictable(60)
+    scratch.add_evictable(cache.get_size, cache.evict)
+    scratch.reserve('a', 30)
+    assert cache.size == 60
+    scratch.reserve('b', 30)
+    assert cache.size == 40 and scratch.get_usage() == 100
+    #too large even without any evictable data
+    assert not scratch.try_reserve('c', 80)
+    assert cache.size == 40
+
+
+def test_waiting_reservations_do_not_query_the_evictable_data():
+    scratch = ScratchManager(100)
+    cache = Evictable(0)
+    scratch.add_evictable(cache.get_size, cache.evict)
+    scratch.reserve('a', 80)
+    thread = threading.Thread(target=scratch.reserve, args=('b', 50))
+    thread.start()
+    time.sleep(0.2)
+    QUERIES = cache.queries
+    #wake-ups without any released space
+    for _ in range(20):
+        scratch.prioritize('c')
+    time.sleep(0.2)
+    assert thread.is_alive() and cache.queries == QUERIES
+    scratch.release('a')
+    thread.join(timeout=5)
+    assert not thread.is_alive() and scratch.reserved == {'b': 50}
+
+
+def test_corrupt_zip_files_release_their_reservation(tmp_path):
+    scratch = ScratchManager(100)
+    handler = ZipFileHandler(str(tmp_path), True, scratch)
+    PATH = tmp_path / 'swath.zip'
+    PATH.write_bytes(b'no zip file')
+    scratch.reserve(str(PATH), 11)
+    handler.set_zip_path('swath.zip')
+    assert not handler.load_zip_file()
+    assert scratch.reserved == {} and not PATH.exists()
+    #corrupt zip files retrieved into memory
+    scratch.prioritize(str(PATH))
+    assert not handler.load_zip_content(b'no zip file')
+    assert scratch.urgent == set()